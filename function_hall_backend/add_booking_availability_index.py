@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Add composite index on bookings(hall_id, event_date, status)
+Backs the date availability anti-join used by GET /api/halls
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+app = create_app()
+
+with app.app_context():
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_bookings_hall_date_status "
+        "ON bookings (hall_id, event_date, status)"
+    ))
+    db.session.commit()
+    print("✓ Index ix_bookings_hall_date_status ready")
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Add indexes behind the filtered, keyset-paginated GET /api/bookings listing
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_bookings_customer_id ON bookings (customer_id)",
+    "CREATE INDEX IF NOT EXISTS ix_bookings_event_date_id ON bookings (event_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_bookings_status_id ON bookings (status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_bookings_created_at ON bookings (created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_function_halls_vendor_id ON function_halls (vendor_id)",
+]
+
+app = create_app()
+
+with app.app_context():
+    for statement in INDEXES:
+        db.session.execute(text(statement))
+    db.session.commit()
+    print(f"✓ {len(INDEXES)} booking listing indexes ready")
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Add partial unique index: one Pending/Confirmed booking per hall per event date
+Stops concurrent POST /api/bookings requests from double-booking a hall
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+app = create_app()
+
+with app.app_context():
+    duplicates = db.session.execute(text(
+        "SELECT hall_id, event_date, COUNT(*) FROM bookings "
+        "WHERE status IN ('Confirmed', 'Pending') "
+        "GROUP BY hall_id, event_date HAVING COUNT(*) > 1"
+    )).fetchall()
+    if duplicates:
+        # Raise rather than exit so run_migrations.py records a failure and carries on
+        pairs = ', '.join(f"(hall {hall_id}, {event_date}: {count} active)" for hall_id, event_date, count in duplicates)
+        raise RuntimeError(
+            "Existing double bookings must be resolved first (cancel or reject all but one): " + pairs
+        )
+
+    db.session.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_bookings_active_hall_date "
+        "ON bookings (hall_id, event_date) WHERE status IN ('Confirmed', 'Pending')"
+    ))
+    db.session.commit()
+    print("✓ Index uq_bookings_active_hall_date ready")
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Add customers.auth_version
+Version stamped into customer check-auth claims; bumped on approval,
+rejection and profile changes so stale claims are reloaded
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+app = create_app()
+
+with app.app_context():
+    db.session.execute(text(
+        "ALTER TABLE customers ADD COLUMN IF NOT EXISTS auth_version INTEGER NOT NULL DEFAULT 1"
+    ))
+    db.session.commit()
+    print("✓ Customer auth_version column ready")
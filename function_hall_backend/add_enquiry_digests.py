@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Add enquiry digests
+Per-vendor enquiry SMS preference on admin_users and the time-bucketed
+enquiry_digest_items queue flushed by notification_worker.py
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+from app.models import EnquiryDigestItem
+
+app = create_app()
+
+with app.app_context():
+    db.session.execute(text("ALTER TABLE admin_users ADD COLUMN IF NOT EXISTS enquiry_sms_mode VARCHAR(20)"))
+    db.session.commit()
+    EnquiryDigestItem.__table__.create(db.engine, checkfirst=True)
+    print("✓ Enquiry digest queue ready")
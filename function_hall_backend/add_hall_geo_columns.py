@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Add latitude, longitude and geo_cell columns to function_halls
+geo_cell is the B-tree indexed grid bucket behind GET /api/halls?near=lat,lon&radius_km=
+Run backfill_hall_coordinates.py afterwards to populate existing halls
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+app = create_app()
+
+with app.app_context():
+    db.session.execute(text("ALTER TABLE function_halls ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION"))
+    db.session.execute(text("ALTER TABLE function_halls ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION"))
+    db.session.execute(text("ALTER TABLE function_halls ADD COLUMN IF NOT EXISTS geo_cell INTEGER"))
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_function_halls_geo_cell ON function_halls (geo_cell)"
+    ))
+    db.session.commit()
+    print("✓ Geo columns ready on function_halls")
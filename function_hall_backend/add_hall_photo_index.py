@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Add the (hall_id, id) index on hall_photos
+Backs photo loads per hall and the primary-photo lookup in GET /api/customer/<id>/bookings
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+app = create_app()
+
+with app.app_context():
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_hall_photos_hall_id_id ON hall_photos (hall_id, id)"
+    ))
+    db.session.commit()
+    print("✓ Hall photo index ready")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Enable pg_trgm and add GIN trigram indexes on function_halls name/location
+Serves both the ILIKE '%term%' filters and the typo-tolerant q= search in GET /api/halls
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+app = create_app()
+
+with app.app_context():
+    if db.engine.dialect.name != 'postgresql':
+        print("⚠️ Not a PostgreSQL database - trigram indexes skipped (substring search fallback in use)")
+    else:
+        db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_function_halls_name_trgm "
+            "ON function_halls USING gin (name gin_trgm_ops)"
+        ))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_function_halls_location_trgm "
+            "ON function_halls USING gin (location gin_trgm_ops)"
+        ))
+        db.session.commit()
+        print("✓ Trigram search indexes ready")
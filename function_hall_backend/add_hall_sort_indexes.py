@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Add sort-key indexes on function_halls for keyset pagination
+Backs GET /api/halls?sort=price|capacity with an index seek per page
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+app = create_app()
+
+with app.app_context():
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_function_halls_price_key "
+        "ON function_halls (coalesce(price_per_day, 0), id)"
+    ))
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_function_halls_capacity_key "
+        "ON function_halls (coalesce(capacity, 0), id)"
+    ))
+    db.session.commit()
+    print("✓ Hall sort indexes ready")
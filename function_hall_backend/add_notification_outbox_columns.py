@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Turn notifications into the SMS outbox
+Adds the delivery columns used by app/outbox.py and notification_worker.py,
+and drops NOT NULL on recipient_email (SMS rows have a phone instead)
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+
+app = create_app()
+
+with app.app_context():
+    db.session.execute(text("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS channel VARCHAR(20) DEFAULT 'in_app'"))
+    db.session.execute(text("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS recipient_phone VARCHAR(20)"))
+    db.session.execute(text("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS status VARCHAR(20)"))
+    db.session.execute(text("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0"))
+    db.session.execute(text("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP"))
+    db.session.execute(text("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS last_error TEXT"))
+    db.session.execute(text("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS provider_id VARCHAR(64)"))
+    db.session.execute(text("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS sent_at TIMESTAMP"))
+    db.session.execute(text("ALTER TABLE notifications ALTER COLUMN recipient_email DROP NOT NULL"))
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_notifications_outbox ON notifications (channel, status, next_attempt_at)"
+    ))
+    db.session.commit()
+    print("✓ Outbox columns ready on notifications")
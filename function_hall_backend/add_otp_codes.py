@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Add the otp_codes table
+Shared OTP store for all gunicorn workers (OTP_STORE=database, the default);
+expired rows are swept by notification_worker.py via ix_otp_codes_expires_at
+"""
+
+from app import create_app, db
+from app.models import OTPCode
+
+app = create_app()
+
+with app.app_context():
+    OTPCode.__table__.create(db.engine, checkfirst=True)
+    print("✓ OTP code table ready")
@@ -1,5 +1,5 @@
 
-from flask import Flask
+from flask import Flask, jsonify
 from dotenv import load_dotenv
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
@@ -58,6 +58,14 @@ def create_app():
     app.register_blueprint(auth)
     app.register_blueprint(auth_jwt)
 
+    from app.passwords import PasswordHashBusy
+
+    @app.errorhandler(PasswordHashBusy)
+    def password_hash_busy(e):
+        response = jsonify({'error': 'Server is busy. Please try again.'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
     with app.app_context():
         db.create_all()
 
@@ -0,0 +1,192 @@
+import calendar as month_calendar
+import os
+from datetime import datetime
+from sqlalchemy import case, extract
+from app import db
+from app.models import Booking
+from app.cache import TTLCache
+
+# -------------------------
+# Hall Analytics (occupancy, revenue, lead time)
+# -------------------------
+# Monthly series are bucketed by event month and computed for many halls and
+# months in one GROUP BY. A closed month (before the current UTC month) rarely
+# changes, so its per-hall result is cached; only the current and future months
+# are recomputed on every request. Booking writes touching a closed month drop
+# that hall-month from the cache.
+#
+# The cache is per worker process (see app/cache.py): invalidation only reaches
+# the worker that made the change, so other workers may serve a closed month
+# that is up to ANALYTICS_CACHE_TTL seconds stale (5 minutes by default).
+
+MAX_ANALYTICS_MONTHS = 36
+DEFAULT_ANALYTICS_MONTHS = 12
+
+# (label, min days, max days) - lead time is event_date minus booking day
+LEAD_TIME_BUCKETS = [
+    ('0-7', 0, 7),
+    ('8-30', 8, 30),
+    ('31-90', 31, 90),
+    ('91-180', 91, 180),
+    ('181+', 181, None),
+]
+
+analytics_cache = TTLCache(
+    maxsize=int(os.environ.get('ANALYTICS_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('ANALYTICS_CACHE_TTL', 300))
+)
+
+
+class AnalyticsError(ValueError):
+    pass
+
+
+def invalidate_hall_analytics(hall_id=None, event_date=None):
+    """Drop cached months for a booking change; with no arguments drop everything"""
+    if hall_id is None:
+        analytics_cache.clear()
+    else:
+        analytics_cache.delete((hall_id, event_date.year, event_date.month))
+
+
+def parse_month_range(args, today=None):
+    """from/to as YYYY-MM (inclusive); defaults to the last DEFAULT_ANALYTICS_MONTHS months"""
+    today = today or datetime.utcnow().date()
+    try:
+        end = datetime.strptime(args['to'], '%Y-%m') if args.get('to') else today
+        end = (end.year, end.month)
+        if args.get('from'):
+            start = datetime.strptime(args['from'], '%Y-%m')
+            start = (start.year, start.month)
+        else:
+            index = end[0] * 12 + end[1] - DEFAULT_ANALYTICS_MONTHS
+            start = (index // 12, index % 12 + 1)
+    except ValueError:
+        raise AnalyticsError("from and to must be YYYY-MM")
+
+    months = month_span(start, end)
+    if not months:
+        raise AnalyticsError("from must be on or before to")
+    if len(months) > MAX_ANALYTICS_MONTHS:
+        raise AnalyticsError(f"Range is limited to {MAX_ANALYTICS_MONTHS} months")
+    return months
+
+
+def month_span(start, end):
+    """[(year, month), ...] from start to end inclusive"""
+    first, last = start[0] * 12 + start[1] - 1, end[0] * 12 + end[1] - 1
+    return [(index // 12, index % 12 + 1) for index in range(first, last + 1)]
+
+
+def _lead_days():
+    """Whole days between the day a booking was made and its event date"""
+    if db.engine.dialect.name == 'postgresql':
+        return Booking.event_date - db.cast(Booking.created_at, db.Date)
+    return db.cast(db.func.julianday(Booking.event_date) - db.func.julianday(db.func.date(Booking.created_at)), db.Integer)
+
+
+def _empty_month(year, month):
+    days = month_calendar.monthrange(year, month)[1]
+    return {
+        'month': f"{year:04d}-{month:02d}",
+        'days_in_month': days,
+        'bookings': 0,
+        'confirmed_bookings': 0,
+        'booked_days': 0,
+        'occupancy_rate': 0.0,
+        'revenue': 0.0,
+        'avg_lead_days': None,
+        'lead_time': {label: 0 for label, _, _ in LEAD_TIME_BUCKETS}
+    }
+
+
+def _compute_months(hall_ids, months):
+    """One grouped query over bookings for every (hall, month) requested; returns {(hall_id, y, m): month}"""
+    results = {(hall_id, y, m): _empty_month(y, m) for hall_id in hall_ids for y, m in months}
+    if not results:
+        return results
+
+    (first_y, first_m), (last_y, last_m) = months[0], months[-1]
+    first_day = datetime(first_y, first_m, 1).date()
+    last_day = datetime(last_y, last_m, month_calendar.monthrange(last_y, last_m)[1]).date()
+
+    year = extract('year', Booking.event_date)
+    month = extract('month', Booking.event_date)
+    confirmed = Booking.status == 'Confirmed'
+    lead = _lead_days()
+    lead_counts = []
+    for label, low, high in LEAD_TIME_BUCKETS:
+        in_bucket = lead >= low if high is None else lead.between(low, high)
+        lead_counts.append(db.func.count(case((in_bucket, 1))).label(f"lead_{label}"))
+
+    rows = db.session.query(
+        Booking.hall_id,
+        year.label('year'),
+        month.label('month'),
+        db.func.count(Booking.id).label('bookings'),
+        db.func.count(case((confirmed, 1))).label('confirmed_bookings'),
+        db.func.count(db.distinct(case((confirmed, Booking.event_date)))).label('booked_days'),
+        db.func.coalesce(db.func.sum(case((confirmed, Booking.total_amount))), 0).label('revenue'),
+        db.func.avg(lead).label('avg_lead_days'),
+        *lead_counts
+    ).filter(
+        Booking.hall_id.in_(hall_ids),
+        Booking.event_date.between(first_day, last_day)
+    ).group_by(Booking.hall_id, year, month).all()
+
+    for row in rows:
+        entry = results.get((row.hall_id, int(row.year), int(row.month)))
+        if entry is None:
+            continue
+        entry['bookings'] = row.bookings
+        entry['confirmed_bookings'] = row.confirmed_bookings
+        entry['booked_days'] = row.booked_days
+        entry['occupancy_rate'] = round(row.booked_days / entry['days_in_month'], 4)
+        entry['revenue'] = float(row.revenue)
+        entry['avg_lead_days'] = round(float(row.avg_lead_days), 1) if row.avg_lead_days is not None else None
+        entry['lead_time'] = {label: row._mapping[f"lead_{label}"] for label, _, _ in LEAD_TIME_BUCKETS}
+    return results
+
+
+def hall_analytics(hall_ids, months, today=None):
+    """
+    Monthly occupancy, revenue and lead-time series per hall.
+    Closed months come from analytics_cache when present; everything else is
+    computed in a single query. Returns {hall_id: [month, ...]} in month order.
+    """
+    today = today or datetime.utcnow().date()
+    current = (today.year, today.month)
+
+    found, missing = {}, []
+    for y, m in months:
+        for hall_id in hall_ids:
+            cached = analytics_cache.get((hall_id, y, m)) if (y, m) < current else None
+            if cached is None:
+                missing.append((y, m))
+                break
+            found[(hall_id, y, m)] = cached
+
+    if missing:
+        computed = _compute_months(hall_ids, month_span(missing[0], missing[-1]))
+        for (hall_id, y, m), entry in computed.items():
+            if (y, m) not in missing:
+                continue
+            found[(hall_id, y, m)] = entry
+            if (y, m) < current:
+                analytics_cache.set((hall_id, y, m), entry)
+
+    series = {}
+    for hall_id in hall_ids:
+        series[hall_id] = _with_trend([dict(found[(hall_id, y, m)]) for y, m in months])
+    return series
+
+
+def _with_trend(months):
+    """Running revenue total and month-over-month change, over the months in range"""
+    running, previous = 0.0, None
+    for entry in months:
+        running += entry['revenue']
+        entry['cumulative_revenue'] = round(running, 2)
+        entry['revenue_change'] = None if previous is None else round(entry['revenue'] - previous, 2)
+        previous = entry['revenue']
+    return months
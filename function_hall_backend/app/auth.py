@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify, session
-from werkzeug.security import generate_password_hash, check_password_hash
 from app.models import Customer, AdminUser
 from app import db
+from app.jwt_auth import customer_claims, claims_current, load_customer_claims
 
 auth = Blueprint('auth', __name__)
 
@@ -18,7 +18,8 @@ def register():
     if Customer.query.filter_by(email=email).first():
         return jsonify({'error': 'Email already registered.'}), 400
 
-    customer = Customer(name=name, email=email, password=password)
+    customer = Customer(name=name, email=email)
+    customer.set_password(password)
     customer.is_approved = False
     customer.approval_status = 'pending'
     db.session.add(customer)
@@ -39,8 +40,9 @@ def login():
         return jsonify({'error': 'Email and password are required.'}), 400
 
     customer = Customer.query.filter_by(email=email).first()
-    if not customer or customer.password != password:
+    if not customer or not customer.check_password(password):
         return jsonify({'error': 'Invalid credentials.'}), 401
+    db.session.commit()  # keeps a rehashed password
 
     # Check if customer is approved
     if not customer.is_approved or customer.approval_status != 'approved':
@@ -50,8 +52,9 @@ def login():
             return jsonify({'error': 'Your account has been rejected by admin.', 'status': 'rejected'}), 403
 
     session['user_id'] = customer.id
+    session['claims'] = customer_claims(customer)
     session.permanent = True
-    print(f"✅ Login successful for user_id: {customer.id}, Session: {dict(session)}")
+    print(f"✅ Login successful for user_id: {customer.id}")
     return jsonify({
         'message': 'Login successful!', 
         'user_id': customer.id,
@@ -66,40 +69,48 @@ def logout():
     print(f"🚪 Logout successful for user_id: {user_id}")
     return jsonify({'message': 'Logout successful!'}), 200
 
+def session_claims():
+    """Claims for the logged-in customer: from the session cookie while current, else reloaded once"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+    claims = session.get('claims')
+    if not claims_current(claims, user_id):
+        claims = load_customer_claims(user_id)
+        if claims:
+            session['claims'] = claims
+        else:
+            session.pop('claims', None)
+    return claims
+
 @auth.route('/api/check-auth', methods=['GET'])
 def check_auth():
-    user_id = session.get('user_id')
-    print(f"🔐 Check-auth request - Session: {dict(session)}, user_id: {user_id}")
-    if user_id:
-        customer = Customer.query.get(user_id)
-        if customer:
-            print(f"✅ Authenticated: {customer.email}")
-            return jsonify({
-                'authenticated': True,
-                'user_id': customer.id,
-                'name': customer.name,
-                'email': customer.email,
-                'is_approved': customer.is_approved,
-                'approval_status': customer.approval_status
-            }), 200
-    print("❌ Not authenticated - returning false")
+    claims = session_claims()
+    if claims:
+        return jsonify({
+            'authenticated': True,
+            'user_id': claims['id'],
+            'name': claims['name'],
+            'email': claims['email'],
+            'is_approved': claims['is_approved'],
+            'approval_status': claims['approval_status']
+        }), 200
     return jsonify({'authenticated': False}), 200
 
 @auth.route('/api/customer/approval-status', methods=['GET'])
 def check_approval_status():
     """Check if current logged-in customer is approved"""
-    user_id = session.get('user_id')
-    if not user_id:
+    if not session.get('user_id'):
         return jsonify({'error': 'Not authenticated'}), 401
     
-    customer = Customer.query.get(user_id)
-    if not customer:
+    claims = session_claims()
+    if not claims:
         return jsonify({'error': 'Customer not found'}), 404
     
     return jsonify({
-        'is_approved': customer.is_approved,
-        'approval_status': customer.approval_status,
-        'message': 'Approved' if customer.is_approved else 'Pending admin approval'
+        'is_approved': claims['is_approved'],
+        'approval_status': claims['approval_status'],
+        'message': 'Approved' if claims['is_approved'] else 'Pending admin approval'
     }), 200
 
 # Note: Admin authentication now handled by auth_jwt.py using JWT tokens
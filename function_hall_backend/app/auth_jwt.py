@@ -1,14 +1,14 @@
 from flask import Blueprint, request, jsonify
 from app.models import AdminUser, Customer
 from app import db
+from app.jwt_auth import SECRET_KEY, bearer_token, resolve_principal, invalidate_principal, jwt_required
+from app.jwt_auth import customer_claims, claims_current, load_customer_claims, customer_token
+from app.ratelimit import rate_limited
 import jwt
 from datetime import datetime, timedelta
-import os
 
 auth_jwt = Blueprint('auth_jwt', __name__)
 
-SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-
 # -------------------------
 # Admin/Vendor JWT Authentication
 # -------------------------
@@ -25,6 +25,7 @@ def admin_login():
     admin = AdminUser.query.filter_by(email=email).first()
     if not admin or not admin.check_password(password):
         return jsonify({'error': 'Invalid credentials.'}), 401
+    db.session.commit()  # keeps a rehashed password
     
     # Check if vendor is approved
     if admin.role == 'vendor' and not admin.is_approved:
@@ -109,18 +110,13 @@ def admin_logout():
 
 @auth_jwt.route('/api/admin/check-auth', methods=['GET'])
 def admin_check_auth():
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
+    token = bearer_token()
+    if not token:
         return jsonify({'authenticated': False}), 401
     
-    token = auth_header.split(' ')[1]
-    
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        admin_id = payload.get('admin_id')
-        
-        admin = AdminUser.query.get(admin_id)
+        principal = resolve_principal(token, 'admin')
+        admin = AdminUser.query.get(principal['id']) if principal else None
         if not admin:
             return jsonify({'authenticated': False}), 401
         
@@ -142,83 +138,48 @@ def admin_check_auth():
         return jsonify({'authenticated': False, 'error': 'Invalid token'}), 401
 
 @auth_jwt.route('/api/admin/vendors', methods=['GET'])
+@jwt_required(roles=('super_admin',), forbidden='Only super admins can access this resource')
 def get_all_vendors():
     """Get all vendors (requires super_admin authentication)"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({'error': 'Unauthorized'}), 401
+    vendors = AdminUser.query.filter_by(role='vendor').all()
     
-    token = auth_header.split(' ')[1]
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        admin_id = payload.get('admin_id')
-        
-        admin = AdminUser.query.get(admin_id)
-        if not admin or admin.role != 'super_admin':
-            return jsonify({'error': 'Only super admins can access this resource'}), 403
-        
-        vendors = AdminUser.query.filter_by(role='vendor').all()
-        
-        return jsonify({
-            'vendors': [{
-                'id': v.id,
-                'name': v.name,
-                'email': v.email,
-                'phone': v.phone,
-                'business_name': v.business_name,
-                'is_approved': v.is_approved,
-                'created_at': v.id  # Using id as proxy for creation order
-            } for v in vendors]
-        }), 200
-    except jwt.ExpiredSignatureError:
-        return jsonify({'error': 'Token expired'}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({'error': 'Invalid token'}), 401
+    return jsonify({
+        'vendors': [{
+            'id': v.id,
+            'name': v.name,
+            'email': v.email,
+            'phone': v.phone,
+            'business_name': v.business_name,
+            'is_approved': v.is_approved,
+            'created_at': v.id  # Using id as proxy for creation order
+        } for v in vendors]
+    }), 200
 
 @auth_jwt.route('/api/admin/vendors/<int:vendor_id>/approve', methods=['PUT'])
+@jwt_required(roles=('super_admin',), forbidden='Only super admins can approve vendors')
 def approve_vendor(vendor_id):
     """Approve or reject a vendor (requires super_admin authentication)"""
-    auth_header = request.headers.get('Authorization')
+    vendor = AdminUser.query.get(vendor_id)
+    if not vendor or vendor.role != 'vendor':
+        return jsonify({'error': 'Vendor not found'}), 404
     
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({'error': 'Unauthorized'}), 401
+    data = request.get_json()
+    is_approved = data.get('is_approved', True)
     
-    token = auth_header.split(' ')[1]
+    vendor.is_approved = is_approved
+    db.session.commit()
+    invalidate_principal('admin', vendor.id)
     
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        admin_id = payload.get('admin_id')
-        
-        admin = AdminUser.query.get(admin_id)
-        if not admin or admin.role != 'super_admin':
-            return jsonify({'error': 'Only super admins can approve vendors'}), 403
-        
-        vendor = AdminUser.query.get(vendor_id)
-        if not vendor or vendor.role != 'vendor':
-            return jsonify({'error': 'Vendor not found'}), 404
-        
-        data = request.get_json()
-        is_approved = data.get('is_approved', True)
-        
-        vendor.is_approved = is_approved
-        db.session.commit()
-        
-        return jsonify({
-            'message': f'Vendor {"approved" if is_approved else "rejected"} successfully',
-            'vendor': {
-                'id': vendor.id,
-                'name': vendor.name,
-                'email': vendor.email,
-                'business_name': vendor.business_name,
-                'is_approved': vendor.is_approved
-            }
-        }), 200
-    except jwt.ExpiredSignatureError:
-        return jsonify({'error': 'Token expired'}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({'error': 'Invalid token'}), 401
+    return jsonify({
+        'message': f'Vendor {"approved" if is_approved else "rejected"} successfully',
+        'vendor': {
+            'id': vendor.id,
+            'name': vendor.name,
+            'email': vendor.email,
+            'business_name': vendor.business_name,
+            'is_approved': vendor.is_approved
+        }
+    }), 200
 
 # -------------------------
 # Customer JWT Authentication
@@ -248,12 +209,7 @@ def customer_register():
     db.session.commit()
 
     # Create JWT token
-    token = jwt.encode({
-        'customer_id': customer.id,
-        'email': customer.email,
-        'is_admin': False,
-        'exp': datetime.utcnow() + timedelta(days=7)
-    }, SECRET_KEY, algorithm='HS256')
+    token = customer_token(customer.id, customer_claims(customer))
 
     return jsonify({
         'message': 'Registration successful!',
@@ -266,13 +222,24 @@ def customer_register():
         }
     }), 201
 
+def login_account(data):
+    """Rate-limit key for a login body; anything but a string email falls back to the IP and endpoint buckets"""
+    email = data.get('email') if isinstance(data, dict) else None
+    if not isinstance(email, str):
+        return None
+    return email.strip().lower() or None
+
+
 @auth_jwt.route('/api/customer/login', methods=['POST'])
+@rate_limited('customer_login', account=login_account)
 def customer_login():
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
     email = data.get('email')
     password = data.get('password')
 
-    if not email or not password:
+    if not isinstance(email, str) or not isinstance(password, str) or not email or not password:
         return jsonify({'error': 'Email and password are required.'}), 400
 
     customer = Customer.query.filter_by(email=email).first()
@@ -285,14 +252,10 @@ def customer_login():
     
     if not customer.check_password(password):
         return jsonify({'error': 'Invalid credentials.'}), 401
+    db.session.commit()  # keeps a rehashed password
 
     # Create JWT token
-    token = jwt.encode({
-        'customer_id': customer.id,
-        'email': customer.email,
-        'is_admin': False,
-        'exp': datetime.utcnow() + timedelta(days=7)
-    }, SECRET_KEY, algorithm='HS256')
+    token = customer_token(customer.id, customer_claims(customer))
     
     return jsonify({
         'message': 'Login successful!',
@@ -307,32 +270,40 @@ def customer_login():
 
 @auth_jwt.route('/api/customer/check-auth', methods=['GET'])
 def customer_check_auth():
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
+    """Answered from the token's claims; the database is only read once they are stale"""
+    token = bearer_token()
+    if not token:
         return jsonify({'authenticated': False}), 401
     
-    token = auth_header.split(' ')[1]
-    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        customer_id = payload.get('customer_id')
-        
-        customer = Customer.query.get(customer_id)
-        if not customer:
-            return jsonify({'authenticated': False}), 401
-        
-        return jsonify({
-            'authenticated': True,
-            'customer': {
-                'id': customer.id,
-                'name': customer.name,
-                'email': customer.email,
-                'phone': customer.phone,
-                'address': customer.address
-            }
-        }), 200
     except jwt.ExpiredSignatureError:
         return jsonify({'authenticated': False, 'error': 'Token expired'}), 401
     except jwt.InvalidTokenError:
         return jsonify({'authenticated': False, 'error': 'Invalid token'}), 401
+
+    customer_id = payload.get('customer_id')
+    claims = payload.get('claims')
+    refreshed_token = None
+    if not claims_current(claims, customer_id):
+        claims = load_customer_claims(customer_id) if customer_id else None
+        if not claims:
+            return jsonify({'authenticated': False}), 401
+        # Same expiry as the old token; clients that store it skip the lookup next time
+        refreshed_token = customer_token(customer_id, claims, exp=payload['exp'])
+
+    result = {
+        'authenticated': True,
+        'customer': {
+            'id': claims['id'],
+            'name': claims['name'],
+            'email': claims['email'],
+            'phone': claims['phone'],
+            'address': claims['address'],
+            'is_approved': claims['is_approved'],
+            'approval_status': claims['approval_status']
+        }
+    }
+    if refreshed_token:
+        result['token'] = refreshed_token
+    return jsonify(result), 200
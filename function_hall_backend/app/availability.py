@@ -0,0 +1,99 @@
+import calendar as month_calendar
+from datetime import date
+from sqlalchemy import and_, tuple_
+from app import db
+from app.models import Booking, Calendar, FunctionHall, ACTIVE_BOOKING_STATUSES
+
+# -------------------------
+# Per-day Availability (Calendar table)
+# -------------------------
+# Calendar holds one row per (hall_id, date) that has ever had a booking;
+# is_booked mirrors "an active booking exists". Every booking write calls
+# sync_calendar() inside its own transaction, so the table never drifts
+# from bookings and month views are a single indexed range read.
+
+
+def dialect_insert(table):
+    """Dialect INSERT supporting ON CONFLICT (PostgreSQL in production, SQLite in development)"""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def sync_calendar(pairs):
+    """
+    Recompute Calendar.is_booked for the given (hall_id, date) pairs from bookings.
+    Runs in the caller's transaction - call it before commit.
+    """
+    pairs = {(hall_id, day) for hall_id, day in pairs}
+    if not pairs:
+        return
+    booked = set(db.session.query(Booking.hall_id, Booking.event_date).filter(
+        tuple_(Booking.hall_id, Booking.event_date).in_(list(pairs)),
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+    ).distinct().all())
+
+    stmt = dialect_insert(Calendar.__table__).values([
+        {'hall_id': hall_id, 'date': day, 'is_booked': (hall_id, day) in booked}
+        for hall_id, day in sorted(pairs)
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['hall_id', 'date'],
+        set_={'is_booked': stmt.excluded.is_booked}
+    )
+    db.session.execute(stmt)
+
+
+def month_bitmask(hall_id, year, month):
+    """
+    Booked days of a month as an int: bit (day - 1) is set when that day is booked.
+    Returns (mask, days_in_month).
+    """
+    days_in_month = month_calendar.monthrange(year, month)[1]
+    booked_days = db.session.query(Calendar.date).filter(
+        Calendar.hall_id == hall_id,
+        Calendar.date.between(date(year, month, 1), date(year, month, days_in_month)),
+        Calendar.is_booked.is_(True)
+    ).all()
+    mask = 0
+    for (day,) in booked_days:
+        mask |= 1 << (day.day - 1)
+    return mask, days_in_month
+
+
+# -------------------------
+# Batch Availability
+# -------------------------
+
+MAX_BATCH_HALLS = 50
+MAX_BATCH_DATES = 62
+
+
+def availability_matrix(hall_ids, dates):
+    """
+    Availability of every (hall, date) pair from one query:
+    halls LEFT JOIN their active bookings on the requested dates.
+
+    Returns rows aligned with hall_ids, columns aligned with dates;
+    a row is None when the hall does not exist.
+    """
+    rows = db.session.query(FunctionHall.id, Booking.event_date).outerjoin(
+        Booking,
+        and_(
+            Booking.hall_id == FunctionHall.id,
+            Booking.event_date.in_(dates),
+            Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+        )
+    ).filter(FunctionHall.id.in_(hall_ids)).all()
+
+    booked = {hall_id: set() for hall_id, _ in rows}
+    for hall_id, event_date in rows:
+        if event_date is not None:
+            booked[hall_id].add(event_date)
+
+    return [
+        [day not in booked[hall_id] for day in dates] if hall_id in booked else None
+        for hall_id in hall_ids
+    ]
@@ -0,0 +1,341 @@
+import os
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, select, tuple_, update
+from app import db
+from app.models import Booking, Customer, FunctionHall, HallPhoto, ACTIVE_BOOKING_STATUSES
+from app.cache import TTLCache
+from app.pagination import parse_cursor
+from app.availability import sync_calendar
+from app.stats import record_status_changes
+from app.outbox import queue_sms
+
+# -------------------------
+# Booking Listing Queries
+# -------------------------
+# One projection query joins each booking to its customer and hall, so a
+# listing never issues per-row lookups. Shared by GET /api/bookings and the
+# streaming exports. Status changes (single and bulk) are planned and applied here too.
+
+
+class FilterError(ValueError):
+    pass
+
+
+# sort -> (key columns ending in the id, descending, row -> key values, cursor value parsers)
+BOOKING_SORTS = {
+    'newest': ((Booking.id,), True, lambda r: [r.id], (int,)),
+    'event_date': ((Booking.event_date, Booking.id), False, lambda r: [r.event_date.isoformat(), r.id], (date.fromisoformat, int)),
+    'event_date_desc': ((Booking.event_date, Booking.id), True, lambda r: [r.event_date.isoformat(), r.id], (date.fromisoformat, int)),
+}
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise FilterError(f"{name} must be YYYY-MM-DD")
+
+
+def _parse_int(value, name):
+    try:
+        return int(value)
+    except ValueError:
+        raise FilterError(f"{name} must be an integer")
+
+
+def booking_filters(args):
+    """
+    Parse listing filters from query args:
+    status (comma-separated), hall_id, vendor_id, customer_id,
+    event_from/event_to and created_from/created_to (YYYY-MM-DD, inclusive).
+    """
+    filters = {}
+    statuses = [s.strip() for s in args.get('status', '').split(',') if s.strip()]
+    if statuses:
+        filters['status'] = statuses
+    for name in ('hall_id', 'vendor_id', 'customer_id'):
+        if args.get(name):
+            filters[name] = _parse_int(args[name], name)
+    for name in ('event_from', 'event_to', 'created_from', 'created_to'):
+        if args.get(name):
+            filters[name] = _parse_date(args[name], name)
+    return filters
+
+
+def booking_list_query(filters):
+    """Booking rows projected with customer and hall display fields, filters applied"""
+    query = db.session.query(
+        Booking.id,
+        Booking.customer_id,
+        Booking.hall_id,
+        Booking.event_date,
+        Booking.function_type,
+        Booking.status,
+        Booking.total_amount,
+        Booking.created_at,
+        Customer.name.label('customer_name'),
+        Customer.email.label('customer_email'),
+        Customer.phone.label('customer_phone'),
+        FunctionHall.name.label('hall_name'),
+        FunctionHall.location.label('hall_location')
+    ).outerjoin(Customer, Customer.id == Booking.customer_id
+    ).outerjoin(FunctionHall, FunctionHall.id == Booking.hall_id)
+
+    if 'status' in filters:
+        query = query.filter(Booking.status.in_(filters['status']))
+    if 'hall_id' in filters:
+        query = query.filter(Booking.hall_id == filters['hall_id'])
+    if 'vendor_id' in filters:
+        query = query.filter(FunctionHall.vendor_id == filters['vendor_id'])
+    if 'customer_id' in filters:
+        query = query.filter(Booking.customer_id == filters['customer_id'])
+    if 'event_from' in filters:
+        query = query.filter(Booking.event_date >= filters['event_from'])
+    if 'event_to' in filters:
+        query = query.filter(Booking.event_date <= filters['event_to'])
+    if 'created_from' in filters:
+        query = query.filter(Booking.created_at >= datetime.combine(filters['created_from'], datetime.min.time()))
+    if 'created_to' in filters:
+        query = query.filter(Booking.created_at < datetime.combine(filters['created_to'] + timedelta(days=1), datetime.min.time()))
+    return query
+
+
+def parse_booking_cursor(values, sort):
+    """Convert decoded cursor values back to column types for the given sort"""
+    return parse_cursor(values, BOOKING_SORTS[sort][3])
+
+
+def serialize_booking_row(row):
+    return {
+        'id': row.id,
+        'customer_id': row.customer_id,
+        'customer_name': row.customer_name or 'Unknown Customer',
+        'customer_email': row.customer_email or 'N/A',
+        'customer_phone': row.customer_phone or 'N/A',
+        'hall_id': row.hall_id,
+        'hall_name': row.hall_name or 'Unknown Hall',
+        'hall_location': row.hall_location,
+        'event_date': row.event_date.isoformat(),
+        'function_type': row.function_type,
+        'event_type': row.function_type or 'N/A',
+        'status': row.status,
+        'total_price': row.total_amount,
+        'total_amount': row.total_amount,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+        # Not stored on bookings - kept so existing clients keep their fields
+        'number_of_guests': 0,
+        'package_id': None,
+        'package_name': None,
+        'special_requests': None
+    }
+
+
+# -------------------------
+# Customer Booking History ("My Bookings")
+# -------------------------
+# One query per customer, cached per customer. Every booking write calls
+# invalidate_customer_bookings() for the customer it touched; hall edits clear
+# the whole cache since any customer may show that hall.
+#
+# The cache is per worker process (see app/cache.py): invalidation only reaches
+# the worker that made the change, so a customer whose next request lands on
+# another worker may not see a new or cancelled booking for up to
+# CUSTOMER_BOOKINGS_CACHE_TTL seconds. The default is kept to a few seconds -
+# enough to absorb page reloads and polling, short enough that a customer
+# checking right after booking sees it.
+
+customer_bookings_cache = TTLCache(
+    maxsize=int(os.environ.get('CUSTOMER_BOOKINGS_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('CUSTOMER_BOOKINGS_CACHE_TTL', 5))
+)
+
+
+def invalidate_customer_bookings(customer_id=None):
+    if customer_id is None:
+        customer_bookings_cache.clear()
+    else:
+        customer_bookings_cache.delete(customer_id)
+
+
+def customer_bookings(customer_id):
+    """A customer's bookings with hall name, location and primary (first) photo, from one query"""
+    primary_photo = select(HallPhoto.url).where(
+        HallPhoto.hall_id == Booking.hall_id
+    ).order_by(HallPhoto.id).limit(1).correlate(Booking).scalar_subquery()
+
+    rows = db.session.query(
+        Booking.id,
+        Booking.hall_id,
+        Booking.event_date,
+        Booking.function_type,
+        Booking.status,
+        Booking.total_amount,
+        Booking.created_at,
+        FunctionHall.name.label('hall_name'),
+        FunctionHall.location.label('hall_location'),
+        primary_photo.label('hall_photo')
+    ).outerjoin(FunctionHall, FunctionHall.id == Booking.hall_id
+    ).filter(Booking.customer_id == customer_id).order_by(Booking.id).all()
+
+    return [{
+        'id': row.id,
+        'hall_id': row.hall_id,
+        'hall_name': row.hall_name or 'Unknown',
+        'hall_location': row.hall_location or '',
+        'hall_photo': row.hall_photo,
+        'event_date': row.event_date.isoformat(),
+        'function_type': row.function_type,
+        'status': row.status,
+        'total_amount': row.total_amount,
+        'created_at': row.created_at.isoformat() if row.created_at else None
+    } for row in rows]
+
+
+# -------------------------
+# Status Changes
+# -------------------------
+
+MAX_BULK_STATUS_UPDATES = 500
+
+
+def confirmation_sms(booking, customer, hall):
+    """(phone, message) telling a customer their booking is confirmed and how to pay the advance"""
+    # Calculate advance amount (25% of total)
+    advance_amount = (booking.total_amount or 0) // 4
+
+    # Format customer phone number
+    customer_phone = customer.phone or ''
+    country_code = getattr(customer, 'country_code', '+91')
+    if not customer_phone.startswith('+'):
+        customer_phone = country_code + customer_phone
+
+    # Keep under 160 chars for single SMS
+    message = f"""Booking CONFIRMED! {hall.name} on {booking.event_date.strftime('%d %b')}. Advance: Rs.{advance_amount}/- (25%). Pay: gens@upi or 9866168995 within 24hrs. ID#{booking.id}"""
+    return customer_phone, message
+
+
+def queue_confirmation_sms(bookings):
+    """
+    Queue the confirmation SMS for each booking (anything with id, customer_id, hall_id,
+    event_date and total_amount) in the current transaction. Returns the booking ids queued.
+    """
+    if not bookings:
+        return set()
+    customers = {c.id: c for c in db.session.query(Customer.id, Customer.phone).filter(
+        Customer.id.in_({b.customer_id for b in bookings}))}
+    halls = {h.id: h for h in db.session.query(FunctionHall.id, FunctionHall.name).filter(
+        FunctionHall.id.in_({b.hall_id for b in bookings}))}
+
+    queued = set()
+    for booking in bookings:
+        customer, hall = customers.get(booking.customer_id), halls.get(booking.hall_id)
+        if customer and hall and customer.phone:
+            phone, message = confirmation_sms(booking, customer, hall)
+            queue_sms(phone, message, subject="Booking confirmed", booking_id=booking.id)
+            queued.add(booking.id)
+    return queued
+
+
+def parse_status_updates(data):
+    """
+    Bulk body as {"updates": [{"id": 1, "status": "Confirmed"}, ...]}
+    or {"ids": [1, 2], "status": "Confirmed"}. Returns {booking_id: status}.
+    """
+    if not isinstance(data, dict):
+        raise FilterError("JSON body required")
+    if 'updates' in data:
+        updates = data['updates']
+        if not isinstance(updates, list) or not all(isinstance(u, dict) for u in updates):
+            raise FilterError("updates must be a list of {id, status}")
+        pairs = [(u.get('id'), u.get('status')) for u in updates]
+    else:
+        ids = data.get('ids')
+        if not isinstance(ids, list):
+            raise FilterError("Provide updates or ids with status")
+        pairs = [(booking_id, data.get('status')) for booking_id in ids]
+
+    if not pairs:
+        raise FilterError("No updates given")
+    if len(pairs) > MAX_BULK_STATUS_UPDATES:
+        raise FilterError(f"At most {MAX_BULK_STATUS_UPDATES} updates per request")
+
+    changes = {}
+    for booking_id, status in pairs:
+        if not isinstance(booking_id, int) or isinstance(booking_id, bool):
+            raise FilterError("Booking ids must be integers")
+        if not isinstance(status, str) or not status.strip():
+            raise FilterError(f"Missing status for booking {booking_id}")
+        changes[booking_id] = status.strip()
+    return changes
+
+
+def plan_status_changes(changes):
+    """
+    Decide which requested transitions can be applied.
+    Returns (results, applied): results is one {id, status, result} per booking in
+    request order; applied is [(row, old_status, new_status)] for rows to update.
+    A transition is refused with 'conflict' when it would give a hall-date a second active booking.
+    """
+    rows = {row.id: row for row in db.session.query(
+        Booking.id, Booking.customer_id, Booking.hall_id, Booking.event_date,
+        Booking.status, Booking.total_amount, Booking.created_at
+    ).filter(Booking.id.in_(list(changes)))}
+
+    # Hall-days that stay held by active bookings outside this batch
+    activating = {(row.hall_id, row.event_date) for row in rows.values()
+                  if changes[row.id] in ACTIVE_BOOKING_STATUSES and row.status not in ACTIVE_BOOKING_STATUSES}
+    held = set()
+    if activating:
+        held = set(db.session.query(Booking.hall_id, Booking.event_date).filter(
+            tuple_(Booking.hall_id, Booking.event_date).in_(list(activating)),
+            Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+            Booking.id.notin_(list(rows))
+        ))
+    # Bookings already active that stay active keep their hall-day
+    for row in rows.values():
+        if row.status in ACTIVE_BOOKING_STATUSES and changes[row.id] in ACTIVE_BOOKING_STATUSES:
+            held.add((row.hall_id, row.event_date))
+
+    results, applied = [], []
+    for booking_id, new_status in changes.items():
+        row = rows.get(booking_id)
+        if row is None:
+            results.append({'id': booking_id, 'status': new_status, 'result': 'not_found'})
+            continue
+        if row.status == new_status:
+            results.append({'id': booking_id, 'status': new_status, 'result': 'unchanged'})
+            continue
+        if new_status in ACTIVE_BOOKING_STATUSES and row.status not in ACTIVE_BOOKING_STATUSES:
+            pair = (row.hall_id, row.event_date)
+            if pair in held:
+                results.append({'id': booking_id, 'status': row.status, 'result': 'conflict'})
+                continue
+            held.add(pair)
+        results.append({'id': booking_id, 'status': new_status, 'previous_status': row.status, 'result': 'updated'})
+        applied.append((row, row.status, new_status))
+    return results, applied
+
+
+def apply_status_changes(applied):
+    """
+    Apply planned transitions, then calendar and stats upkeep. Caller commits.
+    Bookings leaving the active statuses are updated first: PostgreSQL checks
+    uq_bookings_active_hall_date row by row, so a batch that frees a hall-date
+    and re-activates another booking on it must free it before taking it.
+    """
+    if not applied:
+        return
+    releasing = [(row, status) for row, _, status in applied if status not in ACTIVE_BOOKING_STATUSES]
+    holding = [(row, status) for row, _, status in applied if status in ACTIVE_BOOKING_STATUSES]
+    for group in (releasing, holding):
+        if not group:
+            continue
+        new_status = case({row.id: status for row, status in group}, value=Booking.id)
+        db.session.execute(
+            update(Booking)
+            .where(Booking.id.in_([row.id for row, _ in group]))
+            .values(status=new_status)
+            .execution_options(synchronize_session=False)
+        )
+    sync_calendar([(row.hall_id, row.event_date) for row, _, _ in applied])
+    record_status_changes(applied)
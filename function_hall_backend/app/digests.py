@@ -0,0 +1,102 @@
+import os
+from datetime import datetime, timedelta
+from itertools import groupby
+from app import db
+from app.models import AdminUser, EnquiryDigestItem
+from app.outbox import queue_sms
+
+# -------------------------
+# Enquiry Digests
+# -------------------------
+# Owners in 'digest' mode get one SMS per window instead of one per enquiry.
+# Each enquiry becomes an enquiry_digest_items row whose due_at is the end of
+# its fixed window (windows are aligned to the epoch), so everything for one
+# owner in one window shares a due_at. notification_worker.py flushes due
+# windows: one outbox SMS per recipient, queue rows deleted in the same commit.
+#
+# Items are keyed on the phone the SMS goes to (the hall's contact number,
+# the same one immediate mode texts), not on vendor_id: a vendor's halls that
+# share a number already share a digest, and halls listing different numbers
+# reach different people, each of whom should see their own enquiries.
+
+ENQUIRY_SMS_MODES = ('immediate', 'digest')
+ENQUIRY_SMS_MODE = os.environ.get('ENQUIRY_SMS_MODE', 'immediate')  # owners with no preference
+DIGEST_WINDOW_MINUTES = int(os.environ.get('ENQUIRY_DIGEST_WINDOW_MINUTES', 30))
+DIGEST_MAX_LINES = 5
+
+
+def owner_sms_mode(hall):
+    """'immediate' or 'digest' for the owner of a hall"""
+    if hall.vendor_id:
+        mode = db.session.query(AdminUser.enquiry_sms_mode).filter_by(id=hall.vendor_id).scalar()
+        if mode in ENQUIRY_SMS_MODES:
+            return mode
+    return ENQUIRY_SMS_MODE if ENQUIRY_SMS_MODE in ENQUIRY_SMS_MODES else 'immediate'
+
+
+def window_end(moment, minutes=DIGEST_WINDOW_MINUTES):
+    """End of the fixed window containing `moment`"""
+    window = minutes * 60
+    epoch = datetime(1970, 1, 1)
+    seconds = int((moment - epoch).total_seconds())
+    return epoch + timedelta(seconds=(seconds // window + 1) * window)
+
+
+def queue_enquiry_digest(hall, inquiry, now=None):
+    """Hold an enquiry for the owner's next digest; runs in the caller's transaction"""
+    item = EnquiryDigestItem(
+        recipient_phone=hall.contact_number,
+        recipient_name=hall.owner_name,
+        due_at=window_end(now or datetime.utcnow()),
+        inquiry_id=inquiry.id,
+        hall_name=hall.name,
+        customer_name=inquiry.customer_name,
+        customer_phone=inquiry.phone
+    )
+    db.session.add(item)
+    return item
+
+
+def digest_message(items):
+    """One SMS for a recipient's pending enquiries, kept short to save segments"""
+    halls = sorted({item.hall_name for item in items if item.hall_name})
+    lines = [f"{len(items)} new enquir{'y' if len(items) == 1 else 'ies'} for {', '.join(halls) or 'your hall'}:"]
+    for item in items[:DIGEST_MAX_LINES]:
+        lines.append(f"- {item.customer_name or 'Guest'} {item.customer_phone or ''}".rstrip())
+    if len(items) > DIGEST_MAX_LINES:
+        lines.append(f"+{len(items) - DIGEST_MAX_LINES} more - see your dashboard")
+    return '\n'.join(lines)
+
+
+def flush_due_digests(now=None, limit=1000):
+    """
+    Turn every due window into one outbox SMS per recipient and commit.
+    `limit` caps recipients, not rows: each chosen recipient's due items are
+    all loaded, so a window is never split across two digests.
+    Returns the number of digests queued.
+    """
+    now = now or datetime.utcnow()
+    due = EnquiryDigestItem.due_at <= now
+    phones = [phone for (phone,) in db.session.query(EnquiryDigestItem.recipient_phone).filter(due).distinct()
+              .order_by(EnquiryDigestItem.recipient_phone).limit(limit)]
+    if not phones:
+        return 0
+
+    query = EnquiryDigestItem.query.filter(due, EnquiryDigestItem.recipient_phone.in_(phones)).order_by(
+        EnquiryDigestItem.recipient_phone, EnquiryDigestItem.id
+    )
+    if db.engine.dialect.name == 'postgresql':
+        # Wait rather than skip: a concurrent flush that picked the same
+        # recipients finds their rows deleted once it gets the locks
+        query = query.with_for_update()
+
+    items = query.all()
+    digests = 0
+    for phone, group in groupby(items, key=lambda item: item.recipient_phone):
+        group = list(group)
+        queue_sms(phone, digest_message(group), recipient_name=group[0].recipient_name, subject="Enquiry digest")
+        digests += 1
+    for item in items:
+        db.session.delete(item)
+    db.session.commit()
+    return digests
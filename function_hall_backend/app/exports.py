@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from flask import Response, stream_with_context
+from app import db
+from app.models import Inquiry, FunctionHall
+from app.bookings import BOOKING_SORTS, booking_list_query, serialize_booking_row
+
+# -------------------------
+# Streaming Exports (CSV / NDJSON)
+# -------------------------
+# Rows are read through yield_per (a server-side cursor on PostgreSQL) and
+# written out in small chunks as they arrive, so an export of any size holds
+# only one batch of rows in memory.
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_BATCH_SIZE = 1000
+ROWS_PER_CHUNK = 200
+
+BOOKING_EXPORT_FIELDS = [
+    'id', 'customer_id', 'customer_name', 'customer_email', 'customer_phone',
+    'hall_id', 'hall_name', 'hall_location', 'event_date', 'function_type',
+    'status', 'total_amount', 'created_at'
+]
+
+INQUIRY_EXPORT_FIELDS = [
+    'id', 'customer_id', 'customer_name', 'customer_phone', 'email',
+    'hall_id', 'hall_name', 'location', 'message', 'status', 'created_at'
+]
+
+
+def inquiry_list_query(filters):
+    """
+    Inquiry rows projected with hall display fields. Accepts the same filter
+    dict as booking_list_query; event_from/event_to do not apply to inquiries.
+    """
+    query = db.session.query(
+        Inquiry.id,
+        Inquiry.customer_id,
+        Inquiry.customer_name,
+        Inquiry.phone,
+        Inquiry.email,
+        Inquiry.hall_id,
+        Inquiry.message,
+        Inquiry.status,
+        Inquiry.created_at,
+        FunctionHall.name.label('hall_name'),
+        FunctionHall.location.label('hall_location')
+    ).outerjoin(FunctionHall, FunctionHall.id == Inquiry.hall_id)
+
+    if 'status' in filters:
+        query = query.filter(Inquiry.status.in_(filters['status']))
+    if 'hall_id' in filters:
+        query = query.filter(Inquiry.hall_id == filters['hall_id'])
+    if 'vendor_id' in filters:
+        query = query.filter(FunctionHall.vendor_id == filters['vendor_id'])
+    if 'customer_id' in filters:
+        query = query.filter(Inquiry.customer_id == filters['customer_id'])
+    if 'created_from' in filters:
+        query = query.filter(Inquiry.created_at >= datetime.combine(filters['created_from'], datetime.min.time()))
+    if 'created_to' in filters:
+        query = query.filter(Inquiry.created_at < datetime.combine(filters['created_to'] + timedelta(days=1), datetime.min.time()))
+    return query
+
+
+def serialize_inquiry_row(row):
+    return {
+        'id': row.id,
+        'customer_id': row.customer_id,
+        'customer_name': row.customer_name,
+        'customer_phone': row.phone,
+        'email': row.email,
+        'hall_id': row.hall_id,
+        'hall_name': row.hall_name,
+        'location': row.hall_location,
+        'message': row.message,
+        'status': row.status or 'Pending',
+        'created_at': row.created_at.isoformat() if row.created_at else None
+    }
+
+
+def _csv_chunks(rows, serialize, fields):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(serialize(row))
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows, serialize):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(serialize(row), default=str))
+        if len(lines) == ROWS_PER_CHUNK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(query, serialize, fields, fmt, name):
+    """Streaming download of an ordered query; rows are fetched EXPORT_BATCH_SIZE at a time"""
+    rows = query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+    if fmt == 'csv':
+        chunks, mimetype = _csv_chunks(rows, serialize, fields), 'text/csv'
+    else:
+        chunks, mimetype = _ndjson_chunks(rows, serialize), 'application/x-ndjson'
+
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+def export_bookings(filters, sort, fmt):
+    columns, descending, _, _ = BOOKING_SORTS[sort]
+    query = booking_list_query(filters).order_by(*[c.desc() if descending else c.asc() for c in columns])
+    return stream_export(query, serialize_booking_row, BOOKING_EXPORT_FIELDS, fmt, 'bookings')
+
+
+def export_inquiries(filters, fmt):
+    query = inquiry_list_query(filters).order_by(Inquiry.id.desc())
+    return stream_export(query, serialize_inquiry_row, INQUIRY_EXPORT_FIELDS, fmt, 'inquiries')
@@ -0,0 +1,69 @@
+import math
+from sqlalchemy import or_
+
+# -------------------------
+# Geo Grid Bucketing
+# -------------------------
+# The globe is cut into GRID_DEG x GRID_DEG cells numbered row-major:
+#   cell = row * GRID_COLS + col
+# A hall's cell is stored in FunctionHall.geo_cell (B-tree indexed). A radius
+# search turns into one index range per grid row covered by the bounding box,
+# then exact haversine distances are computed only for those candidates.
+
+GRID_DEG = 0.1  # ~11 km of latitude per row
+GRID_ROWS = int(180 / GRID_DEG)
+GRID_COLS = int(360 / GRID_DEG)
+EARTH_RADIUS_KM = 6371.0
+MAX_RADIUS_KM = 200
+
+
+def valid_coordinates(lat, lon):
+    return lat is not None and lon is not None and -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+def parse_coordinates(data):
+    """Read latitude/longitude from request data; (None, None) when missing or out of range"""
+    try:
+        lat, lon = float(data.get('latitude')), float(data.get('longitude'))
+    except (TypeError, ValueError):
+        return None, None
+    return (lat, lon) if valid_coordinates(lat, lon) else (None, None)
+
+
+def _row(lat):
+    return min(int((lat + 90) / GRID_DEG), GRID_ROWS - 1)
+
+
+def _col(lon):
+    return min(int((lon + 180) / GRID_DEG), GRID_COLS - 1)
+
+
+def cell_for(lat, lon):
+    """Grid cell id for a coordinate"""
+    return _row(lat) * GRID_COLS + _col(lon)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in km"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def cell_range_filter(cell_column, lat, lon, radius_km):
+    """
+    SQL condition matching every grid cell that intersects the bounding box of the circle.
+    Emits one BETWEEN per grid row so each is a single B-tree range scan.
+    """
+    lat_delta = radius_km / 111.32
+    # Widest longitude span is at the box edge nearest a pole
+    edge_lat = min(abs(lat) + lat_delta, 89.9)
+    lon_delta = radius_km / (111.32 * math.cos(math.radians(edge_lat)))
+
+    row_min, row_max = _row(max(lat - lat_delta, -90)), _row(min(lat + lat_delta, 90))
+    col_min, col_max = _col(max(lon - lon_delta, -180)), _col(min(lon + lon_delta, 180))
+
+    return or_(*[
+        cell_column.between(row * GRID_COLS + col_min, row * GRID_COLS + col_max)
+        for row in range(row_min, row_max + 1)
+    ])
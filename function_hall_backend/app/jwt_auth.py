@@ -0,0 +1,166 @@
+import os
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+import jwt
+from flask import g, jsonify, request
+from app import db
+from app.models import AdminUser, Customer
+from app.cache import TTLCache
+
+# -------------------------
+# Shared JWT Authentication
+# -------------------------
+# Verified tokens are cached (token -> principal) for a short TTL, so repeat
+# calls skip both the signature check and the user lookup. An entry never
+# outlives its token's exp. Anything that changes who a user is - vendor
+# approval, role change, customer approval - must call invalidate_principal().
+
+SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
+
+principal_cache = TTLCache(
+    maxsize=int(os.environ.get('AUTH_PRINCIPAL_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('AUTH_PRINCIPAL_CACHE_TTL', 60))
+)
+
+
+def bearer_token():
+    """Token from 'Authorization: Bearer <token>', or None"""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    return auth_header.split(' ')[1]
+
+
+def _load_principal(kind, payload):
+    if kind == 'admin':
+        row = db.session.query(AdminUser.id, AdminUser.role, AdminUser.is_approved).filter_by(
+            id=payload.get('admin_id')).first()
+        return row and {'kind': 'admin', 'id': row.id, 'role': row.role, 'is_approved': bool(row.is_approved)}
+    row = db.session.query(Customer.id, Customer.is_approved, Customer.approval_status).filter_by(
+        id=payload.get('customer_id')).first()
+    return row and {'kind': 'customer', 'id': row.id, 'role': 'customer',
+                    'is_approved': bool(row.is_approved), 'approval_status': row.approval_status}
+
+
+def resolve_principal(token, kind='admin'):
+    """
+    Principal dict (kind, id, role, is_approved) for a token, or None when its user no longer exists.
+    Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError like jwt.decode.
+    """
+    cached = principal_cache.get((kind, token))
+    if cached is not None:
+        return cached
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+    principal = _load_principal(kind, payload)
+    if principal:
+        ttl = principal_cache.ttl
+        if payload.get('exp'):
+            ttl = min(ttl, payload['exp'] - time.time())
+        if ttl > 0:
+            principal_cache.set((kind, token), principal, ttl=ttl)
+    return principal
+
+
+def invalidate_principal(kind, user_id):
+    """Forget cached principals of one admin or customer so their next request is re-checked"""
+    return principal_cache.invalidate_items(lambda key, principal: key[0] == kind and principal['id'] == user_id)
+
+
+def jwt_required(kind='admin', roles=None, forbidden="Unauthorized - Super admin access required"):
+    """
+    Require a valid bearer token for an admin (kind='admin') or customer (kind='customer').
+    roles limits admins by role. The principal is available as g.principal.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            token = bearer_token()
+            if not token:
+                return jsonify({"error": "Authorization token required"}), 401
+            try:
+                principal = resolve_principal(token, kind)
+            except jwt.ExpiredSignatureError:
+                return jsonify({"error": "Token expired"}), 401
+            except jwt.InvalidTokenError:
+                return jsonify({"error": "Invalid token"}), 401
+
+            if not principal or (roles and principal['role'] not in roles):
+                return jsonify({"error": forbidden}), 403
+            g.principal = principal
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+super_admin_required = jwt_required(roles=('super_admin',))
+
+
+# -------------------------
+# Customer Claims
+# -------------------------
+# check-auth answers from signed claims (the JWT payload, or the Flask session
+# cookie) instead of loading the customer on every page load. Claims carry the
+# display fields, approval status, the customer's auth_version and a short
+# expiry (AUTH_CLAIMS_TTL). They are trusted until they expire, or until this
+# worker has seen auth_version move past theirs; then one query refreshes them.
+# Anything that changes approval or profile fields must call bump_auth_version().
+#
+# auth_versions is per worker process, like every TTLCache (see app/cache.py):
+# a bump only reaches the worker that made it. Other workers keep trusting the
+# old claims until cexp, so a rejection or profile change can take up to
+# AUTH_CLAIMS_TTL seconds to show there. The TTL is capped at
+# AUTH_CLAIMS_MAX_TTL to keep that window short; the database auth_version is
+# what counts once claims expire.
+
+AUTH_CLAIMS_MAX_TTL = 60
+AUTH_CLAIMS_TTL = min(int(os.environ.get('AUTH_CLAIMS_TTL', 30)), AUTH_CLAIMS_MAX_TTL)
+CLAIM_FIELDS = ('id', 'name', 'email', 'phone', 'address', 'is_approved', 'approval_status')
+
+# customer id -> latest auth_version bumped in this worker; older claims have expired by the time an entry does
+auth_versions = TTLCache(maxsize=int(os.environ.get('AUTH_VERSION_CACHE_SIZE', 4096)), ttl=AUTH_CLAIMS_TTL)
+
+
+def customer_claims(customer):
+    """Signed-claim payload for a Customer row (or a row with the same columns)"""
+    claims = {field: getattr(customer, field) for field in CLAIM_FIELDS}
+    claims['is_approved'] = bool(claims['is_approved'])
+    claims['ver'] = customer.auth_version or 1
+    claims['cexp'] = int(time.time()) + AUTH_CLAIMS_TTL
+    return claims
+
+
+def claims_current(claims, customer_id=None):
+    """True while claims are unexpired and no newer auth_version is known"""
+    if not claims or (customer_id is not None and claims.get('id') != customer_id):
+        return False
+    if claims.get('cexp', 0) <= time.time():
+        return False
+    return claims.get('ver', 0) >= auth_versions.get(claims['id'], 0)
+
+
+def load_customer_claims(customer_id):
+    """Fresh claims from the database, or None when the customer no longer exists"""
+    row = db.session.query(
+        *(getattr(Customer, field) for field in CLAIM_FIELDS), Customer.auth_version
+    ).filter(Customer.id == customer_id).first()
+    return customer_claims(row) if row else None
+
+
+def bump_auth_version(customer):
+    """Make claims issued for this customer stale; runs in the caller's transaction"""
+    customer.auth_version = (customer.auth_version or 1) + 1
+    auth_versions.set(customer.id, customer.auth_version)
+    invalidate_principal('customer', customer.id)
+
+
+def customer_token(customer_id, claims, exp=None):
+    """Customer JWT carrying `claims`; exp defaults to 7 days from now"""
+    return jwt.encode({
+        'customer_id': customer_id,
+        'email': claims['email'],
+        'is_admin': False,
+        'claims': claims,
+        'exp': exp or datetime.utcnow() + timedelta(days=7)
+    }, SECRET_KEY, algorithm='HS256')
@@ -1,11 +1,30 @@
 from datetime import datetime
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.geo import cell_for, valid_coordinates
+from app.passwords import hash_password, verify_password, needs_rehash
+
+# -------------------------
+# Passwords
+# -------------------------
+class PasswordMixin:
+    """set_password/check_password over password_hash, using the parameters in app/passwords.py"""
+
+    def set_password(self, password):
+        self.password_hash = hash_password(password)
+
+    def check_password(self, password):
+        """Verify; on success a hash made with older parameters is replaced (caller commits)"""
+        if not verify_password(self.password_hash, password):
+            return False
+        if needs_rehash(self.password_hash):
+            self.password_hash = hash_password(password)
+        return True
+
 
 # -------------------------
 # Admin User Model
 # -------------------------
-class AdminUser(db.Model):
+class AdminUser(PasswordMixin, db.Model):
     __tablename__ = 'admin_users'
 
     id = db.Column(db.Integer, primary_key=True)
@@ -16,17 +35,12 @@ class AdminUser(db.Model):
     phone = db.Column(db.String(20))
     business_name = db.Column(db.String(150))  # For vendors
     is_approved = db.Column(db.Boolean, default=False)  # Vendors need approval
+    enquiry_sms_mode = db.Column(db.String(20))  # 'immediate' or 'digest'; None uses ENQUIRY_SMS_MODE
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship to halls (for vendors)
     halls = db.relationship('FunctionHall', backref='vendor', lazy=True)
 
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-
-    def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
-
     def __repr__(self):
         return f'<AdminUser {self.email}>'
 
@@ -44,7 +58,7 @@ class FunctionHall(db.Model):
     contact_number = db.Column(db.String(20))
     price_per_day = db.Column(db.Float)
     description = db.Column(db.Text)
-    vendor_id = db.Column(db.Integer, db.ForeignKey('admin_users.id'), nullable=True)  # Link to vendor
+    vendor_id = db.Column(db.Integer, db.ForeignKey('admin_users.id'), nullable=True, index=True)  # Link to vendor
     is_approved = db.Column(db.Boolean, default=False)  # Super admin approval required
     approval_status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
     
@@ -55,6 +69,11 @@ class FunctionHall(db.Model):
     has_dining_hall = db.Column(db.Boolean, default=True)  # Dining hall available
     has_kitchen = db.Column(db.Boolean, default=True)  # Kitchen with utensils available
 
+    # Geo position for radius search
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geo_cell = db.Column(db.Integer, index=True)  # Grid bucket from app.geo.cell_for, kept in sync by set_coordinates
+
     # Relationships
     packages = db.relationship('Package', backref='hall', lazy=True)
     bookings = db.relationship('Booking', backref='hall', lazy=True)
@@ -64,13 +83,34 @@ class FunctionHall(db.Model):
     functional_rooms = db.relationship('FunctionalRoom', backref='hall', lazy=True)
     guest_rooms = db.relationship('GuestRoom', backref='hall', lazy=True)
 
+    def set_coordinates(self, latitude, longitude):
+        if valid_coordinates(latitude, longitude):
+            self.latitude = latitude
+            self.longitude = longitude
+            self.geo_cell = cell_for(latitude, longitude)
+        else:
+            self.latitude = self.longitude = self.geo_cell = None
+
     def __repr__(self):
         return f'<FunctionHall {self.name}>'
+
+
+# Sort keys for hall listings - NULL price/capacity sort as 0 so keyset cursors stay totally ordered
+HALL_PRICE_KEY = db.func.coalesce(FunctionHall.price_per_day, db.literal_column('0'))
+HALL_CAPACITY_KEY = db.func.coalesce(FunctionHall.capacity, db.literal_column('0'))
+
+db.Index('ix_function_halls_price_key', HALL_PRICE_KEY, FunctionHall.id)
+db.Index('ix_function_halls_capacity_key', HALL_CAPACITY_KEY, FunctionHall.id)
+
 # -------------------------
 # Hall Photo Model
 # -------------------------
 class HallPhoto(db.Model):
     __tablename__ = 'hall_photos'
+    __table_args__ = (
+        # Photo loads per hall, first photo is the primary one
+        db.Index('ix_hall_photos_hall_id_id', 'hall_id', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     hall_id = db.Column(db.Integer, db.ForeignKey('function_halls.id'), nullable=False)
@@ -138,7 +178,7 @@ class GuestRoom(db.Model):
 # -------------------------
 # Customer Model (B2C)
 # -------------------------
-class Customer(db.Model):
+class Customer(PasswordMixin, db.Model):
     __tablename__ = 'customers'
 
     id = db.Column(db.Integer, primary_key=True)
@@ -149,17 +189,12 @@ class Customer(db.Model):
     password_hash = db.Column(db.String(256))
     is_approved = db.Column(db.Boolean, default=False)  # Super admin approval required
     approval_status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
+    auth_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # bumped by bump_auth_version
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     bookings = db.relationship('Booking', backref='customer', lazy=True)
     inquiries = db.relationship('Inquiry', backref='customer', lazy=True)
 
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-    
-    def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
-
     def __repr__(self):
         return f'<Customer {self.name}>'
 
@@ -167,8 +202,21 @@ class Customer(db.Model):
 # -------------------------
 # Booking Model
 # -------------------------
+
+# Booking statuses that block a hall for the event date
+ACTIVE_BOOKING_STATUSES = ['Confirmed', 'Pending']
+
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        # Availability lookups filter on hall + date + status
+        db.Index('ix_bookings_hall_date_status', 'hall_id', 'event_date', 'status'),
+        # Listing filters and keyset orderings
+        db.Index('ix_bookings_customer_id', 'customer_id'),
+        db.Index('ix_bookings_event_date_id', 'event_date', 'id'),
+        db.Index('ix_bookings_status_id', 'status', 'id'),
+        db.Index('ix_bookings_created_at', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
@@ -183,6 +231,20 @@ class Booking(db.Model):
         return f'<Booking {self.id} - {self.status}>'
 
 
+# At most one active booking per hall per day, enforced by the database so concurrent requests can't double-book
+db.Index(
+    'uq_bookings_active_hall_date', Booking.hall_id, Booking.event_date, unique=True,
+    postgresql_where=Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+    sqlite_where=Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+)
+
+
+def is_double_booking(error):
+    """True when an IntegrityError came from uq_bookings_active_hall_date"""
+    message = str(getattr(error, 'orig', error))
+    return 'uq_bookings_active_hall_date' in message or 'bookings.hall_id, bookings.event_date' in message
+
+
 # -------------------------
 # Inquiry Model
 # -------------------------
@@ -207,10 +269,19 @@ class Inquiry(db.Model):
 # Notification Model
 # -------------------------
 class Notification(db.Model):
+    """
+    In-app notifications, and the outbox for outgoing SMS (channel='sms').
+    SMS rows are written in the same transaction as the change they announce
+    and delivered later by notification_worker.py.
+    """
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Worker picks due outbox rows
+        db.Index('ix_notifications_outbox', 'channel', 'status', 'next_attempt_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    recipient_email = db.Column(db.String(100), nullable=False)  # Vendor/owner email
+    recipient_email = db.Column(db.String(100))  # Vendor/owner email
     recipient_name = db.Column(db.String(100))
     subject = db.Column(db.String(200))
     message = db.Column(db.Text, nullable=False)
@@ -218,10 +289,66 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Outbox delivery
+    channel = db.Column(db.String(20), default='in_app')  # 'in_app' or 'sms'
+    recipient_phone = db.Column(db.String(20))
+    status = db.Column(db.String(20))  # SMS: 'pending', 'sending', 'sent', 'failed'
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime)  # Due time while pending, lease expiry while sending
+    last_error = db.Column(db.Text)
+    provider_id = db.Column(db.String(64))  # Twilio message SID
+    sent_at = db.Column(db.DateTime)
+
     def __repr__(self):
         return f'<Notification to {self.recipient_email}>'
 
 
+# -------------------------
+# Enquiry Digest Queue
+# -------------------------
+class EnquiryDigestItem(db.Model):
+    """An enquiry waiting to go out in its owner's next digest SMS; due_at is the end of its window"""
+    __tablename__ = 'enquiry_digest_items'
+    __table_args__ = (
+        # Flushes read due windows in time order, grouped by recipient
+        db.Index('ix_enquiry_digest_due', 'due_at', 'recipient_phone'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient_phone = db.Column(db.String(20), nullable=False)
+    recipient_name = db.Column(db.String(100))
+    due_at = db.Column(db.DateTime, nullable=False)
+    inquiry_id = db.Column(db.Integer)
+    hall_name = db.Column(db.String(100))
+    customer_name = db.Column(db.String(100))
+    customer_phone = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<EnquiryDigestItem {self.recipient_phone} @ {self.due_at}>'
+
+
+# -------------------------
+# OTP Codes
+# -------------------------
+class OTPCode(db.Model):
+    """A pending phone verification code for the database OTP store (app/otp_store.py)"""
+    __tablename__ = 'otp_codes'
+    __table_args__ = (
+        # Sweeps delete expired rows in expiry order
+        db.Index('ix_otp_codes_expires_at', 'expires_at'),
+    )
+
+    phone = db.Column(db.String(30), primary_key=True)  # country code + number
+    code_hash = db.Column(db.String(64), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<OTPCode {self.phone}>'
+
+
 # -------------------------
 # Partner / Vendor Model (B2B)
 # -------------------------
@@ -244,6 +371,10 @@ class Partner(db.Model):
 # -------------------------
 class Calendar(db.Model):
     __tablename__ = 'calendar'
+    __table_args__ = (
+        # One row per hall-day; also serves month range reads
+        db.Index('uq_calendar_hall_date', 'hall_id', 'date', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     hall_id = db.Column(db.Integer, db.ForeignKey('function_halls.id'), nullable=False)
@@ -254,6 +385,30 @@ class Calendar(db.Model):
         return f'<Calendar {self.date} - {self.is_booked}>'
 
 
+# -------------------------
+# Daily Hall Stats (rollup)
+# -------------------------
+class DailyHallStats(db.Model):
+    """Per hall, per day activity totals; the day is when the booking/inquiry was made"""
+    __tablename__ = 'daily_hall_stats'
+    __table_args__ = (
+        db.Index('uq_daily_hall_stats_hall_day', 'hall_id', 'day', unique=True),
+        db.Index('ix_daily_hall_stats_day', 'day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    hall_id = db.Column(db.Integer, db.ForeignKey('function_halls.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    bookings = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    confirmed_bookings = db.Column(db.Integer, nullable=False, default=0)
+    confirmed_revenue = db.Column(db.Float, nullable=False, default=0)
+    inquiries = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DailyHallStats {self.hall_id} {self.day}>'
+
+
 # -------------------------
 # Hall Change Request Model
 # -------------------------
@@ -1,10 +1,12 @@
+import os
 import random
 import string
-from datetime import datetime, timedelta
 from sms_utils import send_sms
+from app.otp_store import get_otp_store
 
-# In-memory storage for OTPs (in production, use Redis or database)
-otp_storage = {}
+# Pending OTPs live in the shared store from app/otp_store.py (OTP_STORE env)
+OTP_TTL_MINUTES = int(os.environ.get('OTP_TTL_MINUTES', 10))
+OTP_MAX_ATTEMPTS = 3
 
 # Development mode - set to True to use fixed OTP (123456) for testing
 DEV_MODE = False  # Set to False to send real SMS
@@ -25,13 +27,9 @@ def send_otp(phone_number, country_code='+91'):
         # Generate 6-digit OTP
         otp = generate_otp(6)
         
-        # Store OTP with expiry (10 minutes)
+        # Store OTP with expiry
         key = f"{country_code}{phone_number}"
-        otp_storage[key] = {
-            'otp': otp,
-            'expiry': datetime.now() + timedelta(minutes=10),
-            'attempts': 0
-        }
+        get_otp_store().put(key, otp, OTP_TTL_MINUTES * 60)
         
         # In development mode, always return success and log OTP
         if DEV_MODE:
@@ -51,7 +49,7 @@ def send_otp(phone_number, country_code='+91'):
         full_phone = f"{country_code}{phone_number}"
         
         # Send SMS
-        message = f"Your GenS Services verification code is: {otp}. Valid for 10 minutes."
+        message = f"Your GenS Services verification code is: {otp}. Valid for {OTP_TTL_MINUTES} minutes."
         sms_result = send_sms(full_phone, message)
         
         if sms_result.get('success'):
@@ -76,46 +74,29 @@ def verify_otp(phone_number, otp, country_code='+91'):
     Returns: dict with success status and message
     """
     key = f"{country_code}{phone_number}"
-    
-    # Check if OTP exists
-    if key not in otp_storage:
+    outcome, attempts = get_otp_store().check(key, otp, OTP_MAX_ATTEMPTS)
+
+    if outcome == 'verified':
+        return {
+            'success': True,
+            'message': 'Phone number verified successfully'
+        }
+    if outcome == 'missing':
         return {
             'success': False,
             'message': 'OTP not found. Please request a new one.'
         }
-    
-    stored_data = otp_storage[key]
-    
-    # Check if OTP has expired
-    if datetime.now() > stored_data['expiry']:
-        del otp_storage[key]
+    if outcome == 'expired':
         return {
             'success': False,
             'message': 'OTP has expired. Please request a new one.'
         }
-    
-    # Check attempts
-    if stored_data['attempts'] >= 3:
-        del otp_storage[key]
+    if outcome == 'locked':
         return {
             'success': False,
             'message': 'Too many failed attempts. Please request a new OTP.'
         }
-    
-    # Verify OTP
-    if stored_data['otp'] == otp:
-        # OTP is correct, remove it from storage
-        del otp_storage[key]
-        return {
-            'success': True,
-            'message': 'Phone number verified successfully'
-        }
-    else:
-        # Increment failed attempts
-        stored_data['attempts'] += 1
-        otp_storage[key] = stored_data
-        
-        return {
-            'success': False,
-            'message': f'Invalid OTP. {3 - stored_data["attempts"]} attempts remaining.'
-        }
+    return {
+        'success': False,
+        'message': f'Invalid OTP. {OTP_MAX_ATTEMPTS - attempts} attempts remaining.'
+    }
@@ -0,0 +1,255 @@
+import heapq
+import hashlib
+import hmac
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from app import db
+from app.models import OTPCode
+from app.jwt_auth import SECRET_KEY
+
+# -------------------------
+# OTP Stores
+# -------------------------
+# Pending verification codes must be visible to every gunicorn worker, so the
+# default store is the otp_codes table. OTP_STORE picks the backend:
+#   'database' - otp_codes table, expired rows swept by expires_at index
+#   'redis'    - any Redis-compatible server at OTP_REDIS_URL (pip install redis)
+#   'memory'   - this process only; for local development with one worker
+#
+# check() is one atomic step per backend - a guarded UPDATE ... RETURNING, a
+# Lua script, or a lock - so parallel guesses can never exceed max_attempts.
+# Codes are stored as HMACs, never in plain text.
+#
+# check() outcomes: 'verified', 'invalid', 'expired', 'locked', 'missing'
+
+OTP_STORE = os.environ.get('OTP_STORE', 'database')
+OTP_REDIS_URL = os.environ.get('OTP_REDIS_URL', 'redis://localhost:6379/0')
+OTP_SWEEP_BATCH = 1000
+
+
+def code_hash(phone, code):
+    return hmac.new(SECRET_KEY.encode(), f"{phone}:{code}".encode(), hashlib.sha256).hexdigest()
+
+
+class OTPStore(ABC):
+    """Holds at most one pending code per phone"""
+    name = 'base'
+
+    @abstractmethod
+    def put(self, phone, code, ttl):
+        """Store a new code for `phone`, replacing any pending one and resetting attempts"""
+
+    @abstractmethod
+    def check(self, phone, code, max_attempts):
+        """Count one attempt and compare; returns (outcome, attempts used). A verified code is consumed."""
+
+    def sweep(self, now=None):
+        """Drop expired codes; returns how many were removed"""
+        return 0
+
+
+class MemoryOTPStore(OTPStore):
+    """
+    Per-process store. Expiries sit in a min-heap, so a sweep pops exactly the
+    expired entries; it runs on every put/check, so memory stays bounded by the
+    codes that are still live.
+    """
+    name = 'memory'
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.entries = {}  # phone -> [code_hash, attempts, expires_at]
+        self.expiries = []  # (expires_at, phone); replaced codes leave stale items that pop as no-ops
+        self._lock = threading.Lock()
+
+    def _sweep(self, now):
+        removed = 0
+        while self.expiries and self.expiries[0][0] <= now:
+            expires_at, phone = heapq.heappop(self.expiries)
+            entry = self.entries.get(phone)
+            if entry and entry[2] == expires_at:
+                del self.entries[phone]
+                removed += 1
+        return removed
+
+    def put(self, phone, code, ttl):
+        with self._lock:
+            now = self.clock()
+            self._sweep(now)
+            expires_at = now + ttl
+            self.entries[phone] = [code_hash(phone, code), 0, expires_at]
+            heapq.heappush(self.expiries, (expires_at, phone))
+
+    def check(self, phone, code, max_attempts):
+        with self._lock:
+            now = self.clock()
+            entry = self.entries.get(phone)
+            if entry and entry[2] <= now:
+                self._sweep(now)
+                return 'expired', entry[1]
+            self._sweep(now)
+            if not entry:
+                return 'missing', 0
+            if entry[1] >= max_attempts:
+                del self.entries[phone]
+                return 'locked', entry[1]
+            entry[1] += 1
+            if hmac.compare_digest(entry[0], code_hash(phone, code)):
+                del self.entries[phone]
+                return 'verified', entry[1]
+            return 'invalid', entry[1]
+
+    def sweep(self, now=None):
+        with self._lock:
+            return self._sweep(self.clock() if now is None else now)
+
+
+class DatabaseOTPStore(OTPStore):
+    """otp_codes table; shared by every worker that uses the database"""
+    name = 'database'
+
+    def put(self, phone, code, ttl):
+        from app.availability import dialect_insert
+
+        now = datetime.utcnow()
+        values = {
+            'phone': phone,
+            'code_hash': code_hash(phone, code),
+            'attempts': 0,
+            'expires_at': now + timedelta(seconds=ttl),
+            'created_at': now
+        }
+        stmt = dialect_insert(OTPCode.__table__).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['phone'],
+            set_={key: stmt.excluded[key] for key in ('code_hash', 'attempts', 'expires_at', 'created_at')}
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+
+    def check(self, phone, code, max_attempts):
+        table = OTPCode.__table__
+        now = datetime.utcnow()
+        # Claim an attempt and read the code in one statement; the row lock
+        # serialises concurrent guesses for the same phone
+        row = db.session.execute(
+            table.update().where(
+                table.c.phone == phone,
+                table.c.expires_at > now,
+                table.c.attempts < max_attempts
+            ).values(attempts=table.c.attempts + 1).returning(table.c.code_hash, table.c.attempts)
+        ).first()
+
+        if row is None:
+            current = db.session.execute(
+                db.select(table.c.attempts, table.c.expires_at).where(table.c.phone == phone)
+            ).first()
+            if current is None:
+                db.session.commit()
+                return 'missing', 0
+            db.session.execute(table.delete().where(table.c.phone == phone))
+            db.session.commit()
+            return ('expired' if current.expires_at <= now else 'locked'), current.attempts
+
+        if hmac.compare_digest(row.code_hash, code_hash(phone, code)):
+            consumed = db.session.execute(
+                table.delete().where(table.c.phone == phone, table.c.code_hash == row.code_hash)
+            ).rowcount
+            db.session.commit()
+            # A parallel request may have verified (and consumed) the same code first
+            return ('verified' if consumed else 'missing'), row.attempts
+        db.session.commit()
+        return 'invalid', row.attempts
+
+    def sweep(self, now=None):
+        """Deletes in batches off ix_otp_codes_expires_at, touching only expired rows"""
+        table = OTPCode.__table__
+        now = now or datetime.utcnow()
+        removed = 0
+        while True:
+            expired = db.select(table.c.phone).where(table.c.expires_at <= now).order_by(
+                table.c.expires_at).limit(OTP_SWEEP_BATCH)
+            count = db.session.execute(table.delete().where(table.c.phone.in_(expired.scalar_subquery()))).rowcount
+            db.session.commit()
+            removed += count
+            if count < OTP_SWEEP_BATCH:
+                return removed
+
+
+# Attempt check and consume as one server-side step
+_REDIS_CHECK = """
+local stored = redis.call('HGET', KEYS[1], 'code')
+if not stored then return {'missing', 0} end
+local attempts = tonumber(redis.call('HGET', KEYS[1], 'attempts'))
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1])
+    return {'locked', attempts}
+end
+attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+if stored == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return {'verified', attempts}
+end
+return {'invalid', attempts}
+"""
+
+
+class RedisOTPStore(OTPStore):
+    """
+    One hash per phone with a native TTL. Redis expires keys itself, so
+    sweep() has nothing to do and an expired code reads as 'missing'.
+    """
+    name = 'redis'
+
+    def __init__(self, url=OTP_REDIS_URL, prefix='otp:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._check = self.client.register_script(_REDIS_CHECK)
+
+    def put(self, phone, code, ttl):
+        key = self.prefix + phone
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.hset(key, mapping={'code': code_hash(phone, code), 'attempts': 0})
+        pipe.expire(key, int(ttl))
+        pipe.execute()
+
+    def check(self, phone, code, max_attempts):
+        outcome, attempts = self._check(keys=[self.prefix + phone], args=[code_hash(phone, code), max_attempts])
+        return (outcome.decode() if isinstance(outcome, bytes) else outcome), int(attempts)
+
+
+def build_store(name=None):
+    name = (name or OTP_STORE).lower()
+    if name == 'redis':
+        return RedisOTPStore()
+    if name == 'memory':
+        return MemoryOTPStore()
+    return DatabaseOTPStore()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_otp_store():
+    """The process-wide OTP store, created on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = build_store()
+    return _store
+
+
+def set_otp_store(store):
+    """Swap the process-wide OTP store (tests, benchmarks); returns the previous one"""
+    global _store
+    with _store_lock:
+        previous, _store = _store, store
+    return previous
@@ -0,0 +1,127 @@
+import os
+import random
+from datetime import datetime, timedelta
+from app import db
+from app.models import Notification
+
+# -------------------------
+# SMS Outbox
+# -------------------------
+# Request handlers only queue_sms() inside their own transaction - no provider
+# calls on the request path. notification_worker.py claims due rows, sends
+# them and records the outcome. Failed sends are retried with exponential
+# backoff until OUTBOX_MAX_ATTEMPTS, then left as 'failed'.
+#
+# Claiming moves rows to 'sending' with next_attempt_at as a lease; a worker
+# that dies mid-batch leaves rows that become claimable again once it expires.
+
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 6))
+OUTBOX_BACKOFF_BASE = float(os.environ.get('OUTBOX_BACKOFF_BASE', 30))  # seconds
+OUTBOX_BACKOFF_MAX = float(os.environ.get('OUTBOX_BACKOFF_MAX', 3600))
+OUTBOX_LEASE_SECONDS = int(os.environ.get('OUTBOX_LEASE_SECONDS', 300))
+
+
+def queue_sms(phone, message, recipient_name=None, subject=None, booking_id=None, send_at=None):
+    """Add an SMS to the outbox in the current transaction; it is sent once the caller commits"""
+    notification = Notification(
+        channel='sms',
+        status='pending',
+        recipient_phone=phone,
+        recipient_name=recipient_name,
+        subject=subject,
+        message=message,
+        booking_id=booking_id,
+        attempts=0,
+        next_attempt_at=send_at or datetime.utcnow()
+    )
+    db.session.add(notification)
+    return notification
+
+
+def backoff_seconds(attempts):
+    """Delay before retry number `attempts`: exponential with +/-20% jitter, capped"""
+    delay = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_due(limit, now=None):
+    """
+    Lease up to `limit` due SMS rows to this worker and commit the claim.
+    Uses FOR UPDATE SKIP LOCKED on PostgreSQL so several workers never claim the same row.
+    """
+    now = now or datetime.utcnow()
+    query = Notification.query.filter(
+        Notification.channel == 'sms',
+        Notification.status.in_(['pending', 'sending']),
+        Notification.next_attempt_at <= now
+    ).order_by(Notification.next_attempt_at, Notification.id).limit(limit)
+    if db.engine.dialect.name == 'postgresql':
+        query = query.with_for_update(skip_locked=True)
+
+    claimed = query.all()
+    for notification in claimed:
+        notification.status = 'sending'
+        notification.attempts = (notification.attempts or 0) + 1
+        notification.next_attempt_at = now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+    db.session.commit()
+    return claimed
+
+
+def record_result(notification, result, now=None):
+    """Apply a send_sms result: sent, retry later, or give up after OUTBOX_MAX_ATTEMPTS"""
+    now = now or datetime.utcnow()
+    if result.get('success'):
+        notification.status = 'sent'
+        notification.sent_at = now
+        notification.provider_id = result.get('sid')
+        notification.last_error = None
+        notification.next_attempt_at = None
+    elif notification.attempts >= OUTBOX_MAX_ATTEMPTS:
+        notification.status = 'failed'
+        notification.last_error = result.get('error') or result.get('message')
+        notification.next_attempt_at = None
+    else:
+        notification.status = 'pending'
+        notification.last_error = result.get('error') or result.get('message')
+        notification.next_attempt_at = now + timedelta(seconds=backoff_seconds(notification.attempts))
+
+
+def deliver_batch(send_batch, limit=50):
+    """
+    Claim, send and record one batch. send_batch takes [(phone, message), ...]
+    and returns one result dict per message. Returns the number of rows processed.
+    """
+    claimed = claim_due(limit)
+    if not claimed:
+        return 0
+    try:
+        results = send_batch([(n.recipient_phone, n.message) for n in claimed])
+    except Exception as e:
+        results = [{'success': False, 'error': str(e)}] * len(claimed)
+
+    for notification, result in zip(claimed, results):
+        record_result(notification, result)
+    db.session.commit()
+    return len(claimed)
+
+
+def outbox_stats():
+    """SMS outbox row counts by status"""
+    rows = db.session.query(Notification.status, db.func.count(Notification.id)).filter(
+        Notification.channel == 'sms'
+    ).group_by(Notification.status).all()
+    return {status: count for status, count in rows}
+
+
+def retry_failed(ids=None):
+    """Put failed SMS back in the queue (all of them, or just `ids` - an empty list re-queues none); caller commits"""
+    if ids is not None and not ids:
+        return 0
+    query = Notification.query.filter(Notification.channel == 'sms', Notification.status == 'failed')
+    if ids is not None:
+        query = query.filter(Notification.id.in_(ids))
+    return query.update({
+        'status': 'pending',
+        'attempts': 0,
+        'next_attempt_at': datetime.utcnow()
+    }, synchronize_session=False)
@@ -0,0 +1,93 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# -------------------------
+# Password Hashing
+# -------------------------
+# One place for the hash algorithm and cost. Hashes are werkzeug strings
+# ('method$salt$hash'), so a stored hash records the parameters it was made
+# with; anything not matching the current method is upgraded on the next
+# successful login (see PasswordMixin in app/models.py).
+#
+# PASSWORD_HASH_ALGORITHM: 'pbkdf2' (sha256) or 'scrypt'
+# PASSWORD_HASH_COST: pbkdf2 iterations, or the scrypt N parameter (r=8, p=1)
+#
+# Hashing is deliberately slow, so it runs on a small dedicated pool
+# (PASSWORD_HASH_WORKERS, default: one per CPU). At most PASSWORD_HASH_QUEUE
+# more hashes may wait behind it; past that a request gives up after
+# PASSWORD_HASH_WAIT seconds with PasswordHashBusy (a 503) instead of
+# tying up a request thread behind a login burst.
+
+PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM', 'pbkdf2').lower()
+DEFAULT_COSTS = {'pbkdf2': 600000, 'scrypt': 32768}
+PASSWORD_HASH_COST = int(os.environ.get('PASSWORD_HASH_COST', DEFAULT_COSTS.get(PASSWORD_HASH_ALGORITHM, 600000)))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 16))
+PASSWORD_HASH_WAIT = float(os.environ.get('PASSWORD_HASH_WAIT', 2))
+
+
+class PasswordHashBusy(Exception):
+    """Too many hashes in flight; the caller should answer 503 and let the client retry"""
+
+
+def hash_method(algorithm=PASSWORD_HASH_ALGORITHM, cost=PASSWORD_HASH_COST):
+    """werkzeug method string for an algorithm and cost"""
+    if algorithm == 'scrypt':
+        return f'scrypt:{cost}:8:1'
+    if algorithm == 'pbkdf2':
+        return f'pbkdf2:sha256:{cost}'
+    raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+
+
+PASSWORD_HASH_METHOD = hash_method()
+
+
+class HashExecutor:
+    """Thread pool with a hard cap on queued work"""
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, queue=PASSWORD_HASH_QUEUE, wait=PASSWORD_HASH_WAIT):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pwhash')
+        self.slots = threading.BoundedSemaphore(workers + queue)
+        self.wait = wait
+
+    def run(self, fn, *args):
+        if not self.slots.acquire(timeout=self.wait):
+            raise PasswordHashBusy("Password hashing is busy")
+        try:
+            future = self.pool.submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor():
+    """The process-wide hash executor, created on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = HashExecutor()
+    return _executor
+
+
+def hash_password(password, method=None):
+    return get_hash_executor().run(generate_password_hash, password, method or PASSWORD_HASH_METHOD)
+
+
+def verify_password(password_hash, password):
+    if not password_hash or password is None:
+        return False
+    return get_hash_executor().run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash, method=None):
+    """True when a stored hash was made with other parameters than the current ones"""
+    return password_hash.split('$', 1)[0] != (method or PASSWORD_HASH_METHOD)
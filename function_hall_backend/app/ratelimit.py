@@ -0,0 +1,213 @@
+import os
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from flask import jsonify, request
+
+# -------------------------
+# Request Rate Limiting
+# -------------------------
+# Token buckets per endpoint, per client IP and per phone/account, checked in
+# the decorator before the view runs - a throttled request never reaches the
+# database or the SMS provider. Buckets are checked most specific first and
+# the first empty one rejects, so one noisy phone cannot drain the IP or
+# endpoint budget for everyone else.
+#
+# Limits are 'count/seconds': a bucket holds `count` tokens and refills at
+# count/seconds per second. Override any of them with RATELIMIT_<NAME>_<SCOPE>,
+# e.g. RATELIMIT_OTP_SEND_PHONE=5/600.
+#
+# RATELIMIT_STORE picks where buckets live: 'memory' (default; per worker, so
+# the effective limit is multiplied by the worker count) or 'redis'
+# (RATELIMIT_REDIS_URL, shared by every worker; pip install redis).
+
+RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'True').lower() in ('true', '1', 'yes')
+RATELIMIT_STORE = os.environ.get('RATELIMIT_STORE', 'memory')
+RATELIMIT_REDIS_URL = os.environ.get('RATELIMIT_REDIS_URL', 'redis://localhost:6379/0')
+RATELIMIT_MAX_KEYS = int(os.environ.get('RATELIMIT_MAX_KEYS', 100000))
+RATELIMIT_PROXY_HOPS = int(os.environ.get('RATELIMIT_PROXY_HOPS', 0))  # trusted proxies in front of the app
+
+LIMITS = {
+    'otp_send': {'phone': '3/600', 'ip': '10/600', 'endpoint': '120/60'},
+    'enquiry': {'phone': '5/3600', 'ip': '20/3600', 'endpoint': '300/60'},
+    'customer_login': {'account': '10/600', 'ip': '30/600', 'endpoint': '600/60'},
+}
+SCOPE_ORDER = ('phone', 'account', 'ip', 'endpoint')
+
+
+def parse_limit(spec):
+    """'count/seconds' -> (capacity, tokens per second)"""
+    count, seconds = spec.split('/')
+    return float(count), float(count) / float(seconds)
+
+
+@lru_cache(maxsize=None)
+def limits_for(name):
+    """((scope, capacity, rate), ...) for an endpoint, most specific scope first; parsed once per process"""
+    configured = LIMITS[name]
+    return tuple(
+        (scope, *parse_limit(os.environ.get(f'RATELIMIT_{name.upper()}_{scope.upper()}', configured[scope])))
+        for scope in SCOPE_ORDER if scope in configured
+    )
+
+
+class MemoryBucketStore:
+    """Buckets in this process; least recently used keys are dropped past max_keys (a dropped bucket is simply full)"""
+    name = 'memory'
+
+    def __init__(self, max_keys=RATELIMIT_MAX_KEYS, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()  # key -> [tokens, updated]
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        """Spend one token; returns (allowed, seconds until one is available)"""
+        with self._lock:
+            now = self.clock()
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0.0
+            return False, (1 - bucket[0]) / rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# Refill and spend in one server-side step
+_REDIS_TAKE = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed, wait = 0, (1 - tokens) / rate
+if tokens >= 1 then
+    tokens, allowed, wait = tokens - 1, 1, 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+class RedisBucketStore:
+    """Buckets shared by every worker on a Redis-compatible server; keys expire once a bucket would be full"""
+    name = 'redis'
+
+    def __init__(self, url=RATELIMIT_REDIS_URL, prefix='ratelimit:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(_REDIS_TAKE)
+
+    def take(self, key, capacity, rate):
+        allowed, wait = self._take(keys=[self.prefix + key], args=[capacity, rate, time.time()])
+        return bool(allowed), float(wait)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def build_store(name=None):
+    name = (name or RATELIMIT_STORE).lower()
+    if name == 'redis':
+        return RedisBucketStore()
+    return MemoryBucketStore()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    """The process-wide bucket store, created on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = build_store()
+    return _store
+
+
+def set_bucket_store(store):
+    """Swap the process-wide bucket store (tests, benchmarks); returns the previous one"""
+    global _store
+    with _store_lock:
+        previous, _store = _store, store
+    return previous
+
+
+def client_ip():
+    """Caller's address; with RATELIMIT_PROXY_HOPS set, taken from X-Forwarded-For past our own proxies"""
+    if RATELIMIT_PROXY_HOPS:
+        route = request.access_route
+        if len(route) >= RATELIMIT_PROXY_HOPS:
+            return route[-RATELIMIT_PROXY_HOPS]
+    return request.remote_addr or 'unknown'
+
+
+def phone_key(value):
+    """Last 10 digits, so '+91 98765-43210', '098765 43210' and '9876543210' share a bucket"""
+    digits = ''.join(ch for ch in str(value or '') if ch.isdigit())
+    return digits[-10:] or None
+
+
+def check_limits(name, subjects):
+    """
+    Spend one token from each bucket for `name`, stopping at the first empty one.
+    subjects maps scope -> identifier ('ip', 'phone', 'account'); scopes without one are skipped.
+    Returns seconds to wait, or None when the request may proceed.
+    """
+    store = get_bucket_store()
+    for scope, capacity, rate in limits_for(name):
+        subject = 'all' if scope == 'endpoint' else subjects.get(scope)
+        if subject is None:
+            continue
+        allowed, wait = store.take(f"{name}:{scope}:{subject}", capacity, rate)
+        if not allowed:
+            return wait
+    return None
+
+
+def rate_limited(name, phone=None, account=None):
+    """
+    Throttle a view with the LIMITS[name] buckets. `phone` / `account` take
+    the parsed JSON body and return the identifier for that scope.
+    Throttled requests get a 429 with Retry-After.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not RATELIMIT_ENABLED:
+                return f(*args, **kwargs)
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                data = {}
+            subjects = {'ip': client_ip()}
+            if phone:
+                subjects['phone'] = phone_key(phone(data))
+            if account:
+                subjects['account'] = account(data)
+            wait = check_limits(name, subjects)
+            if wait is not None:
+                response = jsonify({"error": "Too many requests. Please try again later."})
+                response.headers['Retry-After'] = str(max(1, math.ceil(wait)))
+                return response, 429
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
@@ -1,9 +1,26 @@
-from flask import Blueprint, jsonify, request, send_from_directory, current_app
+from flask import Blueprint, jsonify, request, send_from_directory, current_app, g
 from app import db
-from app.models import FunctionHall, Package, Customer, Booking, Inquiry, Notification, HallChangeRequest, AdminUser, HallPhoto, FunctionalRoom, GuestRoom
+from app.models import FunctionHall, Package, Customer, Booking, Inquiry, Notification, HallChangeRequest, AdminUser, HallPhoto, FunctionalRoom, GuestRoom, DailyHallStats, Calendar
+from app.models import ACTIVE_BOOKING_STATUSES, is_double_booking
 from datetime import datetime, date
-from sms_utils import send_sms
+from sqlalchemy.exc import IntegrityError
 from app import otp_service
+from app.serializers import hall_list_options, serialize_hall, serialize_package, serialize_functional_room, serialize_guest_room
+from app.pagination import InvalidCursor, decode_cursor, keyset_page, page_size
+from app.bookings import BOOKING_SORTS, FilterError, booking_filters, booking_list_query, parse_booking_cursor, serialize_booking_row
+from app.bookings import queue_confirmation_sms, parse_status_updates, plan_status_changes, apply_status_changes
+from app.bookings import customer_bookings, customer_bookings_cache, invalidate_customer_bookings
+from app.outbox import queue_sms, outbox_stats, retry_failed
+from app.jwt_auth import super_admin_required, bump_auth_version
+from app.ratelimit import rate_limited
+from app.digests import ENQUIRY_SMS_MODES, DIGEST_WINDOW_MINUTES, owner_sms_mode, queue_enquiry_digest
+from app.exports import EXPORT_FORMATS, export_bookings, export_inquiries
+from app.search import HallSearch, SearchError, search_cache, invalidate_hall_search
+from app.cache import cached_json_response
+from app.geo import parse_coordinates
+from app.availability import sync_calendar, month_bitmask, availability_matrix, MAX_BATCH_HALLS, MAX_BATCH_DATES
+from app.analytics import AnalyticsError, parse_month_range, hall_analytics, invalidate_hall_analytics
+from app.stats import record_booking, record_booking_status, record_inquiry, remove_customer_activity, dashboard_stats, daily_series, MAX_STATS_DAYS
 from cloudinary_config import upload_to_cloudinary
 import json
 import os
@@ -21,65 +38,56 @@ def serve_hall_photo(filename):
 # -------------------------
 @main.route('/api/halls', methods=['GET'])
 def get_halls():
-    # Get search parameters
-    name_query = request.args.get('name', '').strip()
-    location_query = request.args.get('location', '').strip()
-    guests = request.args.get('guests', type=int)
-    date_query = request.args.get('date', '').strip()
-    
-    print(f"🔍 Search params - name: {name_query}, location: {location_query}, guests: {guests}, date: {date_query}")
-    
-    # Start with base query
-    query = FunctionHall.query
-    
-    # Apply filters
-    if name_query:
-        query = query.filter(FunctionHall.name.ilike(f'%{name_query}%'))
-    if location_query:
-        query = query.filter(FunctionHall.location.ilike(f'%{location_query}%'))
-    if guests:
-        print(f"🔢 Filtering by guests >= {guests}")
-        query = query.filter(FunctionHall.capacity >= guests)
-    
-    halls = query.all()
-    
-    # Filter by date availability if date is provided
-    if date_query:
-        try:
-            check_date = datetime.strptime(date_query, '%Y-%m-%d').date()
-            available_halls = []
-            for hall in halls:
-                # Check if hall is available on the selected date
-                booking = Booking.query.filter_by(hall_id=hall.id, event_date=check_date).filter(
-                    Booking.status.in_(['Confirmed', 'Pending'])
-                ).first()
-                if not booking:
-                    available_halls.append(hall)
-            halls = available_halls
-        except ValueError:
-            pass  # Invalid date format, skip date filtering
-    result = []
-    for hall in halls:
-        photos = [photo.url for photo in hall.photos]
-        packages = [{'id': p.id, 'package_name': p.package_name, 'price': p.price, 'details': p.details} for p in hall.packages]
-        result.append({
-            'id': hall.id,
-            'name': hall.name,
-            'owner_name': hall.owner_name,
-            'location': hall.location,
-            'capacity': hall.capacity,
-            'price_per_day': hall.price_per_day,
-            'contact_number': hall.contact_number,
-            'description': hall.description,
-            'photos': photos,
-            'packages': packages,
-            'has_basic_rooms': getattr(hall, 'has_basic_rooms', True),
-            'has_stage': getattr(hall, 'has_stage', True),
-            'basic_rooms_count': getattr(hall, 'basic_rooms_count', 2),
-            'has_dining_hall': getattr(hall, 'has_dining_hall', True),
-            'has_kitchen': getattr(hall, 'has_kitchen', True)
-        })
-    return jsonify(result)
+    print(f"🔍 Search params - {request.args.to_dict()}")
+    try:
+        search = HallSearch(request.args)
+        return cached_json_response(search_cache, search.cache_key('halls'), search.results)
+    except (SearchError, InvalidCursor) as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@main.route('/api/halls/facets', methods=['GET'])
+def get_hall_facets():
+    """Facet counts for the current search filters, alongside the first/next page of results"""
+    try:
+        search = HallSearch(request.args)
+        search.paginated = True
+        
+        def build():
+            results = search.results()
+            results['facets'] = search.facets()
+            return results
+        
+        return cached_json_response(search_cache, search.cache_key('facets'), build)
+    except (SearchError, InvalidCursor) as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@main.route('/api/admin/search-cache', methods=['GET'])
+def get_search_cache_stats():
+    """Hit/miss counters for the hall search cache (this worker only)"""
+    return jsonify(search_cache.stats())
+
+
+@main.route('/api/admin/outbox', methods=['GET'])
+@super_admin_required
+def get_outbox_stats():
+    """SMS outbox counts by delivery status"""
+    return jsonify(outbox_stats())
+
+
+@main.route('/api/admin/outbox/retry', methods=['POST'])
+@super_admin_required
+def retry_outbox():
+    """Re-queue failed SMS; pass {"ids": [...]} to retry only some"""
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if ids is not None and (not isinstance(ids, list) or
+                            not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        return jsonify({"error": "ids must be a list of integers"}), 400
+    count = retry_failed(ids)
+    db.session.commit()
+    return jsonify({"message": f"{count} messages re-queued", "requeued": count})
 
 
 @main.route('/api/halls/<int:hall_id>', methods=['GET'])
@@ -100,28 +108,16 @@ def get_hall(hall_id):
         'has_stage': getattr(hall, 'has_stage', True),
         'basic_rooms_count': getattr(hall, 'basic_rooms_count', 2),
         'has_dining_hall': getattr(hall, 'has_dining_hall', True),
-        'has_kitchen': getattr(hall, 'has_kitchen', True)
+        'has_kitchen': getattr(hall, 'has_kitchen', True),
+        'latitude': hall.latitude,
+        'longitude': hall.longitude
     })
 
 @main.route('/api/vendor/<int:vendor_id>/halls', methods=['GET'])
 def get_vendor_halls(vendor_id):
     """Get all halls belonging to a specific vendor"""
-    halls = FunctionHall.query.filter_by(vendor_id=vendor_id).all()
-    result = []
-    for hall in halls:
-        photos = [photo.url for photo in hall.photos]
-        result.append({
-            'id': hall.id,
-            'name': hall.name,
-            'owner_name': hall.owner_name,
-            'location': hall.location,
-            'capacity': hall.capacity,
-            'price_per_day': hall.price_per_day,
-            'contact_number': hall.contact_number,
-            'description': hall.description,
-            'photos': photos
-        })
-    return jsonify(result)
+    halls = FunctionHall.query.filter_by(vendor_id=vendor_id).options(*hall_list_options()).all()
+    return jsonify([serialize_hall(hall) for hall in halls])
 
 @main.route('/api/halls', methods=['POST'])
 def add_hall():
@@ -158,6 +154,7 @@ def add_hall():
     if vendor_id:
         vendor_id = int(vendor_id)
     is_admin = data.get('is_admin', False)  # Check if request is from super admin
+    latitude, longitude = parse_coordinates(data)
     
     # If request is from vendor, create a change request instead
     if vendor_id and not is_admin:
@@ -230,7 +227,9 @@ def add_hall():
                     'guest_rooms': guest_rooms_data,
                     'has_basic_rooms': data.get('has_basic_rooms', 'true').lower() == 'true',
                     'has_stage': data.get('has_stage', 'true').lower() == 'true',
-                    'basic_rooms_count': int(data.get('basic_rooms_count', 2))
+                    'basic_rooms_count': int(data.get('basic_rooms_count', 2)),
+                    'latitude': latitude,
+                    'longitude': longitude
                 }),
                 status='pending'
             )
@@ -261,6 +260,7 @@ def add_hall():
         has_dining_hall=data.get('has_dining_hall', True) if isinstance(data.get('has_dining_hall'), bool) else str(data.get('has_dining_hall', 'true')).lower() == 'true',
         has_kitchen=data.get('has_kitchen', True) if isinstance(data.get('has_kitchen'), bool) else str(data.get('has_kitchen', 'true')).lower() == 'true'
     )
+    hall.set_coordinates(latitude, longitude)
     db.session.add(hall)
     db.session.flush()  # Get hall.id before creating packages
     
@@ -295,6 +295,7 @@ def add_hall():
                     db.session.add(new_package)
     
     db.session.commit()
+    invalidate_hall_search()
     
     print(f"✅ Hall added successfully! ID: {hall.id}")
     return jsonify({"message": "Hall added successfully!", "id": hall.id}), 201
@@ -322,7 +323,7 @@ def get_packages():
 def get_packages_by_hall(hall_id):
     packages = Package.query.filter_by(hall_id=hall_id).all()
     print(f"📦 GET /api/halls/{hall_id}/packages - Found {len(packages)} packages")
-    result = [{'id': p.id, 'package_name': p.package_name, 'price': p.price, 'details': p.details} for p in packages]
+    result = [serialize_package(p) for p in packages]
     print(f"📦 Returning packages: {result}")
     return jsonify(result)
 
@@ -338,6 +339,7 @@ def add_package():
     )
     db.session.add(pkg)
     db.session.commit()
+    invalidate_hall_search()
     return jsonify({"message": "Package added successfully!", "id": pkg.id}), 201
 
 
@@ -348,28 +350,11 @@ def add_package():
 def get_rooms_by_hall(hall_id):
     # Get functional rooms
     functional_rooms = FunctionalRoom.query.filter_by(hall_id=hall_id).all()
-    functional_rooms_data = [{
-        'id': r.id,
-        'room_type': r.room_type,
-        'room_name': r.room_name,
-        'price': r.price,
-        'capacity': r.capacity,
-        'amenities': r.amenities,
-        'description': r.description
-    } for r in functional_rooms]
+    functional_rooms_data = [serialize_functional_room(r) for r in functional_rooms]
     
     # Get guest rooms
     guest_rooms = GuestRoom.query.filter_by(hall_id=hall_id).all()
-    guest_rooms_data = [{
-        'id': r.id,
-        'room_category': r.room_category,
-        'total_rooms': r.total_rooms,
-        'price_per_room': r.price_per_room,
-        'bed_type': r.bed_type,
-        'max_occupancy': r.max_occupancy,
-        'amenities': r.amenities,
-        'description': r.description
-    } for r in guest_rooms]
+    guest_rooms_data = [serialize_guest_room(r) for r in guest_rooms]
     
     return jsonify({
         'functional_rooms': functional_rooms_data,
@@ -416,15 +401,24 @@ def delete_customer(customer_id):
         if not customer:
             return jsonify({"error": "Customer not found"}), 404
         
-        # Delete all related bookings
+        # Take their bookings and inquiries out of the daily stats
+        remove_customer_activity(customer_id)
+        
+        # Delete all related bookings, freeing their calendar days
+        booked_days = db.session.query(Booking.hall_id, Booking.event_date).filter_by(customer_id=customer_id).distinct().all()
         Booking.query.filter_by(customer_id=customer_id).delete()
+        sync_calendar(booked_days)
         
         # Delete all related inquiries
         Inquiry.query.filter_by(customer_id=customer_id).delete()
         
         # Delete the customer
+        bump_auth_version(customer)
         db.session.delete(customer)
         db.session.commit()
+        invalidate_hall_search()
+        invalidate_hall_analytics()
+        invalidate_customer_bookings(customer_id)
         
         return jsonify({"message": "Customer deleted successfully"}), 200
     except Exception as e:
@@ -437,34 +431,52 @@ def delete_customer(customer_id):
 # -------------------------
 @main.route('/api/bookings', methods=['GET'])
 def get_bookings():
-    bookings = Booking.query.all()
-    result = []
-    for b in bookings:
-        # Get customer details
-        customer = Customer.query.get(b.customer_id)
-        # Get hall details
-        hall = FunctionHall.query.get(b.hall_id)
+    """
+    Bookings with customer and hall details from one joined query.
+    Filters: status, hall_id, vendor_id, customer_id, event_from/event_to, created_from/created_to.
+    Pass limit/cursor for keyset pages ({bookings, next_cursor}); sort is newest, event_date or event_date_desc.
+    """
+    sort = request.args.get('sort', 'newest').strip() or 'newest'
+    if sort not in BOOKING_SORTS:
+        return jsonify({"error": f"Invalid sort. Use one of: {', '.join(BOOKING_SORTS)}"}), 400
+    limit = request.args.get('limit', type=int)
+    cursor_token = request.args.get('cursor', '').strip()
+    
+    try:
+        query = booking_list_query(booking_filters(request.args))
+        columns, descending, sort_key, _ = BOOKING_SORTS[sort]
         
-        result.append({
-            'id': b.id,
-            'customer_id': b.customer_id,
-            'customer_name': customer.name if customer else 'Unknown Customer',
-            'customer_email': customer.email if customer else 'N/A',
-            'customer_phone': customer.phone if customer else 'N/A',
-            'hall_id': b.hall_id,
-            'hall_name': hall.name if hall else 'Unknown Hall',
-            'event_date': b.event_date.isoformat(),
-            'event_type': b.event_type if hasattr(b, 'event_type') else 'N/A',
-            'number_of_guests': b.number_of_guests if hasattr(b, 'number_of_guests') else 0,
-            'package_id': b.package_id if hasattr(b, 'package_id') else None,
-            'package_name': b.package_name if hasattr(b, 'package_name') else None,
-            'total_price': b.total_amount,
-            'status': b.status,
-            'total_amount': b.total_amount,
-            'created_at': b.created_at.isoformat() if hasattr(b, 'created_at') else None,
-            'special_requests': b.special_requests if hasattr(b, 'special_requests') else None
-        })
-    return jsonify(result)
+        if limit or cursor_token:
+            cursor = parse_booking_cursor(decode_cursor(cursor_token), sort) if cursor_token else None
+            rows, next_cursor = keyset_page(query, columns, descending, cursor, page_size(limit), sort_key)
+            return jsonify({
+                'bookings': [serialize_booking_row(row) for row in rows],
+                'next_cursor': next_cursor
+            })
+    except (FilterError, InvalidCursor) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    rows = query.order_by(*[c.desc() if descending else c.asc() for c in columns]).all()
+    return jsonify([serialize_booking_row(row) for row in rows])
+
+
+@main.route('/api/bookings/export', methods=['GET'])
+def export_bookings_file():
+    """
+    Stream bookings as CSV (default) or NDJSON (?format=ndjson).
+    Takes the same filters and sort as GET /api/bookings.
+    """
+    fmt = request.args.get('format', 'csv').strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Invalid format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    sort = request.args.get('sort', 'newest').strip() or 'newest'
+    if sort not in BOOKING_SORTS:
+        return jsonify({"error": f"Invalid sort. Use one of: {', '.join(BOOKING_SORTS)}"}), 400
+    try:
+        filters = booking_filters(request.args)
+    except FilterError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_bookings(filters, sort, fmt)
 
 
 @main.route('/api/bookings', methods=['POST'])
@@ -483,23 +495,34 @@ def add_booking():
             "status": "not_approved"
         }), 403
     
+    hall = FunctionHall.query.get(data['hall_id'])
+    if not hall:
+        return jsonify({"error": "Hall not found"}), 404
+    
+    event_date = datetime.strptime(data['event_date'], "%Y-%m-%d").date()
+    status = data.get('status', 'Pending')
+    
+    # Cheap early rejection; uq_bookings_active_hall_date is what actually settles races
+    if status in ACTIVE_BOOKING_STATUSES and db.session.query(Booking.id).filter(
+        Booking.hall_id == hall.id,
+        Booking.event_date == event_date,
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+    ).first():
+        return jsonify({"error": "Hall is already booked for this date", "status": "unavailable"}), 409
+    
     booking = Booking(
         customer_id=customer_id,
-        hall_id=data['hall_id'],
-        event_date=datetime.strptime(data['event_date'], "%Y-%m-%d").date(),
+        hall_id=hall.id,
+        event_date=event_date,
         function_type=data.get('function_type'),
-        status=data.get('status', 'Pending'),
+        status=status,
         total_amount=data.get('total_amount')
     )
     db.session.add(booking)
-    db.session.commit()
-    
-    # Get customer and hall details
-    hall = FunctionHall.query.get(booking.hall_id)
-    customer = Customer.query.get(booking.customer_id)
-    
-    if hall and customer:
-        # Send notification to hall owner
+    try:
+        db.session.flush()
+        
+        # Notify hall owner in the same transaction
         notification = Notification(
             recipient_email=hall.contact_number,  # Using contact for now, should be owner email
             recipient_name=hall.owner_name,
@@ -508,7 +531,17 @@ def add_booking():
             booking_id=booking.id
         )
         db.session.add(notification)
+        sync_calendar([(booking.hall_id, booking.event_date)])
+        record_booking(booking)
         db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_double_booking(e):
+            return jsonify({"error": "Hall is already booked for this date", "status": "unavailable"}), 409
+        raise
+    invalidate_hall_search(booking.event_date)
+    invalidate_hall_analytics(booking.hall_id, booking.event_date)
+    invalidate_customer_bookings(booking.customer_id)
     
     return jsonify({"message": "Booking created successfully!", "id": booking.id}), 201
 
@@ -521,39 +554,71 @@ def update_booking_status(booking_id):
     old_status = booking.status
     new_status = data.get('status', booking.status)
     booking.status = new_status
-    db.session.commit()
-    
-    # Send SMS notification to customer when booking is confirmed
-    if old_status == 'Pending' and new_status == 'Confirmed':
-        print(f"✅ Booking #{booking.id} confirmed! Sending advance payment SMS...")
-        
-        # Get customer and hall details
-        customer = Customer.query.get(booking.customer_id)
-        hall = FunctionHall.query.get(booking.hall_id)
+    try:
+        if new_status != old_status:
+            sync_calendar([(booking.hall_id, booking.event_date)])
+            record_booking_status(booking, old_status)
         
-        if customer and hall:
-            # Calculate advance amount (25% of total)
-            advance_amount = booking.total_amount // 4
-            
-            # Format customer phone number
-            customer_phone = customer.phone
-            country_code = getattr(customer, 'country_code', '+91')
-            if not customer_phone.startswith('+'):
-                customer_phone = country_code + customer_phone
-            
-            # Send advance payment details SMS to customer (keep under 160 chars for single SMS)
-            message = f"""Booking CONFIRMED! {hall.name} on {booking.event_date.strftime('%d %b')}. Advance: Rs.{advance_amount}/- (25%). Pay: gens@upi or 9866168995 within 24hrs. ID#{booking.id}"""
-
-            sms_result = send_sms(customer_phone, message)
-            print(f"📱 SMS Result: {sms_result}")
-            
-            if sms_result.get('success'):
-                print(f"✉️ Advance payment SMS sent to {customer.name} at {customer_phone}")
-            else:
-                print(f"❌ SMS failed: {sms_result.get('error')}")
+        # Queue the advance payment SMS with the status change; the outbox worker sends it
+        if old_status == 'Pending' and new_status == 'Confirmed':
+            print(f"✅ Booking #{booking.id} confirmed! Queueing advance payment SMS...")
+            queue_confirmation_sms([booking])
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_double_booking(e):
+            return jsonify({"error": "Another active booking already holds this hall and date"}), 409
+        raise
+    if new_status != old_status:
+        invalidate_hall_search(booking.event_date)
+        invalidate_hall_analytics(booking.hall_id, booking.event_date)
+        invalidate_customer_bookings(booking.customer_id)
     
     return jsonify({"message": f"Booking {booking.id} status updated to {booking.status}"})
 
+
+@main.route('/api/bookings/bulk-status', methods=['POST'])
+@super_admin_required
+def bulk_update_booking_status():
+    """
+    Apply many status changes in one transaction (super admin only).
+    Body: {"updates": [{"id", "status"}, ...]} or {"ids": [...], "status": "..."}.
+    Each item reports updated / unchanged / not_found / conflict; confirmation SMS are queued in the same transaction.
+    """
+    try:
+        changes = parse_status_updates(request.get_json(silent=True))
+    except FilterError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    results, applied = plan_status_changes(changes)
+    try:
+        apply_status_changes(applied)
+        
+        # Advance payment SMS for every Pending -> Confirmed booking
+        confirmed = [row for row, old, new in applied if old == 'Pending' and new == 'Confirmed']
+        queued = queue_confirmation_sms(confirmed)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_double_booking(e):
+            return jsonify({"error": "Another active booking took one of these hall dates; nothing was changed"}), 409
+        raise
+    
+    for row, _, _ in applied:
+        invalidate_hall_search(row.event_date)
+        invalidate_hall_analytics(row.hall_id, row.event_date)
+        invalidate_customer_bookings(row.customer_id)
+    
+    for item in results:
+        if item['id'] in queued:
+            item['sms_queued'] = True
+    
+    return jsonify({
+        "message": f"{len(applied)} of {len(results)} bookings updated",
+        "updated": len(applied),
+        "results": results
+    })
+
 @main.route('/api/halls/<int:hall_id>/availability', methods=['GET'])
 def check_hall_availability(hall_id):
     date_str = request.args.get('date')
@@ -573,7 +638,7 @@ def check_hall_availability(hall_id):
         hall_id=hall_id,
         event_date=check_date
     ).filter(
-        Booking.status.in_(['Confirmed', 'Pending'])
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES)
     ).first()
     
     if existing_booking:
@@ -587,22 +652,121 @@ def check_hall_availability(hall_id):
         "message": "Hall is available for this date"
     })
 
+@main.route('/api/availability/batch', methods=['POST'])
+def check_batch_availability():
+    """
+    Availability for many halls and dates in one call.
+    Body: {"hall_ids": [1, 2], "dates": ["2025-12-01", "2025-12-05"]}
+    Response: available[i][j] is hall_ids[i] on dates[j]; a null row means the hall doesn't exist.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "hall_ids and dates must be non-empty lists"}), 400
+    raw_hall_ids = data.get('hall_ids') or []
+    raw_dates = data.get('dates') or []
+    
+    if not isinstance(raw_hall_ids, list) or not isinstance(raw_dates, list) or not raw_hall_ids or not raw_dates:
+        return jsonify({"error": "hall_ids and dates must be non-empty lists"}), 400
+    
+    # int() would quietly accept True, 1.9 or "7"; only real integers are hall ids
+    if not all(isinstance(h, int) and not isinstance(h, bool) for h in raw_hall_ids):
+        return jsonify({"error": "hall_ids must be integers and dates YYYY-MM-DD"}), 400
+    
+    try:
+        # De-duplicate while keeping the caller's order, so indexes stay predictable
+        hall_ids = list(dict.fromkeys(raw_hall_ids))
+        dates = list(dict.fromkeys(datetime.strptime(d, "%Y-%m-%d").date() for d in raw_dates))
+    except (TypeError, ValueError):
+        return jsonify({"error": "hall_ids must be integers and dates YYYY-MM-DD"}), 400
+    
+    if len(hall_ids) > MAX_BATCH_HALLS or len(dates) > MAX_BATCH_DATES:
+        return jsonify({"error": f"At most {MAX_BATCH_HALLS} halls and {MAX_BATCH_DATES} dates per request"}), 400
+    
+    return jsonify({
+        'hall_ids': hall_ids,
+        'dates': [d.isoformat() for d in dates],
+        'available': availability_matrix(hall_ids, dates)
+    })
+
+@main.route('/api/halls/<int:hall_id>/calendar', methods=['GET'])
+def get_hall_calendar(hall_id):
+    """
+    Booked days of a month as a bitmask: bit (day - 1) of booked_mask is set when booked.
+    Served from the Calendar table with one indexed range read.
+    """
+    month_str = request.args.get('month', '')
+    try:
+        month_start = datetime.strptime(month_str, "%Y-%m")
+    except ValueError:
+        return jsonify({"error": "month parameter required as YYYY-MM"}), 400
+    
+    mask, days_in_month = month_bitmask(hall_id, month_start.year, month_start.month)
+    return jsonify({
+        'hall_id': hall_id,
+        'month': month_start.strftime("%Y-%m"),
+        'days_in_month': days_in_month,
+        'booked_mask': mask
+    })
+
+
+# -------------------------
+# ANALYTICS
+# -------------------------
+@main.route('/api/halls/<int:hall_id>/analytics', methods=['GET'])
+def get_hall_analytics(hall_id):
+    """
+    Monthly occupancy rate, revenue trend and booking lead-time distribution for a hall.
+    Optional from/to as YYYY-MM; defaults to the last 12 months.
+    """
+    FunctionHall.query.get_or_404(hall_id)
+    try:
+        months = parse_month_range(request.args)
+    except AnalyticsError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({'hall_id': hall_id, 'months': hall_analytics([hall_id], months)[hall_id]})
+
+
+@main.route('/api/vendor/<int:vendor_id>/notification-preferences', methods=['GET'])
+def get_notification_preferences(vendor_id):
+    vendor = AdminUser.query.get_or_404(vendor_id)
+    return jsonify({
+        'enquiry_sms_mode': vendor.enquiry_sms_mode or 'immediate',
+        'digest_window_minutes': DIGEST_WINDOW_MINUTES
+    })
+
+
+@main.route('/api/vendor/<int:vendor_id>/notification-preferences', methods=['PUT'])
+def update_notification_preferences(vendor_id):
+    """enquiry_sms_mode: 'immediate' (one SMS per enquiry) or 'digest' (one SMS per window)"""
+    vendor = AdminUser.query.get_or_404(vendor_id)
+    data = request.get_json(silent=True) or {}
+    mode = data.get('enquiry_sms_mode')
+    if mode not in ENQUIRY_SMS_MODES:
+        return jsonify({"error": f"enquiry_sms_mode must be one of: {', '.join(ENQUIRY_SMS_MODES)}"}), 400
+    
+    vendor.enquiry_sms_mode = mode
+    db.session.commit()
+    return jsonify({"message": "Notification preferences updated", "enquiry_sms_mode": mode})
+
+
+@main.route('/api/vendor/<int:vendor_id>/analytics', methods=['GET'])
+def get_vendor_analytics(vendor_id):
+    """Monthly analytics for every hall of a vendor, from one query for all halls"""
+    try:
+        months = parse_month_range(request.args)
+    except AnalyticsError as e:
+        return jsonify({"error": str(e)}), 400
+    halls = db.session.query(FunctionHall.id, FunctionHall.name).filter_by(vendor_id=vendor_id).order_by(FunctionHall.id).all()
+    series = hall_analytics([hall.id for hall in halls], months)
+    return jsonify([
+        {'hall_id': hall.id, 'hall_name': hall.name, 'months': series[hall.id]}
+        for hall in halls
+    ])
+
 @main.route('/api/customer/<int:customer_id>/bookings', methods=['GET'])
 def get_customer_bookings(customer_id):
-    bookings = Booking.query.filter_by(customer_id=customer_id).all()
-    result = []
-    for b in bookings:
-        hall = FunctionHall.query.get(b.hall_id)
-        result.append({
-            'id': b.id,
-            'hall_name': hall.name if hall else 'Unknown',
-            'hall_location': hall.location if hall else '',
-            'event_date': b.event_date.isoformat(),
-            'status': b.status,
-            'total_amount': b.total_amount,
-            'created_at': b.created_at.isoformat() if hasattr(b, 'created_at') and b.created_at else None
-        })
-    return jsonify(result)
+    """A customer's bookings with hall details and primary photo, one query, cached per customer"""
+    return cached_json_response(customer_bookings_cache, customer_id, lambda: customer_bookings(customer_id))
 
 
 # -------------------------
@@ -629,6 +793,22 @@ def get_inquiries():
     return jsonify(result)
 
 
+@main.route('/api/inquiries/export', methods=['GET'])
+def export_inquiries_file():
+    """
+    Stream inquiries (newest first) as CSV (default) or NDJSON (?format=ndjson).
+    Filters: status, hall_id, vendor_id, customer_id, created_from/created_to.
+    """
+    fmt = request.args.get('format', 'csv').strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Invalid format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        filters = booking_filters(request.args)
+    except FilterError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_inquiries(filters, fmt)
+
+
 @main.route('/api/inquiries', methods=['POST'])
 def add_inquiry():
     data = request.get_json()
@@ -640,10 +820,13 @@ def add_inquiry():
         message=data.get('message')
     )
     db.session.add(inquiry)
+    db.session.flush()
+    record_inquiry(inquiry)
     db.session.commit()
     return jsonify({"message": "Inquiry submitted successfully!", "id": inquiry.id}), 201
 
 @main.route('/api/enquiry', methods=['POST'])
+@rate_limited('enquiry', phone=lambda data: data.get('phone'))
 def add_enquiry():
     data = request.get_json()
     hall_id = data.get('hall_id')
@@ -666,11 +849,10 @@ def add_enquiry():
         hall_id=hall_id
     )
     db.session.add(inquiry)
-    db.session.commit()
+    db.session.flush()
+    record_inquiry(inquiry)
     
-    print(f"✅ Enquiry #{inquiry.id} saved to database")
-    
-    # Send SMS to hall owner and customer if hall_id is provided
+    # Queue SMS to hall owner and customer if hall_id is provided; they commit with the enquiry
     if hall_id:
         print(f"🔍 Looking up hall #{hall_id}")
         hall = FunctionHall.query.get(hall_id)
@@ -678,23 +860,24 @@ def add_enquiry():
             print(f"📍 Hall found: {hall.name}")
             print(f"📞 Owner contact: {hall.contact_number}")
             
-            from sms_utils import send_sms
-            
-            # 1. Send SMS to hall owner
-            if hall.contact_number:
+            # 1. SMS to hall owner - now, or folded into their next digest
+            if hall.contact_number and owner_sms_mode(hall) == 'digest':
+                print(f"🗂️ Adding enquiry to digest for {hall.contact_number}")
+                queue_enquiry_digest(hall, inquiry)
+            elif hall.contact_number:
                 owner_message = f"New Enquiry from {inquiry.customer_name}\n"
                 owner_message += f"Phone: {inquiry.phone}\n"
                 owner_message += f"Email: {inquiry.email}\n"
                 owner_message += f"Message: {inquiry.message}\n"
                 owner_message += f"Hall: {hall.name}"
                 
-                print(f"📱 Sending SMS to hall owner: {hall.contact_number}")
-                result = send_sms(hall.contact_number, owner_message)
-                print(f"✉️ Owner SMS result: {result}")
+                print(f"📱 Queueing SMS to hall owner: {hall.contact_number}")
+                queue_sms(hall.contact_number, owner_message, recipient_name=hall.owner_name,
+                          subject=f"New Enquiry for {hall.name}")
             else:
                 print(f"⚠️ No contact number for hall {hall.name}")
             
-            # 2. Send confirmation SMS to customer (from Hall Owner)
+            # 2. Confirmation SMS to customer (from Hall Owner)
             if inquiry.phone:
                 customer_message = f"From {hall.name} - {hall.owner_name}\n\n"
                 customer_message += f"Dear {inquiry.customer_name},\n"
@@ -703,14 +886,17 @@ def add_enquiry():
                 customer_message += f"Contact us: {hall.contact_number}\n"
                 customer_message += f"Best regards,\n{hall.owner_name}"
                 
-                print(f"📱 Sending confirmation SMS to customer: {inquiry.phone}")
-                customer_result = send_sms(inquiry.phone, customer_message)
-                print(f"✉️ Customer SMS result: {customer_result}")
+                print(f"📱 Queueing confirmation SMS to customer: {inquiry.phone}")
+                queue_sms(inquiry.phone, customer_message, recipient_name=inquiry.customer_name,
+                          subject="Enquiry received")
         else:
             print(f"❌ Hall #{hall_id} not found")
     else:
         print(f"⚠️ No hall_id provided in enquiry")
     
+    db.session.commit()
+    print(f"✅ Enquiry #{inquiry.id} saved to database")
+    
     return jsonify({"message": "Enquiry submitted successfully!", "id": inquiry.id}), 201
 
 
@@ -744,6 +930,7 @@ def update_customer_profile(customer_id):
     customer.email = data.get('email', customer.email)
     customer.phone = data.get('phone', customer.phone)
     customer.address = data.get('address', customer.address)
+    bump_auth_version(customer)
     
     db.session.commit()
     return jsonify({
@@ -760,21 +947,53 @@ def update_customer_profile(customer_id):
 # -------------------------
 # ADMIN DASHBOARD STATS
 # -------------------------
+def _stats_range(args):
+    """Optional from/to (YYYY-MM-DD, inclusive) and hall_id query args"""
+    try:
+        start = datetime.strptime(args['from'], '%Y-%m-%d').date() if args.get('from') else None
+        end = datetime.strptime(args['to'], '%Y-%m-%d').date() if args.get('to') else None
+    except ValueError:
+        raise ValueError("from and to must be YYYY-MM-DD")
+    if start and end and start > end:
+        raise ValueError("from must be on or before to")
+    hall_id = args.get('hall_id', type=int)
+    return start, end, hall_id
+
+
 @main.route('/api/admin/stats', methods=['GET'])
 def get_admin_stats():
-    total_halls = FunctionHall.query.count()
-    total_bookings = Booking.query.count()
-    total_customers = Customer.query.count()
+    """
+    Dashboard totals read from the daily_hall_stats rollup in one query.
+    Optional from/to/hall_id narrow bookings, revenue and inquiries to activity in that range.
+    """
+    try:
+        start, end, hall_id = _stats_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Calculate total revenue from all bookings
-    bookings = Booking.query.all()
-    total_revenue = sum(booking.total_amount for booking in bookings if booking.total_amount)
+    stats = dashboard_stats(start, end, hall_id)
+    if start or end:
+        stats['from'] = start.isoformat() if start else None
+        stats['to'] = end.isoformat() if end else None
+    return jsonify(stats)
+
+
+@main.route('/api/admin/stats/daily', methods=['GET'])
+def get_admin_daily_stats():
+    """Per-day bookings, revenue and inquiries for from..to (required, at most MAX_STATS_DAYS days)"""
+    try:
+        start, end, hall_id = _stats_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not start or not end:
+        return jsonify({"error": "from and to are required"}), 400
+    if (end - start).days + 1 > MAX_STATS_DAYS:
+        return jsonify({"error": f"Range is limited to {MAX_STATS_DAYS} days"}), 400
     
     return jsonify({
-        'total_halls': total_halls,
-        'total_bookings': total_bookings,
-        'total_customers': total_customers,
-        'total_revenue': total_revenue
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'days': daily_series(start, end, hall_id)
     })
 
 
@@ -782,6 +1001,7 @@ def get_admin_stats():
 # OTP VERIFICATION
 # -------------------------
 @main.route('/api/otp/send', methods=['POST'])
+@rate_limited('otp_send', phone=lambda data: data.get('phone_number'))
 def send_otp():
     """Send OTP to phone number"""
     data = request.get_json()
@@ -887,6 +1107,10 @@ def vendor_edit_hall(hall_id):
         'description': data.get('description', hall.description),
         'photos': photo_paths if photo_paths else None
     }
+    latitude, longitude = parse_coordinates(data)
+    if latitude is not None:
+        new_data['latitude'] = latitude
+        new_data['longitude'] = longitude
     
     # Create change request
     change_request = HallChangeRequest(
@@ -989,32 +1213,10 @@ def get_hall_requests():
 
 
 @main.route('/api/admin/hall-requests/<int:request_id>/approve', methods=['POST'])
+@super_admin_required
 def approve_hall_request(request_id):
     """Admin approves a hall change request"""
-    # Get JWT token from Authorization header
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"error": "Authorization token required"}), 401
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        # Decode JWT token
-        import jwt
-        import os
-        SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-        decoded = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        admin_id = decoded.get('admin_id')
-        
-        # Verify admin is super_admin
-        admin = AdminUser.query.get(admin_id)
-        if not admin or admin.role != 'super_admin':
-            return jsonify({"error": "Unauthorized - Super admin access required"}), 403
-    except jwt.ExpiredSignatureError:
-        return jsonify({"error": "Token expired"}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({"error": "Invalid token"}), 401
+    admin_id = g.principal['id']
     
     change_request = HallChangeRequest.query.get_or_404(request_id)
     
@@ -1042,6 +1244,7 @@ def approve_hall_request(request_id):
             has_dining_hall=new_data.get('has_dining_hall', True),
             has_kitchen=new_data.get('has_kitchen', True)
         )
+        hall.set_coordinates(new_data.get('latitude'), new_data.get('longitude'))
         db.session.add(hall)
         db.session.flush()  # Get hall.id before creating photos
         
@@ -1121,6 +1324,8 @@ def approve_hall_request(request_id):
             hall.basic_rooms_count = new_data.get('basic_rooms_count', 2)
             hall.has_dining_hall = new_data.get('has_dining_hall', True)
             hall.has_kitchen = new_data.get('has_kitchen', True)
+            if 'latitude' in new_data:
+                hall.set_coordinates(new_data.get('latitude'), new_data.get('longitude'))
             
             # Add new photos if provided
             photos = new_data.get('photos', [])
@@ -1138,6 +1343,9 @@ def approve_hall_request(request_id):
         # Delete hall
         hall = FunctionHall.query.get(change_request.hall_id)
         if hall:
+            # Calendar rows can outlive the hall's bookings and would block the delete
+            Calendar.query.filter_by(hall_id=hall.id).delete()
+            DailyHallStats.query.filter_by(hall_id=hall.id).delete()
             db.session.delete(hall)
     
     # Update request status
@@ -1154,36 +1362,16 @@ def approve_hall_request(request_id):
         traceback.print_exc()
         return jsonify({"error": f"Failed to approve request: {str(e)}"}), 500
     
+    invalidate_hall_search()
+    invalidate_customer_bookings()
     return jsonify({"message": f"Hall {change_request.action_type} request approved successfully!"}), 200
 
 
 @main.route('/api/admin/hall-requests/<int:request_id>/reject', methods=['POST'])
+@super_admin_required
 def reject_hall_request(request_id):
     """Admin rejects a hall change request"""
-    # Get JWT token from Authorization header
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"error": "Authorization token required"}), 401
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        # Decode JWT token
-        import jwt
-        import os
-        SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-        decoded = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        admin_id = decoded.get('admin_id')
-        
-        # Verify admin is super_admin
-        admin = AdminUser.query.get(admin_id)
-        if not admin or admin.role != 'super_admin':
-            return jsonify({"error": "Unauthorized - Super admin access required"}), 403
-    except jwt.ExpiredSignatureError:
-        return jsonify({"error": "Token expired"}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({"error": "Invalid token"}), 401
+    admin_id = g.principal['id']
     
     data = request.get_json() or {}
     reason = data.get('reason', 'No reason provided')
@@ -1257,33 +1445,9 @@ def get_pending_customers():
 
 
 @main.route('/api/admin/customers/<int:customer_id>/approve', methods=['POST'])
+@super_admin_required
 def approve_customer(customer_id):
     """Admin approves a customer"""
-    # Get JWT token from Authorization header
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"error": "Authorization token required"}), 401
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        # Decode JWT token
-        import jwt
-        import os
-        SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-        decoded = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        admin_id = decoded.get('admin_id')
-        
-        # Verify admin is super_admin
-        admin = AdminUser.query.get(admin_id)
-        if not admin or admin.role != 'super_admin':
-            return jsonify({"error": "Unauthorized - Super admin access required"}), 403
-    except jwt.ExpiredSignatureError:
-        return jsonify({"error": "Token expired"}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({"error": "Invalid token"}), 401
-    
     customer = Customer.query.get_or_404(customer_id)
     
     if customer.approval_status != 'pending':
@@ -1291,6 +1455,7 @@ def approve_customer(customer_id):
     
     customer.is_approved = True
     customer.approval_status = 'approved'
+    bump_auth_version(customer)
     
     db.session.commit()
     
@@ -1298,33 +1463,9 @@ def approve_customer(customer_id):
 
 
 @main.route('/api/admin/customers/<int:customer_id>/reject', methods=['POST'])
+@super_admin_required
 def reject_customer(customer_id):
     """Admin rejects a customer"""
-    # Get JWT token from Authorization header
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"error": "Authorization token required"}), 401
-    
-    token = auth_header.split(' ')[1]
-    
-    try:
-        # Decode JWT token
-        import jwt
-        import os
-        SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-        decoded = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        admin_id = decoded.get('admin_id')
-        
-        # Verify admin is super_admin
-        admin = AdminUser.query.get(admin_id)
-        if not admin or admin.role != 'super_admin':
-            return jsonify({"error": "Unauthorized - Super admin access required"}), 403
-    except jwt.ExpiredSignatureError:
-        return jsonify({"error": "Token expired"}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({"error": "Invalid token"}), 401
-    
     data = request.get_json() or {}
     reason = data.get('reason', 'No reason provided')
     
@@ -1334,6 +1475,7 @@ def reject_customer(customer_id):
         return jsonify({"error": "Customer already processed"}), 400
     
     customer.approval_status = 'rejected'
+    bump_auth_version(customer)
     
     db.session.commit()
     
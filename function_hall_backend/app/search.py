@@ -0,0 +1,384 @@
+import math
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import Float, and_, case, cast, distinct, func, literal, or_, text
+from app import db
+from app.models import FunctionHall, Booking, HALL_PRICE_KEY, HALL_CAPACITY_KEY, ACTIVE_BOOKING_STATUSES
+from app.geo import MAX_RADIUS_KM, cell_range_filter, haversine_km, valid_coordinates
+from app.pagination import decode_cursor, encode_cursor, finite_float, keyset_page, page_size, parse_cursor, InvalidCursor
+from app.serializers import hall_list_options, serialize_hall
+from app.cache import TTLCache
+
+# -------------------------
+# Hall Text Search
+# -------------------------
+# PostgreSQL: pg_trgm word similarity over name/location, served by the GIN
+# trigram indexes from add_hall_search_indexes.py. Tolerates typos
+# ("hydrabad" -> "Hyderabad") and ranks by similarity.
+# Other databases (SQLite in development): substring match ranked by where it hit.
+
+_trgm_available = None
+
+
+def trigram_search_available():
+    """True when running on PostgreSQL with the pg_trgm extension installed (checked once)"""
+    global _trgm_available
+    if _trgm_available is None:
+        if db.engine.dialect.name != 'postgresql':
+            _trgm_available = False
+        else:
+            _trgm_available = db.session.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).first() is not None
+    return _trgm_available
+
+
+def apply_text_search(query, term):
+    """
+    Restrict a FunctionHall query to halls whose name or location matches `term`.
+    Returns (query, relevance) where relevance is a SQL expression, higher is better.
+    """
+    pattern = f'%{term}%'
+    substring_match = or_(FunctionHall.name.ilike(pattern), FunctionHall.location.ilike(pattern))
+
+    if trigram_search_available():
+        # `term <% column` is the indexable form of word_similarity(term, column) >= threshold
+        query = query.filter(or_(
+            substring_match,
+            literal(term).op('<%')(FunctionHall.name),
+            literal(term).op('<%')(FunctionHall.location)
+        ))
+        # Cast the real score to double so it round-trips exactly through pagination cursors
+        relevance = cast(func.greatest(
+            func.word_similarity(term, FunctionHall.name),
+            func.word_similarity(term, FunctionHall.location)
+        ), Float)
+        return query, relevance
+
+    query = query.filter(substring_match)
+    relevance = case(
+        (FunctionHall.name.ilike(f'{term}%'), 3),
+        (FunctionHall.name.ilike(pattern), 2),
+        (FunctionHall.location.ilike(f'{term}%'), 1),
+        else_=0
+    )
+    return query, relevance
+
+
+# -------------------------
+# Hall Search (GET /api/halls)
+# -------------------------
+
+# Server-side hall orderings: sort -> (key columns ending in the id, descending, row -> key values)
+# sort -> (columns, descending, cursor key, cursor value parsers)
+HALL_SORTS = {
+    'newest': ((FunctionHall.id,), True, lambda h: [h.id], (int,)),
+    'price': ((HALL_PRICE_KEY, FunctionHall.id), False, lambda h: [h.price_per_day or 0, h.id], (finite_float, int)),
+    'price_desc': ((HALL_PRICE_KEY, FunctionHall.id), True, lambda h: [h.price_per_day or 0, h.id], (finite_float, int)),
+    'capacity': ((HALL_CAPACITY_KEY, FunctionHall.id), False, lambda h: [h.capacity or 0, h.id], (int, int)),
+    'capacity_desc': ((HALL_CAPACITY_KEY, FunctionHall.id), True, lambda h: [h.capacity or 0, h.id], (int, int)),
+}
+RELEVANCE_CURSOR = (finite_float, int)
+
+# Facet buckets: (label, min inclusive, max exclusive)
+CAPACITY_BUCKETS = [
+    ('under_100', None, 100),
+    ('100_299', 100, 300),
+    ('300_499', 300, 500),
+    ('500_999', 500, 1000),
+    ('1000_plus', 1000, None),
+]
+PRICE_BUCKETS = [
+    ('under_25000', None, 25000),
+    ('25000_49999', 25000, 50000),
+    ('50000_99999', 50000, 100000),
+    ('100000_plus', 100000, None),
+]
+AMENITY_FLAGS = ['has_stage', 'has_dining_hall', 'has_kitchen', 'has_basic_rooms']
+
+# Upper bound on candidate dates in one multi-date search (dates= or from=/to=)
+MAX_SEARCH_DATES = 92
+
+# Rendered search responses keyed by HallSearch.cache_key()
+search_cache = TTLCache(
+    maxsize=int(os.environ.get('HALL_SEARCH_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('HALL_SEARCH_CACHE_TTL', 60))
+)
+
+
+def invalidate_hall_search(event_date=None):
+    """
+    Drop cached searches after a change.
+    Hall changes can affect any search; a booking change only affects searches filtered on its date.
+    """
+    if event_date is None:
+        search_cache.clear()
+    else:
+        search_cache.invalidate_where(lambda key: event_date in key[1])
+
+
+class SearchError(ValueError):
+    pass
+
+
+def parse_nearby_cursor(values):
+    """Decoded near= cursor -> (distance_km, hall_id), the key _nearest ranks by"""
+    return tuple(parse_cursor(values, (finite_float, int)))
+
+
+class HallSearch:
+    """Parsed hall search parameters plus the queries that answer them"""
+
+    def __init__(self, args):
+        self.search_term = args.get('q', '').strip()
+        self.name = args.get('name', '').strip()
+        self.location = args.get('location', '').strip()
+        self.guests = args.get('guests', type=int)
+        self.sort = args.get('sort', '').strip()
+        self.limit = args.get('limit', type=int)
+        self.cursor_token = args.get('cursor', '').strip()
+        self.paginated = bool(self.limit or self.cursor_token)
+
+        if self.sort and self.sort not in HALL_SORTS:
+            raise SearchError(f"Invalid sort. Use one of: {', '.join(HALL_SORTS)}")
+
+        # Invalid dates are ignored, as before
+        self.date = None
+        date_query = args.get('date', '').strip()
+        if date_query:
+            try:
+                self.date = datetime.strptime(date_query, '%Y-%m-%d').date()
+            except ValueError:
+                pass
+
+        # Multi-date mode: a list (dates=a,b,c) or an inclusive range (from=&to=)
+        self.dates = None
+        self.date_range = None
+        date_list = [d.strip() for value in args.getlist('dates') for d in value.split(',') if d.strip()]
+        range_from, range_to = args.get('from', '').strip(), args.get('to', '').strip()
+        if date_list and (range_from or range_to):
+            raise SearchError("Use either dates= or from=/to=, not both")
+        try:
+            if date_list:
+                self.dates = sorted({datetime.strptime(d, '%Y-%m-%d').date() for d in date_list})
+            elif range_from or range_to:
+                if not (range_from and range_to):
+                    raise SearchError("Both from and to are required for a date range")
+                start = datetime.strptime(range_from, '%Y-%m-%d').date()
+                end = datetime.strptime(range_to, '%Y-%m-%d').date()
+                if end < start:
+                    raise SearchError("to must not be before from")
+                self.date_range = (start, end)
+                self.dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        except SearchError:
+            raise
+        except ValueError:
+            raise SearchError("Invalid date format, use YYYY-MM-DD")
+        if self.dates and len(self.dates) > MAX_SEARCH_DATES:
+            raise SearchError(f"At most {MAX_SEARCH_DATES} dates per search")
+
+        self.near = None
+        self.radius_km = None
+        near_query = args.get('near', '').strip()
+        if near_query:
+            try:
+                near = tuple(float(v) for v in near_query.split(','))
+            except ValueError:
+                near = None
+            if not near or len(near) != 2 or not valid_coordinates(*near):
+                raise SearchError("near must be 'lat,lon'")
+            self.near = near
+            radius_km = args.get('radius_km', 10, type=float)
+            if not math.isfinite(radius_km) or radius_km <= 0:
+                raise SearchError("radius_km must be a positive number")
+            self.radius_km = min(radius_km, MAX_RADIUS_KM)
+
+        self.cursor = decode_cursor(self.cursor_token) if self.cursor_token else None
+
+    def booking_dates(self):
+        """Event dates whose bookings affect these results"""
+        return frozenset(([self.date] if self.date else []) + (self.dates or []))
+
+    def cache_key(self, endpoint):
+        """
+        Normalized parameters: (endpoint, booking dates, params).
+        Booking dates only serve invalidate_hall_search; date, dates and the
+        date range are separate params because they answer differently.
+        Text filters are case-insensitive in SQL, so they are lowercased here too.
+        """
+        params = (
+            self.date, tuple(sorted(self.dates)) if self.dates else None, self.date_range,
+            self.search_term.lower(), self.name.lower(), self.location.lower(), self.guests,
+            self.sort, page_size(self.limit) if self.paginated else None, self.cursor_token,
+            self.near, self.radius_km
+        )
+        return (endpoint, self.booking_dates(), params)
+
+    def filtered_query(self):
+        """FunctionHall query with every filter applied. Returns (query, relevance or None)."""
+        query = FunctionHall.query
+        relevance = None
+        if self.search_term:
+            query, relevance = apply_text_search(query, self.search_term)
+        if self.name:
+            query = query.filter(FunctionHall.name.ilike(f'%{self.name}%'))
+        if self.location:
+            query = query.filter(FunctionHall.location.ilike(f'%{self.location}%'))
+        if self.guests:
+            query = query.filter(FunctionHall.capacity >= self.guests)
+        if self.date:
+            # Anti-join: drop halls with an active booking on that date in the same query
+            booked = db.session.query(Booking.id).filter(
+                Booking.hall_id == FunctionHall.id,
+                Booking.event_date == self.date,
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+            )
+            query = query.filter(~booked.exists())
+        if self.dates:
+            # Keep halls with at least one free candidate date: fewer distinct booked dates than candidates
+            booked_days = db.session.query(func.count(distinct(Booking.event_date))).filter(
+                Booking.hall_id == FunctionHall.id,
+                self._candidate_dates_filter(),
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+            ).scalar_subquery()
+            query = query.filter(booked_days < len(self.dates))
+        if self.near:
+            query = query.filter(cell_range_filter(FunctionHall.geo_cell, self.near[0], self.near[1], self.radius_km))
+        return query, relevance
+
+    def results(self):
+        """
+        Plain list of serialized halls, or {halls, next_cursor} when paginated.
+        """
+        query, relevance = self.filtered_query()
+        if self.near:
+            halls, next_cursor = self._nearby_page(query)
+        else:
+            halls, next_cursor = self._sorted_page(query, relevance)
+        if self.dates:
+            free_dates = self._free_dates([hall['id'] for hall in halls])
+            for hall in halls:
+                hall['available_dates'] = free_dates[hall['id']]
+        if self.paginated:
+            return {'halls': halls, 'next_cursor': next_cursor}
+        return halls
+
+    def _candidate_dates_filter(self):
+        if self.date_range:
+            return Booking.event_date.between(*self.date_range)
+        return Booking.event_date.in_(self.dates)
+
+    def _free_dates(self, hall_ids):
+        """Free candidate dates per hall, from one grouped query over bookings"""
+        booked = defaultdict(set)
+        if hall_ids:
+            rows = db.session.query(Booking.hall_id, Booking.event_date).filter(
+                Booking.hall_id.in_(hall_ids),
+                self._candidate_dates_filter(),
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+            ).group_by(Booking.hall_id, Booking.event_date).all()
+            for hall_id, event_date in rows:
+                booked[hall_id].add(event_date)
+        return {
+            hall_id: [d.isoformat() for d in self.dates if d not in booked[hall_id]]
+            for hall_id in hall_ids
+        }
+
+    def _sorted_page(self, query, relevance):
+        query = query.options(*hall_list_options())
+        ranked = relevance is not None and not self.sort
+        if ranked:
+            # Best match first - the score rides along on each row to seed the next cursor
+            query = query.add_columns(relevance.label('relevance'))
+            columns, descending = (relevance, FunctionHall.id), True
+            sort_key = lambda row: [row.relevance, row[0].id]
+            parsers = RELEVANCE_CURSOR
+        else:
+            columns, descending, sort_key, parsers = HALL_SORTS[self.sort or 'newest']
+
+        next_cursor = None
+        if self.paginated:
+            cursor = parse_cursor(self.cursor, parsers) if self.cursor is not None else None
+            rows, next_cursor = keyset_page(query, columns, descending, cursor, page_size(self.limit), sort_key)
+        else:
+            if self.sort or ranked:
+                query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+            rows = query.all()
+        halls = [row[0] for row in rows] if ranked else rows
+        return [serialize_hall(hall) for hall in halls], next_cursor
+
+    def _nearest(self, query):
+        """(distance_km, hall_id) for every candidate inside the radius, nearest first"""
+        lat, lon = self.near
+        candidates = query.with_entities(FunctionHall.id, FunctionHall.latitude, FunctionHall.longitude).all()
+        ranked = sorted(
+            (round(haversine_km(lat, lon, c.latitude, c.longitude), 3), c.id) for c in candidates
+        )
+        return [key for key in ranked if key[0] <= self.radius_km]
+
+    def _nearby_page(self, query):
+        """
+        Rank the grid-cell candidates by exact distance.
+        Only (id, lat, lon) is read for candidates; full rows are loaded for the returned page.
+        """
+        ranked = self._nearest(query)
+        if self.cursor is not None:
+            after = parse_nearby_cursor(self.cursor)
+            ranked = [key for key in ranked if key > after]
+
+        next_cursor = None
+        limit = page_size(self.limit)
+        if self.paginated and len(ranked) > limit:
+            ranked = ranked[:limit]
+            next_cursor = encode_cursor(list(ranked[-1]))
+
+        halls = FunctionHall.query.filter(FunctionHall.id.in_([hall_id for _, hall_id in ranked])).options(*hall_list_options()).all()
+        halls_by_id = {hall.id: hall for hall in halls}
+        result = []
+        for distance, hall_id in ranked:
+            item = serialize_hall(halls_by_id[hall_id])
+            item['distance_km'] = distance
+            result.append(item)
+        return result, next_cursor
+
+    def facets(self):
+        """
+        Facet counts for the filtered set in a single aggregate query:
+        one COUNT(*) FILTER (WHERE ...) per bucket/flag.
+        """
+        query, _ = self.filtered_query()
+        if self.near:
+            # Grid cells over-cover the circle - count only halls inside the radius
+            query = FunctionHall.query.filter(FunctionHall.id.in_([hall_id for _, hall_id in self._nearest(query)]))
+
+        def in_range(column, low, high):
+            conditions = []
+            if low is not None:
+                conditions.append(column >= low)
+            if high is not None:
+                conditions.append(column < high)
+            return and_(*conditions)
+
+        aggregates = [func.count()]
+        for _, low, high in CAPACITY_BUCKETS:
+            aggregates.append(func.count().filter(in_range(FunctionHall.capacity, low, high)))
+        for _, low, high in PRICE_BUCKETS:
+            aggregates.append(func.count().filter(in_range(FunctionHall.price_per_day, low, high)))
+        for flag in AMENITY_FLAGS:
+            aggregates.append(func.count().filter(getattr(FunctionHall, flag).is_(True)))
+
+        counts = iter(query.with_entities(*aggregates).order_by(None).one())
+        total = next(counts)
+        return {
+            'total': total,
+            'capacity': [
+                {'bucket': label, 'min': low, 'max': high, 'count': next(counts)}
+                for label, low, high in CAPACITY_BUCKETS
+            ],
+            'price_per_day': [
+                {'bucket': label, 'min': low, 'max': high, 'count': next(counts)}
+                for label, low, high in PRICE_BUCKETS
+            ],
+            'amenities': {flag: next(counts) for flag in AMENITY_FLAGS}
+        }
@@ -0,0 +1,78 @@
+from sqlalchemy.orm import selectinload
+from app.models import FunctionHall
+
+# -------------------------
+# Hall Serialization
+# -------------------------
+
+def hall_list_options():
+    """
+    Loader options for hall listing queries.
+    Each child collection is fetched with one extra SELECT ... WHERE hall_id IN (...)
+    so a list page costs a fixed number of queries regardless of hall count.
+    """
+    return (
+        selectinload(FunctionHall.photos),
+        selectinload(FunctionHall.packages),
+        selectinload(FunctionHall.functional_rooms),
+        selectinload(FunctionHall.guest_rooms),
+    )
+
+
+def serialize_package(package):
+    return {
+        'id': package.id,
+        'package_name': package.package_name,
+        'price': package.price,
+        'details': package.details
+    }
+
+
+def serialize_functional_room(room):
+    return {
+        'id': room.id,
+        'room_type': room.room_type,
+        'room_name': room.room_name,
+        'price': room.price,
+        'capacity': room.capacity,
+        'amenities': room.amenities,
+        'description': room.description
+    }
+
+
+def serialize_guest_room(room):
+    return {
+        'id': room.id,
+        'room_category': room.room_category,
+        'total_rooms': room.total_rooms,
+        'price_per_room': room.price_per_room,
+        'bed_type': room.bed_type,
+        'max_occupancy': room.max_occupancy,
+        'amenities': room.amenities,
+        'description': room.description
+    }
+
+
+def serialize_hall(hall):
+    """Serialize a hall with its photos, packages and rooms (load with hall_list_options())"""
+    return {
+        'id': hall.id,
+        'name': hall.name,
+        'owner_name': hall.owner_name,
+        'location': hall.location,
+        'capacity': hall.capacity,
+        'price_per_day': hall.price_per_day,
+        'contact_number': hall.contact_number,
+        'description': hall.description,
+        'photos': [photo.url for photo in hall.photos],
+        'packages': [serialize_package(p) for p in hall.packages],
+        'functional_rooms': [serialize_functional_room(r) for r in hall.functional_rooms],
+        'guest_rooms': [serialize_guest_room(r) for r in hall.guest_rooms],
+        'has_basic_rooms': hall.has_basic_rooms,
+        'has_stage': hall.has_stage,
+        'basic_rooms_count': hall.basic_rooms_count,
+        'has_dining_hall': hall.has_dining_hall,
+        'has_kitchen': hall.has_kitchen,
+        'latitude': hall.latitude,
+        'longitude': hall.longitude
+    }
@@ -0,0 +1,164 @@
+from collections import defaultdict
+from sqlalchemy import select
+from app import db
+from app.models import Booking, Customer, DailyHallStats, FunctionHall, Inquiry
+from app.availability import dialect_insert
+
+# -------------------------
+# Daily Stats Rollup
+# -------------------------
+# daily_hall_stats keeps running totals per (hall_id, day). Every booking or
+# inquiry write applies its delta inside its own transaction, as an additive
+# upsert (col = col + delta), so concurrent writers to the same hall-day never
+# lose each other's counts. Dashboard reads only ever touch the rollup.
+# Inquiries without a hall are not rolled up.
+
+STAT_COLUMNS = ('bookings', 'revenue', 'confirmed_bookings', 'confirmed_revenue', 'inquiries')
+MAX_STATS_DAYS = 366
+
+
+def _activity_day(record):
+    return record.created_at.date() if record.created_at else getattr(record, 'event_date', None)
+
+
+def _booking_delta(deltas, booking, status, sign):
+    amount = (booking.total_amount or 0) * sign
+    row = deltas[(booking.hall_id, _activity_day(booking))]
+    row['bookings'] += sign
+    row['revenue'] += amount
+    if status == 'Confirmed':
+        row['confirmed_bookings'] += sign
+        row['confirmed_revenue'] += amount
+
+
+def _new_deltas():
+    return defaultdict(lambda: dict.fromkeys(STAT_COLUMNS, 0))
+
+
+def apply_stats_deltas(deltas):
+    """Add {(hall_id, day): {column: delta}} to the rollup. Runs in the caller's transaction."""
+    rows = sorted((
+        {'hall_id': hall_id, 'day': day, **values}
+        for (hall_id, day), values in deltas.items()
+        if hall_id is not None and day is not None and any(values.values())
+    ), key=lambda row: (row['hall_id'], row['day']))
+    if not rows:
+        return
+    table = DailyHallStats.__table__
+    stmt = dialect_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['hall_id', 'day'],
+        set_={name: table.c[name] + stmt.excluded[name] for name in STAT_COLUMNS}
+    )
+    db.session.execute(stmt)
+
+
+def record_booking(booking, sign=1):
+    """Count a new booking (sign=1) or remove a deleted one (sign=-1). Flush first so created_at is set."""
+    deltas = _new_deltas()
+    _booking_delta(deltas, booking, booking.status, sign)
+    apply_stats_deltas(deltas)
+
+
+def record_booking_status(booking, old_status):
+    """Move a booking's confirmed totals when its status changes"""
+    record_status_changes([(booking, old_status, booking.status)])
+
+
+def record_status_changes(changes):
+    """Batch form of record_booking_status: [(booking, old_status, new_status), ...] in one upsert"""
+    deltas = _new_deltas()
+    for booking, old_status, new_status in changes:
+        if (old_status == 'Confirmed') != (new_status == 'Confirmed'):
+            _booking_delta(deltas, booking, old_status, -1)
+            _booking_delta(deltas, booking, new_status, 1)
+    apply_stats_deltas(deltas)
+
+
+def record_inquiry(inquiry, sign=1):
+    deltas = _new_deltas()
+    deltas[(inquiry.hall_id, _activity_day(inquiry))]['inquiries'] += sign
+    apply_stats_deltas(deltas)
+
+
+def remove_customer_activity(customer_id):
+    """Subtract a customer's bookings and inquiries; call before deleting them"""
+    deltas = _new_deltas()
+    for booking in Booking.query.filter_by(customer_id=customer_id):
+        _booking_delta(deltas, booking, booking.status, -1)
+    for inquiry in Inquiry.query.filter_by(customer_id=customer_id):
+        deltas[(inquiry.hall_id, _activity_day(inquiry))]['inquiries'] -= 1
+    apply_stats_deltas(deltas)
+
+
+def rebuild_daily_stats(batch_size=1000):
+    """Recompute the whole rollup from bookings and inquiries (backfill / repair)"""
+    deltas = _new_deltas()
+    bookings = db.session.query(
+        Booking.hall_id, Booking.event_date, Booking.created_at, Booking.status, Booking.total_amount
+    ).execution_options(yield_per=batch_size)
+    for booking in bookings:
+        _booking_delta(deltas, booking, booking.status, 1)
+    inquiries = db.session.query(Inquiry.hall_id, Inquiry.created_at).filter(
+        Inquiry.hall_id.isnot(None)
+    ).execution_options(yield_per=batch_size)
+    for inquiry in inquiries:
+        deltas[(inquiry.hall_id, _activity_day(inquiry))]['inquiries'] += 1
+
+    DailyHallStats.query.delete()
+    keys = sorted(key for key in deltas if None not in key)
+    for start in range(0, len(keys), batch_size):
+        apply_stats_deltas({key: deltas[key] for key in keys[start:start + batch_size]})
+    return len(keys)
+
+
+# -------------------------
+# Dashboard Reads
+# -------------------------
+
+def _rollup_filter(stmt, start, end, hall_id):
+    if start:
+        stmt = stmt.where(DailyHallStats.day >= start)
+    if end:
+        stmt = stmt.where(DailyHallStats.day <= end)
+    if hall_id:
+        stmt = stmt.where(DailyHallStats.hall_id == hall_id)
+    return stmt
+
+
+def dashboard_stats(start=None, end=None, hall_id=None):
+    """Admin dashboard totals in one round trip; start/end (inclusive) and hall_id narrow the rollup sums"""
+    sums = _rollup_filter(select(*[
+        db.func.coalesce(db.func.sum(DailyHallStats.__table__.c[name]), 0).label(name)
+        for name in STAT_COLUMNS
+    ]), start, end, hall_id).subquery()
+
+    row = db.session.execute(select(
+        select(db.func.count(FunctionHall.id)).scalar_subquery().label('total_halls'),
+        select(db.func.count(Customer.id)).scalar_subquery().label('total_customers'),
+        *sums.c
+    )).one()
+
+    return {
+        'total_halls': row.total_halls,
+        'total_bookings': row.bookings,
+        'total_customers': row.total_customers,
+        'total_revenue': row.revenue,
+        'confirmed_bookings': row.confirmed_bookings,
+        'confirmed_revenue': row.confirmed_revenue,
+        'total_inquiries': row.inquiries
+    }
+
+
+def daily_series(start, end, hall_id=None):
+    """Per-day totals between start and end (inclusive); days without activity are omitted"""
+    table = DailyHallStats.__table__
+    stmt = _rollup_filter(select(
+        DailyHallStats.day,
+        *[db.func.sum(table.c[name]).label(name) for name in STAT_COLUMNS]
+    ), start, end, hall_id).group_by(DailyHallStats.day).order_by(DailyHallStats.day)
+
+    return [
+        {'date': row.day.isoformat(), **{name: row._mapping[name] for name in STAT_COLUMNS}}
+        for row in db.session.execute(stmt)
+    ]
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Add the unique (hall_id, date) index on calendar and rebuild it from bookings
+Safe to re-run: every hall-day that has a booking is recomputed
+"""
+
+from sqlalchemy import text
+from app import create_app, db
+from app.models import Booking
+from app.availability import sync_calendar
+
+BATCH_SIZE = 1000
+
+app = create_app()
+
+with app.app_context():
+    db.session.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_calendar_hall_date ON calendar (hall_id, date)"
+    ))
+    db.session.commit()
+
+    pairs = db.session.query(Booking.hall_id, Booking.event_date).distinct().all()
+    for start in range(0, len(pairs), BATCH_SIZE):
+        sync_calendar(pairs[start:start + BATCH_SIZE])
+        db.session.commit()
+    print(f"✓ Calendar rebuilt for {len(pairs)} hall-days")
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Create the daily_hall_stats rollup and rebuild it from bookings and inquiries
+Safe to re-run: the table is recomputed from scratch in one transaction
+"""
+
+from app import create_app, db
+from app.models import DailyHallStats
+from app.stats import rebuild_daily_stats
+
+app = create_app()
+
+with app.app_context():
+    DailyHallStats.__table__.create(db.engine, checkfirst=True)
+
+    hall_days = rebuild_daily_stats()
+    db.session.commit()
+    print(f"✓ Daily stats rebuilt for {hall_days} hall-days")
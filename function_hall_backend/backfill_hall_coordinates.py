@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Backfill hall coordinates for geo radius search
+
+Usage:
+    python backfill_hall_coordinates.py                 # recompute geo_cell for halls that have lat/lon
+    python backfill_hall_coordinates.py coords.csv      # import hall_id,latitude,longitude rows
+    python backfill_hall_coordinates.py --geocode       # geocode halls missing coordinates from their location text
+"""
+
+import csv
+import sys
+import time
+import requests
+from app import create_app, db
+from app.models import FunctionHall
+
+NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
+GEOCODE_DELAY_SECONDS = 1.0  # Nominatim usage policy: max 1 request per second
+BATCH_SIZE = 500
+
+
+def recompute_cells():
+    updated = 0
+    halls = FunctionHall.query.filter(FunctionHall.latitude.isnot(None), FunctionHall.longitude.isnot(None))
+    for hall in halls.yield_per(BATCH_SIZE):
+        hall.set_coordinates(hall.latitude, hall.longitude)
+        updated += 1
+    db.session.commit()
+    print(f"✓ Recomputed geo_cell for {updated} halls")
+
+
+def import_csv(path):
+    updated = 0
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            hall = FunctionHall.query.get(int(row['hall_id']))
+            if not hall:
+                print(f"⚠️ Hall {row['hall_id']} not found, skipped")
+                continue
+            hall.set_coordinates(float(row['latitude']), float(row['longitude']))
+            updated += 1
+            if updated % BATCH_SIZE == 0:
+                db.session.commit()
+    db.session.commit()
+    print(f"✓ Imported coordinates for {updated} halls")
+
+
+def geocode_missing():
+    halls = FunctionHall.query.filter(FunctionHall.latitude.is_(None), FunctionHall.location.isnot(None)).all()
+    print(f"Geocoding {len(halls)} halls...")
+    session = requests.Session()
+    session.headers['User-Agent'] = 'functionhall-backfill/1.0'
+    updated = 0
+    for hall in halls:
+        try:
+            response = session.get(NOMINATIM_URL, params={'q': hall.location, 'format': 'json', 'limit': 1}, timeout=10)
+            response.raise_for_status()
+            results = response.json()
+        except Exception as e:
+            print(f"❌ Hall {hall.id} ({hall.location}): {e}")
+            results = []
+        if results:
+            hall.set_coordinates(float(results[0]['lat']), float(results[0]['lon']))
+            db.session.commit()
+            updated += 1
+            print(f"✅ Hall {hall.id}: {hall.location} -> {hall.latitude}, {hall.longitude}")
+        else:
+            print(f"⚠️ Hall {hall.id}: no match for '{hall.location}'")
+        time.sleep(GEOCODE_DELAY_SECONDS)
+    print(f"✓ Geocoded {updated}/{len(halls)} halls")
+
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        if len(sys.argv) > 1 and sys.argv[1] == '--geocode':
+            geocode_missing()
+        elif len(sys.argv) > 1:
+            import_csv(sys.argv[1])
+        else:
+            recompute_cells()
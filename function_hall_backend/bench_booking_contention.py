@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Booking contention benchmark
+Many clients race POST /api/bookings for the same hall and date. Reports
+throughput, latency percentiles and the number of winners per round
+(must always be exactly 1).
+
+Usage:
+    python bench_booking_contention.py [--clients 32] [--rounds 20]
+
+Runs against a throwaway SQLite database unless BENCH_DATABASE_URL points
+at a scratch PostgreSQL database. Never point it at production.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+tmp_dir = None
+if os.environ.get('BENCH_DATABASE_URL'):
+    os.environ['DATABASE_URL'] = os.environ['BENCH_DATABASE_URL']
+else:
+    tmp_dir = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+from app import create_app, db
+from app.models import Booking, Calendar, Customer, FunctionHall, Notification
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def seed(clients):
+    hall = FunctionHall(name='Bench Hall', owner_name='Bench', contact_number='+910000000000',
+                        location='Bench', capacity=100, price_per_day=1000,
+                        is_approved=True, approval_status='approved')
+    db.session.add(hall)
+    customers = []
+    for i in range(clients):
+        customer = Customer(name=f'Bench Customer {i}', email=f'bench-{os.getpid()}-{i}@example.com',
+                            phone='9000000000', is_approved=True, approval_status='approved')
+        db.session.add(customer)
+        customers.append(customer)
+    db.session.commit()
+    return hall.id, [c.id for c in customers]
+
+
+def cleanup(hall_id, customer_ids):
+    booking_ids = [b.id for b in Booking.query.filter_by(hall_id=hall_id)]
+    if booking_ids:
+        Notification.query.filter(Notification.booking_id.in_(booking_ids)).delete(synchronize_session=False)
+    Booking.query.filter_by(hall_id=hall_id).delete()
+    Calendar.query.filter_by(hall_id=hall_id).delete()
+    Customer.query.filter(Customer.id.in_(customer_ids)).delete(synchronize_session=False)
+    FunctionHall.query.filter_by(id=hall_id).delete()
+    db.session.commit()
+
+
+def run_round(app, hall_id, customer_ids, event_date):
+    """All clients POST the same hall/date at once; returns [(status_code, seconds)]"""
+    barrier = threading.Barrier(len(customer_ids))
+    results = [None] * len(customer_ids)
+
+    def client(index, customer_id):
+        with app.test_client() as http:
+            barrier.wait()
+            started = time.perf_counter()
+            response = http.post('/api/bookings', json={
+                'customer_id': customer_id,
+                'hall_id': hall_id,
+                'event_date': event_date.isoformat(),
+                'total_amount': 1000
+            })
+            results[index] = (response.status_code, time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(i, c)) for i, c in enumerate(customer_ids)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32, help='concurrent clients per round')
+    parser.add_argument('--rounds', type=int, default=20, help='rounds, each racing for a fresh date')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        hall_id, customer_ids = seed(args.clients)
+
+    latencies, statuses, bad_rounds = [], {}, 0
+    first_date = date.today() + timedelta(days=365)
+    started = time.perf_counter()
+    for r in range(args.rounds):
+        results = run_round(app, hall_id, customer_ids, first_date + timedelta(days=r))
+        winners = sum(1 for status, _ in results if status == 201)
+        if winners != 1:
+            bad_rounds += 1
+        for status, seconds in results:
+            statuses[status] = statuses.get(status, 0) + 1
+            latencies.append(seconds)
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        cleanup(hall_id, customer_ids)
+        backend = db.engine.url.get_backend_name()
+
+    latencies.sort()
+    print(f"\n{'='*60}")
+    print(f"BOOKING CONTENTION - {args.clients} clients x {args.rounds} rounds ({backend})")
+    print(f"{'='*60}")
+    print(f"Requests:    {len(latencies)} in {elapsed:.2f}s -> {len(latencies) / elapsed:.1f} req/s")
+    print(f"Latency:     p50 {percentile(latencies, 50) * 1000:.1f} ms | p99 {percentile(latencies, 99) * 1000:.1f} ms | max {latencies[-1] * 1000:.1f} ms")
+    print(f"Status:      {dict(sorted(statuses.items()))}")
+    print(f"Double-book: {'✓ none' if bad_rounds == 0 else f'✗ {bad_rounds} rounds without exactly one winner'}")
+    print(f"{'='*60}\n")
+
+    if tmp_dir:
+        tmp_dir.cleanup()
+    sys.exit(1 if bad_rounds else 0)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Customer login throughput benchmark
+Concurrent clients POST /api/customer/login at each password hash cost.
+Reports one-hash time, login throughput and latency percentiles, plus
+how many logins were turned away with 503 by the bounded hash executor.
+
+Usage:
+    python bench_password_login.py [--algorithm pbkdf2] [--costs 100000,300000,600000]
+                                   [--clients 16] [--requests 200]
+
+Runs against a throwaway SQLite database unless BENCH_DATABASE_URL points
+at a scratch PostgreSQL database. Never point it at production.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+tmp_dir = None
+if os.environ.get('BENCH_DATABASE_URL'):
+    os.environ['DATABASE_URL'] = os.environ['BENCH_DATABASE_URL']
+else:
+    tmp_dir = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+os.environ['RATELIMIT_ENABLED'] = 'False'  # measure hashing, not the login throttle
+
+from werkzeug.security import generate_password_hash
+from app import create_app, db, passwords
+from app.models import Customer
+
+PASSWORD = 'bench-password-123'
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def seed(method):
+    customer = Customer(name='Bench Customer', email=f'bench-login-{os.getpid()}@example.com',
+                        phone='9000000000', is_approved=True, approval_status='approved',
+                        password_hash=generate_password_hash(PASSWORD, method))
+    db.session.add(customer)
+    db.session.commit()
+    return customer.id, customer.email
+
+
+def run_logins(app, email, clients, total):
+    """`clients` threads share `total` logins; returns [(status_code, seconds)]"""
+    results = []
+    lock = threading.Lock()
+    remaining = [total]
+
+    def client():
+        with app.test_client() as http:
+            while True:
+                with lock:
+                    if remaining[0] == 0:
+                        return
+                    remaining[0] -= 1
+                started = time.perf_counter()
+                response = http.post('/api/customer/login', json={'email': email, 'password': PASSWORD})
+                elapsed = time.perf_counter() - started
+                with lock:
+                    results.append((response.status_code, elapsed))
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--algorithm', default=passwords.PASSWORD_HASH_ALGORITHM, choices=['pbkdf2', 'scrypt'])
+    parser.add_argument('--costs', help='comma-separated costs (pbkdf2 iterations or scrypt N)')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=200, help='logins per cost setting')
+    args = parser.parse_args()
+
+    default_costs = {'pbkdf2': '100000,300000,600000', 'scrypt': '16384,32768,65536'}
+    costs = [int(c) for c in (args.costs or default_costs[args.algorithm]).split(',')]
+
+    app = create_app()
+    executor = passwords.get_hash_executor()
+    rows = []
+    for cost in costs:
+        method = passwords.hash_method(args.algorithm, cost)
+        passwords.PASSWORD_HASH_METHOD = method
+
+        started = time.perf_counter()
+        generate_password_hash(PASSWORD, method)
+        one_hash = time.perf_counter() - started
+
+        with app.app_context():
+            customer_id, email = seed(method)
+
+        started = time.perf_counter()
+        results = run_logins(app, email, args.clients, args.requests)
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            Customer.query.filter_by(id=customer_id).delete()
+            db.session.commit()
+
+        ok = sorted(seconds for status, seconds in results if status == 200)
+        busy = sum(1 for status, _ in results if status == 503)
+        other = len(results) - len(ok) - busy
+        rows.append((method, one_hash, len(ok) / elapsed, ok, busy, other))
+
+    with app.app_context():
+        backend = db.engine.url.get_backend_name()
+
+    print(f"\n{'='*78}")
+    print(f"CUSTOMER LOGIN - {args.clients} clients x {args.requests} logins per cost ({backend}, "
+          f"{passwords.PASSWORD_HASH_WORKERS} hash workers, queue {passwords.PASSWORD_HASH_QUEUE})")
+    print(f"{'='*78}")
+    print(f"{'method':<24}{'1 hash':>10}{'logins/s':>10}{'p50':>10}{'p99':>10}{'503s':>7}{'other':>7}")
+    for method, one_hash, rate, ok, busy, other in rows:
+        p50 = f"{percentile(ok, 50) * 1000:.0f} ms" if ok else '-'
+        p99 = f"{percentile(ok, 99) * 1000:.0f} ms" if ok else '-'
+        print(f"{method:<24}{one_hash * 1000:>7.0f} ms{rate:>10.1f}{p50:>10}{p99:>10}{busy:>7}{other:>7}")
+    print(f"{'='*78}\n")
+
+    executor.pool.shutdown(wait=True)
+    if tmp_dir:
+        tmp_dir.cleanup()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Local fake SMS provider
+Accepts the JSON POSTs sent by sms_utils.HTTPBackend and answers like a
+provider would, so the outbox worker and SMS benchmarks can run without Twilio.
+
+Usage:
+    python fake_sms_server.py [--port 8025] [--latency-ms 150] [--fail-rate 0.05]
+    SMS_BACKEND=http SMS_HTTP_URL=http://127.0.0.1:8025/sms python notification_worker.py
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+counter = itertools.count(1)
+counter_lock = threading.Lock()
+
+
+def make_handler(latency, fail_rate, quiet):
+    class FakeSMSHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real provider
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if latency:
+                time.sleep(latency)
+
+            if random.random() < fail_rate:
+                status, body = 503, {'error': 'simulated provider failure'}
+            else:
+                with counter_lock:
+                    sid = f"FAKE{next(counter):08d}"
+                status, body = 201, {'sid': sid, 'status': 'queued', 'to': payload.get('to')}
+                if not quiet:
+                    print(f"📱 {sid} -> {payload.get('to')}: {payload.get('body', '')[:60]!r}")
+
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeSMSHandler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--latency-ms', type=float, default=0, help='simulated provider latency per message')
+    parser.add_argument('--fail-rate', type=float, default=0, help='fraction of requests answered with 503')
+    parser.add_argument('--quiet', action='store_true', help='do not print each message')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.latency_ms / 1000, args.fail_rate, args.quiet))
+    print(f"📡 Fake SMS server on http://127.0.0.1:{args.port}/sms")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+SMS outbox worker
+Delivers the SMS that request handlers queue in the notifications table
+(channel='sms'), retrying failures with exponential backoff. Also turns
+due enquiry digest windows into outbox messages and sweeps expired OTPs.
+
+Usage:
+    python notification_worker.py            # run forever
+    python notification_worker.py --once     # drain what is due now and exit
+
+Run as its own process (see Procfile). Several workers can run side by side
+on PostgreSQL; rows are claimed with FOR UPDATE SKIP LOCKED.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.outbox import deliver_batch, outbox_stats
+from app.digests import flush_due_digests
+from app.otp_store import get_otp_store
+from sms_utils import send_sms_batch
+
+
+def drain(batch_size):
+    """Deliver batches until nothing is due; returns how many rows were processed"""
+    total = 0
+    while True:
+        processed = deliver_batch(send_sms_batch, limit=batch_size)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--once', action='store_true', help='drain due messages once and exit')
+    parser.add_argument('--interval', type=float, default=float(os.environ.get('OUTBOX_POLL_INTERVAL', 2)),
+                        help='seconds to sleep when the outbox is empty')
+    parser.add_argument('--batch-size', type=int, default=50, help='messages claimed per batch')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"📬 Outbox worker started - {outbox_stats()}")
+        while True:
+            try:
+                digests = flush_due_digests()
+                if digests:
+                    print(f"🗂️ Queued {digests} enquiry digests")
+                expired = get_otp_store().sweep()
+                if expired:
+                    print(f"🧹 Swept {expired} expired OTPs")
+                processed = drain(args.batch_size)
+                if processed:
+                    print(f"📨 Processed {processed} messages - {outbox_stats()}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Outbox worker error: {e}")
+            if args.once:
+                break
+            time.sleep(args.interval)
@@ -33,7 +33,20 @@ if __name__ == "__main__":
     
     migrations = [
         'add_function_type_column.py',
-        'add_dining_kitchen_columns.py'
+        'add_dining_kitchen_columns.py',
+        'add_booking_availability_index.py',
+        'add_hall_sort_indexes.py',
+        'add_hall_search_indexes.py',
+        'add_hall_geo_columns.py',
+        'backfill_calendar.py',
+        'add_booking_unique_active_index.py',
+        'add_booking_listing_indexes.py',
+        'backfill_daily_stats.py',
+        'add_notification_outbox_columns.py',
+        'add_enquiry_digests.py',
+        'add_hall_photo_index.py',
+        'add_otp_codes.py',
+        'add_customer_auth_version.py'
     ]
     
     results = {}
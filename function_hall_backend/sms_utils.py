@@ -1,87 +1,281 @@
 """
 SMS Utility for sending messages via Twilio
+
+All sends go through one process-wide SMSTransport:
+- the backend (Twilio, log-only, HTTP or in-memory) is built once and reused,
+  so Twilio traffic rides a keep-alive HTTPS session instead of a new
+  connection and TLS handshake per message
+- a bounded thread pool sends batches in parallel
+- a token bucket keeps us under the provider's rate limit
+- every provider call has a timeout
+
+Backend selection (SMS_BACKEND): 'twilio', 'log', 'http' (POST JSON to
+SMS_HTTP_URL, e.g. fake_sms_server.py) or 'memory'. Defaults to 'twilio'
+when SMS_ENABLED is true, else 'log'.
 """
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from twilio_config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER, SMS_ENABLED
 
+SMS_BATCH_WORKERS = int(os.environ.get('SMS_BATCH_WORKERS', 8))
+SMS_RATE_PER_SECOND = float(os.environ.get('SMS_RATE_PER_SECOND', 10))
+SMS_TIMEOUT = float(os.environ.get('SMS_TIMEOUT', 10))
+
+# Twilio error codes worth a hint in the logs
+TWILIO_ERROR_HINTS = {
+    '30034': "'To' number is not a valid phone number",
+    '21211': "Invalid 'To' phone number",
+    '21608': "Unverified number (Trial account) - verify it in the Twilio console",
+    '21614': "'To' number not verified (Trial account) - add it to verified numbers",
+}
+
+
+# -------------------------
+# Backends
+# -------------------------
+
+class SMSBackend(ABC):
+    """Delivers one message. send() returns a send_sms result dict and must not raise."""
+    name = 'base'
+
+    @abstractmethod
+    def send(self, to_number, message):
+        """Send one message; failures come back as {'success': False, ...}"""
+
+    def close(self):
+        pass
+
+
+class LogBackend(SMSBackend):
+    """SMS disabled: messages are only logged"""
+    name = 'log'
+
+    def send(self, to_number, message):
+        print(f"⚠️ SMS DISABLED - message to {to_number} logged only:\n{message}\n")
+        return {
+            'success': True,
+            'message': 'SMS sending is disabled. Message logged to console.',
+            'sid': 'DISABLED'
+        }
+
+
+class TwilioBackend(SMSBackend):
+    """One Twilio client on a pooled keep-alive session, sized for the sender threads"""
+    name = 'twilio'
+
+    def __init__(self, timeout=SMS_TIMEOUT, pool_size=SMS_BATCH_WORKERS):
+        from requests.adapters import HTTPAdapter
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        http_client = TwilioHttpClient(pool_connections=True, timeout=timeout)
+        http_client.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.http_client = http_client
+        self.client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=http_client)
+
+    def send(self, to_number, message):
+        try:
+            sms = self.client.messages.create(body=message, from_=TWILIO_PHONE_NUMBER, to=to_number)
+            print(f"✅ SMS sent to {sms.to} - SID: {sms.sid}, status: {sms.status}")
+            return {
+                'success': True,
+                'message': 'SMS sent successfully',
+                'sid': sms.sid,
+                'status': sms.status,
+                'to': sms.to
+            }
+        except Exception as e:
+            error_msg = str(e)
+            hint = next((f" ({code}: {text})" for code, text in TWILIO_ERROR_HINTS.items() if code in error_msg), '')
+            print(f"❌ SMS to {to_number} failed: {error_msg}{hint}")
+            return {
+                'success': False,
+                'message': f'Failed to send SMS: {error_msg}',
+                'error': error_msg
+            }
+
+    def close(self):
+        self.http_client.session.close()
+
+
+class HTTPBackend(SMSBackend):
+    """POSTs {to, from, body} as JSON to a URL on a keep-alive session - for fake SMS servers and gateways"""
+    name = 'http'
+
+    def __init__(self, url, timeout=SMS_TIMEOUT, pool_size=SMS_BATCH_WORKERS):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def send(self, to_number, message):
+        try:
+            response = self.session.post(self.url, json={
+                'to': to_number, 'from': TWILIO_PHONE_NUMBER, 'body': message
+            }, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json() if response.content else {}
+            return {
+                'success': True,
+                'message': 'SMS sent successfully',
+                'sid': data.get('sid'),
+                'status': data.get('status'),
+                'to': to_number
+            }
+        except Exception as e:
+            print(f"❌ SMS to {to_number} failed: {e}")
+            return {'success': False, 'message': f'Failed to send SMS: {e}', 'error': str(e)}
+
+    def close(self):
+        self.session.close()
+
+
+class MemoryBackend(SMSBackend):
+    """Keeps sent messages in memory; optional fixed latency and failure predicate for tests"""
+    name = 'memory'
+
+    def __init__(self, latency=0.0, fail=None):
+        self.latency = latency
+        self.fail = fail
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, to_number, message):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail and self.fail(to_number, message):
+            return {'success': False, 'message': 'Failed to send SMS: rejected', 'error': 'rejected'}
+        with self._lock:
+            self.sent.append((to_number, message))
+            sid = f"MEM{len(self.sent)}"
+        return {'success': True, 'message': 'SMS sent successfully', 'sid': sid, 'status': 'sent', 'to': to_number}
+
+
+# -------------------------
+# Transport
+# -------------------------
+
+class RateLimiter:
+    """Token bucket shared by all sender threads; acquire() blocks until a send is allowed"""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SMSTransport:
+    """A backend plus a bounded sender pool and a rate limit"""
+
+    def __init__(self, backend, max_workers=SMS_BATCH_WORKERS, rate=SMS_RATE_PER_SECOND):
+        self.backend = backend
+        self.limiter = RateLimiter(rate)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sms')
+
+    def send(self, to_number, message):
+        if not to_number:
+            return {'success': False, 'message': 'Failed to send SMS: no phone number', 'error': 'no phone number'}
+        self.limiter.acquire()
+        try:
+            return self.backend.send(to_number, message)
+        except Exception as e:
+            # A backend that breaks the must-not-raise contract fails only its own message
+            print(f"❌ SMS to {to_number} failed: {e}")
+            return {'success': False, 'message': f'Failed to send SMS: {e}', 'error': str(e)}
+
+    def send_many(self, messages):
+        """[(to_number, message), ...] -> results in the same order, sent in parallel"""
+        futures = [self.pool.submit(self.send, to_number, message) for to_number, message in messages]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.backend.close()
+
+
+def build_backend(name=None):
+    name = (name or os.environ.get('SMS_BACKEND') or ('twilio' if SMS_ENABLED else 'log')).lower()
+    if name == 'twilio':
+        return TwilioBackend()
+    if name == 'http':
+        return HTTPBackend(os.environ.get('SMS_HTTP_URL', 'http://127.0.0.1:8025/sms'))
+    if name == 'memory':
+        return MemoryBackend()
+    return LogBackend()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """The process-wide transport, created on first use"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = SMSTransport(build_backend())
+    return _transport
+
+
+def set_transport(transport):
+    """Swap the process-wide transport (tests, benchmarks); returns the previous one"""
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    return previous
+
+
 def send_sms(to_number, message):
     """
     Send SMS to a phone number
-    
+
     Args:
         to_number (str): Recipient phone number (format: +919876543210)
         message (str): Message content
-    
+
     Returns:
         dict: Result with 'success' and 'message' keys
     """
-    print(f"\n{'='*60}")
-    print(f"📱 SENDING SMS")
-    print(f"{'='*60}")
-    print(f"To: {to_number}")
-    print(f"From: {TWILIO_PHONE_NUMBER}")
-    print(f"Message Preview: {message[:100]}...")
-    print(f"{'='*60}\n")
-    
-    if not SMS_ENABLED:
-        print(f"⚠️ SMS DISABLED - Message logged only")
-        print(f"Full Message:\n{message}\n")
-        return {
-            'success': True,
-            'message': 'SMS sending is disabled. Message logged to console.',
-            'sid': 'DISABLED'
-        }
-    
-    try:
-        from twilio.rest import Client
-        
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        
-        sms = client.messages.create(
-            body=message,
-            from_=TWILIO_PHONE_NUMBER,
-            to=to_number
-        )
-        
-        print(f"✅ SMS SENT SUCCESSFULLY!")
-        print(f"   SID: {sms.sid}")
-        print(f"   Status: {sms.status}")
-        print(f"   To: {sms.to}")
-        print(f"   From: {sms.from_}")
-        print(f"\n⚠️ IMPORTANT: For Twilio Trial accounts:")
-        print(f"   - This number ({to_number}) must be verified in Twilio console")
-        print(f"   - Visit: https://console.twilio.com/us1/develop/phone-numbers/manage/verified")
-        print(f"   - Check delivery status: https://console.twilio.com/us1/monitor/logs/sms")
-        print(f"   - Search for SID: {sms.sid}\n")
-        
-        return {
-            'success': True,
-            'message': 'SMS sent successfully',
-            'sid': sms.sid,
-            'status': sms.status,
-            'to': sms.to
-        }
-        
-    except Exception as e:
-        error_msg = str(e)
-        print(f"❌ SMS SENDING FAILED!")
-        print(f"   Error: {error_msg}")
-        
-        # Check for common errors
-        if "30034" in error_msg:
-            print(f"   → Error 30034: 'To' number is not a valid phone number")
-            print(f"   → Check phone number format: {to_number}")
-        elif "21211" in error_msg:
-            print(f"   → Error 21211: Invalid 'To' phone number")
-        elif "21608" in error_msg:
-            print(f"   → Error 21608: Unverified number (Trial account)")
-            print(f"   → Verify this number in Twilio console!")
-        elif "21614" in error_msg:
-            print(f"   → Error 21614: 'To' number not verified (Trial account)")
-            print(f"   → Add {to_number} to verified numbers in Twilio")
-        
-        print()
-        return {
-            'success': False,
-            'message': f'Failed to send SMS: {error_msg}',
-            'error': error_msg
-        }
+    return get_transport().send(to_number, message)
+
+
+def send_sms_batch(messages):
+    """
+    Send many SMS in one go
+
+    Args:
+        messages (list): [(to_number, message), ...]
+
+    Returns:
+        list: One send_sms result per message, in the same order
+    """
+    if not messages:
+        return []
+    print(f"📱 Sending batch of {len(messages)} SMS")
+    return get_transport().send_many(messages)
@@ -0,0 +1,58 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def clear_process_caches():
+    """In-process caches outlive an app; tests reuse ids across fresh databases"""
+    from app.analytics import analytics_cache
+    from app.bookings import customer_bookings_cache
+    from app.jwt_auth import auth_versions, principal_cache
+    from app.ratelimit import MemoryBucketStore, set_bucket_store
+    from app.search import search_cache
+
+    for cache in (analytics_cache, auth_versions, customer_bookings_cache, principal_cache, search_cache):
+        cache.clear()
+    set_bucket_store(MemoryBucketStore())
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App on a throwaway SQLite database"""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    from app import create_app, db
+
+    app = create_app()
+    app.config['TESTING'] = True
+    clear_process_caches()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+    clear_process_caches()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def super_admin_headers(app):
+    """Authorization header for a freshly created super admin"""
+    import jwt
+    from app import db
+    from app.jwt_auth import SECRET_KEY
+    from app.models import AdminUser
+
+    admin = AdminUser(name='Super Admin', email='super@example.com', password_hash='x',
+                      role='super_admin', is_approved=True)
+    db.session.add(admin)
+    db.session.commit()
+    token = jwt.encode({'admin_id': admin.id, 'email': admin.email, 'role': admin.role, 'is_admin': True,
+                        'exp': datetime.utcnow() + timedelta(hours=1)}, SECRET_KEY, algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,40 @@
+import pytest
+
+from app import db
+from app.models import FunctionHall
+
+
+def seed_hall():
+    hall = FunctionHall(name='Batch Hall', location='Hyderabad', capacity=100, price_per_day=1000,
+                        is_approved=True, approval_status='approved')
+    db.session.add(hall)
+    db.session.commit()
+    return hall.id
+
+
+def test_batch_availability_matrix(client):
+    hall_id = seed_hall()
+    response = client.post('/api/availability/batch',
+                           json={'hall_ids': [hall_id, hall_id, 999], 'dates': ['2030-01-01']})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['hall_ids'] == [hall_id, 999]
+    assert body['available'] == [[True], None]
+
+
+@pytest.mark.parametrize('body', [
+    '{"hall_ids": [1]',
+    '[1, 2]',
+    '"hall_ids"',
+])
+def test_non_object_body_is_rejected(client, body):
+    response = client.post('/api/availability/batch', data=body, content_type='application/json')
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('hall_ids', [[True], [1.9], ['7'], [None], [[1]]])
+def test_hall_ids_must_be_integers(client, hall_ids):
+    seed_hall()
+    response = client.post('/api/availability/batch', json={'hall_ids': hall_ids, 'dates': ['2030-01-01']})
+    assert response.status_code == 400
+    assert 'hall_ids' in response.get_json()['error']
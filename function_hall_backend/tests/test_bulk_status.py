@@ -0,0 +1,69 @@
+from datetime import date
+
+from app import db
+from app.models import Booking, Customer, FunctionHall
+
+EVENT_DAY = date(2027, 2, 1)
+
+
+def seed_hall():
+    customer = Customer(name='Customer', email='customer@example.com', phone='9999999999',
+                        is_approved=True, approval_status='approved')
+    hall = FunctionHall(name='Hall', owner_name='Owner', contact_number='+919000000000',
+                        is_approved=True, approval_status='approved')
+    db.session.add_all([customer, hall])
+    db.session.commit()
+    return customer, hall
+
+
+def add_booking(customer, hall, status):
+    booking = Booking(customer_id=customer.id, hall_id=hall.id, event_date=EVENT_DAY, status=status, total_amount=1000)
+    db.session.add(booking)
+    db.session.commit()
+    return booking.id
+
+
+def status_of(booking_id):
+    db.session.expire_all()
+    return db.session.get(Booking, booking_id).status
+
+
+def test_bulk_status_requires_super_admin(client):
+    response = client.post('/api/bookings/bulk-status', json={'ids': [1], 'status': 'Confirmed'})
+    assert response.status_code == 401
+
+
+def test_swap_active_booking_in_one_batch(client, super_admin_headers):
+    customer, hall = seed_hall()
+    # The booking being re-activated has the lower id, so a single UPDATE would reach it first
+    waiting = add_booking(customer, hall, 'Cancelled')
+    holder = add_booking(customer, hall, 'Confirmed')
+
+    response = client.post('/api/bookings/bulk-status', headers=super_admin_headers, json={'updates': [
+        {'id': waiting, 'status': 'Pending'},
+        {'id': holder, 'status': 'Cancelled'},
+    ]})
+
+    assert response.status_code == 200, response.get_json()
+    assert [item['result'] for item in response.get_json()['results']] == ['updated', 'updated']
+    assert status_of(waiting) == 'Pending'
+    assert status_of(holder) == 'Cancelled'
+
+
+def test_second_activation_for_a_hall_date_is_a_conflict(client, super_admin_headers):
+    customer, hall = seed_hall()
+    holder = add_booking(customer, hall, 'Confirmed')
+    first = add_booking(customer, hall, 'Cancelled')
+    second = add_booking(customer, hall, 'Rejected')
+
+    response = client.post('/api/bookings/bulk-status', headers=super_admin_headers, json={'updates': [
+        {'id': holder, 'status': 'Cancelled'},
+        {'id': first, 'status': 'Confirmed'},
+        {'id': second, 'status': 'Pending'},
+    ]})
+
+    assert response.status_code == 200, response.get_json()
+    results = {item['id']: item for item in response.get_json()['results']}
+    assert results[first]['result'] == 'updated'
+    assert results[second] == {'id': second, 'status': 'Rejected', 'result': 'conflict'}
+    assert [status_of(i) for i in (holder, first, second)] == ['Cancelled', 'Confirmed', 'Rejected']
@@ -0,0 +1,108 @@
+import json
+
+from app import db
+from app.cache import TTLCache, cached_json_response
+from app.models import AdminUser, FunctionHall, HallChangeRequest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=30)
+    clock.now += 9.9
+    assert cache.get('a') == 1
+    clock.now += 0.1
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    clock.now += 20
+    assert cache.get('b', 'gone') == 'gone'
+    assert cache.stats()['size'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')  # 'b' is now the least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert (stats['hits'], stats['misses']) == (3, 1)
+
+
+def test_invalidate_by_key_and_value():
+    cache = TTLCache()
+    for key in ('hall:1', 'hall:2', 'booking:1'):
+        cache.set(key, {'key': key})
+    assert cache.invalidate_where(lambda key: key.startswith('hall:')) == 2
+    assert cache.invalidate_items(lambda key, value: value['key'] == 'booking:1') == 1
+    assert cache.stats()['size'] == 0
+
+
+def test_cached_json_response_builds_once(app):
+    cache = TTLCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {'halls': len(calls)}
+
+    first = cached_json_response(cache, 'key', build)
+    second = cached_json_response(cache, 'key', build)
+    assert first.get_json() == second.get_json() == {'halls': 1}
+    assert second.mimetype == 'application/json'
+    assert len(calls) == 1
+
+
+def hall_names(client):
+    return sorted(hall['name'] for hall in client.get('/api/halls').get_json())
+
+
+def seed_hall(name='Cached Hall', vendor_id=None):
+    hall = FunctionHall(name=name, location='Hyderabad', capacity=100, price_per_day=1000,
+                        vendor_id=vendor_id, is_approved=True, approval_status='approved')
+    db.session.add(hall)
+    db.session.commit()
+    return hall
+
+
+def test_listing_is_served_from_cache_until_a_hall_write(client):
+    seed_hall()
+    assert hall_names(client) == ['Cached Hall']
+
+    # A write that skips the routes (another worker, a script) is not seen yet
+    seed_hall('Quiet Hall')
+    assert hall_names(client) == ['Cached Hall']
+
+    response = client.post('/api/halls', json={'name': 'New Hall', 'location': 'Hyderabad', 'capacity': 50,
+                                               'price_per_day': 500})
+    assert response.status_code == 201
+    assert hall_names(client) == ['Cached Hall', 'New Hall', 'Quiet Hall']
+
+
+def test_approved_hall_edit_invalidates_the_listing(client, super_admin_headers):
+    vendor = AdminUser(name='Vendor', email='vendor@example.com', password_hash='x', role='vendor', is_approved=True)
+    db.session.add(vendor)
+    db.session.commit()
+    hall = seed_hall(vendor_id=vendor.id)
+    assert hall_names(client) == ['Cached Hall']
+
+    change = HallChangeRequest(hall_id=hall.id, vendor_id=vendor.id, action_type='edit', status='pending',
+                               new_data=json.dumps({'name': 'Renamed Hall', 'location': 'Hyderabad',
+                                                    'capacity': 100, 'price_per_day': 1000}))
+    db.session.add(change)
+    db.session.commit()
+    response = client.post(f'/api/admin/hall-requests/{change.id}/approve', headers=super_admin_headers)
+    assert response.status_code == 200
+    assert hall_names(client) == ['Renamed Hall']
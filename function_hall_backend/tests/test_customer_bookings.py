@@ -0,0 +1,49 @@
+from datetime import date
+
+from app import db
+from app.bookings import customer_bookings_cache
+from app.models import Booking, Customer, FunctionHall
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def seed_customer_and_hall():
+    customer = Customer(name='Customer', email='customer@example.com', phone='9999999999',
+                        is_approved=True, approval_status='approved')
+    hall = FunctionHall(name='Hall', owner_name='Owner', contact_number='+919000000000',
+                        is_approved=True, approval_status='approved')
+    db.session.add_all([customer, hall])
+    db.session.commit()
+    return customer, hall
+
+
+def add_booking(customer, hall, day):
+    db.session.add(Booking(customer_id=customer.id, hall_id=hall.id, event_date=day, status='Confirmed',
+                           total_amount=1000))
+    db.session.commit()
+
+
+def test_default_ttl_is_a_few_seconds():
+    assert customer_bookings_cache.ttl <= 10
+
+
+def test_write_from_another_worker_shows_after_the_ttl(client, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(customer_bookings_cache, 'clock', clock)
+    customer, hall = seed_customer_and_hall()
+    add_booking(customer, hall, date(2027, 3, 1))
+    url = f'/api/customer/{customer.id}/bookings'
+    assert len(client.get(url).get_json()) == 1
+
+    # Another worker's write never invalidates this worker's cache
+    add_booking(customer, hall, date(2027, 3, 2))
+    assert len(client.get(url).get_json()) == 1
+
+    clock.now += customer_bookings_cache.ttl
+    assert len(client.get(url).get_json()) == 2
@@ -0,0 +1,58 @@
+import time
+
+from app import db, jwt_auth
+from app.models import Customer
+
+
+def login(client):
+    customer = Customer(name='Claims Customer', email='claims@example.com', phone='9000000000',
+                        is_approved=True, approval_status='approved')
+    customer.set_password('secret-123')
+    db.session.add(customer)
+    db.session.commit()
+    token = client.post('/api/customer/login',
+                        json={'email': 'claims@example.com', 'password': 'secret-123'}).get_json()['token']
+    return customer.id, {'Authorization': f'Bearer {token}'}
+
+
+def check_auth(client, headers):
+    return client.get('/api/customer/check-auth', headers=headers).get_json()
+
+
+def reject_elsewhere(customer_id):
+    """What another worker's rejection leaves behind: a new row version this worker never heard of"""
+    customer = db.session.get(Customer, customer_id)
+    customer.approval_status = 'rejected'
+    customer.is_approved = False
+    customer.auth_version += 1
+    db.session.commit()
+
+
+def test_claims_ttl_is_capped():
+    assert jwt_auth.AUTH_CLAIMS_TTL <= jwt_auth.AUTH_CLAIMS_MAX_TTL <= 60
+    claims = jwt_auth.customer_claims(Customer(id=1, name='x', email='x@example.com', auth_version=1))
+    assert claims['cexp'] <= time.time() + jwt_auth.AUTH_CLAIMS_MAX_TTL
+
+
+def test_bump_in_this_worker_refreshes_at_once(client):
+    customer_id, headers = login(client)
+    customer = db.session.get(Customer, customer_id)
+    customer.approval_status = 'rejected'
+    jwt_auth.bump_auth_version(customer)
+    db.session.commit()
+
+    body = check_auth(client, headers)
+    assert body['customer']['approval_status'] == 'rejected'
+    assert body['token']
+
+
+def test_change_from_another_worker_shows_once_claims_expire(client, monkeypatch):
+    customer_id, headers = login(client)
+    reject_elsewhere(customer_id)
+    assert check_auth(client, headers)['customer']['approval_status'] == 'approved'
+
+    later = time.time() + jwt_auth.AUTH_CLAIMS_TTL + 1
+    monkeypatch.setattr(jwt_auth.time, 'time', lambda: later)
+    body = check_auth(client, headers)
+    assert body['customer']['approval_status'] == 'rejected'
+    assert body['customer']['is_approved'] is False
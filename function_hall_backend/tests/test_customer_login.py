@@ -0,0 +1,39 @@
+import pytest
+
+from app import db
+from app.models import Customer
+
+
+def seed_customer(password='secret-123'):
+    customer = Customer(name='Login Customer', email='login@example.com', phone='9000000000',
+                        is_approved=True, approval_status='approved')
+    customer.set_password(password)
+    db.session.add(customer)
+    db.session.commit()
+    return customer
+
+
+def test_login_succeeds(client):
+    seed_customer()
+    response = client.post('/api/customer/login', json={'email': 'login@example.com', 'password': 'secret-123'})
+    assert response.status_code == 200
+    assert response.get_json()['token']
+
+
+@pytest.mark.parametrize('body', [
+    {'email': 123, 'password': 'secret-123'},
+    {'email': ['login@example.com'], 'password': 'secret-123'},
+    {'email': {'a': 1}, 'password': 'secret-123'},
+    {'email': 'login@example.com', 'password': 123},
+    {'email': None, 'password': 'secret-123'},
+    ['login@example.com', 'secret-123'],
+    'login@example.com',
+])
+def test_malformed_login_body_is_rejected(client, body):
+    response = client.post('/api/customer/login', json=body)
+    assert response.status_code == 400
+
+
+def test_invalid_json_is_rejected(client):
+    response = client.post('/api/customer/login', data='{"email":', content_type='application/json')
+    assert response.status_code == 400
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.digests import flush_due_digests
+from app.models import EnquiryDigestItem, Notification
+
+NOW = datetime(2030, 1, 1, 12, 0)
+
+
+def seed_items(phone, count, due_at=NOW):
+    for i in range(count):
+        db.session.add(EnquiryDigestItem(recipient_phone=phone, due_at=due_at, hall_name='Digest Hall',
+                                         customer_name=f'Guest {i}', customer_phone=f'90000000{i:02d}'))
+    db.session.commit()
+
+
+def digests_for(phone):
+    return [n.message for n in Notification.query.filter_by(recipient_phone=phone).all()]
+
+
+def test_limit_never_splits_a_recipient_window(app):
+    seed_items('9111111111', 3)
+    seed_items('9222222222', 2)
+
+    assert flush_due_digests(now=NOW, limit=1) == 1
+    assert len(digests_for('9111111111')) == 1
+    assert digests_for('9111111111')[0].startswith('3 new enquiries')
+    assert EnquiryDigestItem.query.filter_by(recipient_phone='9111111111').count() == 0
+
+    assert flush_due_digests(now=NOW, limit=1) == 1
+    assert digests_for('9222222222')[0].startswith('2 new enquiries')
+    assert flush_due_digests(now=NOW, limit=1) == 0
+
+
+def test_items_not_yet_due_wait_for_their_window(app):
+    seed_items('9111111111', 1)
+    seed_items('9111111111', 2, due_at=NOW + timedelta(minutes=30))
+
+    assert flush_due_digests(now=NOW) == 1
+    assert digests_for('9111111111')[0].startswith('1 new enquiry for')
+    assert EnquiryDigestItem.query.count() == 2
@@ -0,0 +1,75 @@
+"""Hall listings must load photos, packages and rooms in a fixed number of queries, however many halls there are"""
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import AdminUser, FunctionHall, FunctionalRoom, GuestRoom, HallPhoto, Package
+
+
+def seed_halls(count):
+    vendor = AdminUser(name='Vendor', email='vendor@example.com', password_hash='x', role='vendor', is_approved=True)
+    db.session.add(vendor)
+    db.session.flush()
+    for i in range(count):
+        hall = FunctionHall(name=f'Hall {i}', owner_name='Owner', location='Hyderabad', capacity=100 + i,
+                            price_per_day=1000 + i, contact_number='+919000000000', vendor_id=vendor.id,
+                            is_approved=True, approval_status='approved')
+        db.session.add(hall)
+        db.session.flush()
+        db.session.add_all([
+            HallPhoto(hall_id=hall.id, url=f'https://example.com/{i}-1.jpg'),
+            HallPhoto(hall_id=hall.id, url=f'https://example.com/{i}-2.jpg'),
+            Package(hall_id=hall.id, package_name='Basic', price=500),
+            Package(hall_id=hall.id, package_name='Premium', price=900),
+            FunctionalRoom(hall_id=hall.id, room_type='VIP', room_name='VIP Lounge', price=300),
+            GuestRoom(hall_id=hall.id, room_category='Deluxe', total_rooms=4, price_per_room=200),
+        ])
+    db.session.commit()
+    return vendor.id
+
+
+def count_queries(client, url):
+    """(number of SQL statements run by one GET, response JSON)"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    db.session.remove()  # start from an empty identity map, like a real request
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, response.data
+    return len(statements), response.get_json()
+
+
+def listed_halls(body):
+    return body['halls'] if isinstance(body, dict) else body
+
+
+@pytest.mark.parametrize('url', ['/api/halls', '/api/vendor/{vendor_id}/halls'])
+def test_query_count_does_not_grow_with_halls(tmp_path, monkeypatch, url):
+    from app import create_app
+    from app.search import search_cache
+
+    counts = []
+    for size in (3, 30):
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / f'halls-{size}.db'}")
+        app = create_app()
+        search_cache.clear()
+        with app.app_context():
+            vendor_id = seed_halls(size)
+            queries, body = count_queries(app.test_client(), url.format(vendor_id=vendor_id))
+            halls = listed_halls(body)
+            assert len(halls) == size
+            assert all(len(h['photos']) == 2 and len(h['packages']) == 2 for h in halls)
+            assert all(len(h['functional_rooms']) == 1 and len(h['guest_rooms']) == 1 for h in halls)
+            counts.append(queries)
+            db.session.remove()
+            db.drop_all()
+    search_cache.clear()
+
+    assert counts[0] == counts[1], f"{url}: {counts[0]} queries for 3 halls, {counts[1]} for 30"
@@ -0,0 +1,78 @@
+import base64
+import json
+
+import pytest
+
+from app import db
+from app.models import FunctionHall
+
+NEAR = '17.385,78.486'
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def seed_nearby_halls(count=3):
+    for i in range(count):
+        hall = FunctionHall(name=f'Hall {i}', location='Hyderabad', capacity=100, price_per_day=1000 * (i + 1),
+                            is_approved=True, approval_status='approved')
+        hall.set_coordinates(17.385 + 0.01 * i, 78.486)
+        db.session.add(hall)
+    db.session.commit()
+
+
+@pytest.mark.parametrize('radius', ['nan', 'inf', '-inf', '0', '-5'])
+def test_bad_radius_is_rejected(client, radius):
+    seed_nearby_halls()
+    response = client.get(f'/api/halls?near={NEAR}&radius_km={radius}')
+    assert response.status_code == 400
+    assert 'radius_km' in response.get_json()['error']
+
+
+def test_nearby_pages_follow_the_cursor(client):
+    seed_nearby_halls()
+    first = client.get(f'/api/halls?near={NEAR}&limit=2').get_json()
+    assert [hall['name'] for hall in first['halls']] == ['Hall 0', 'Hall 1']
+    rest = client.get(f"/api/halls?near={NEAR}&cursor={first['next_cursor']}").get_json()
+    assert [hall['name'] for hall in rest['halls']] == ['Hall 2']
+
+
+@pytest.mark.parametrize('values', [['x', 'y'], [1.0], [1.0, 'abc'], [1.0, [2]], [None, 1]])
+def test_bad_nearby_cursor_is_rejected(client, values):
+    seed_nearby_halls()
+    response = client.get(f'/api/halls?near={NEAR}&cursor={cursor(values)}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+def seed_sorted_halls(count=3):
+    for i in range(count):
+        db.session.add(FunctionHall(name=f'Sorted {i}', location='Hyderabad', capacity=100 * (i + 1),
+                                    price_per_day=1000.0 * (i + 1), is_approved=True, approval_status='approved'))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('sort', ['price', 'capacity_desc', 'newest'])
+def test_sorted_pages_follow_the_cursor(client, sort):
+    seed_sorted_halls()
+    first = client.get(f'/api/halls?sort={sort}&limit=2').get_json()
+    rest = client.get(f"/api/halls?sort={sort}&cursor={first['next_cursor']}").get_json()
+    names = [hall['name'] for hall in first['halls'] + rest['halls']]
+    assert sorted(names) == ['Sorted 0', 'Sorted 1', 'Sorted 2']
+    assert rest['next_cursor'] is None
+
+
+@pytest.mark.parametrize('sort, values', [
+    ('price', ['x', 'y']),
+    ('price', [1000.0]),
+    ('price_desc', ['NaN', 1]),
+    ('capacity', [100, 'abc']),
+    ('newest', [[1]]),
+    ('newest', [1, 2]),
+])
+def test_bad_sorted_cursor_is_rejected(client, sort, values):
+    seed_sorted_halls()
+    response = client.get(f'/api/halls?sort={sort}&cursor={cursor(values)}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
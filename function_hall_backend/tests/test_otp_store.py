@@ -0,0 +1,119 @@
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from flask import current_app
+
+from app import db
+from app.models import OTPCode
+from app.otp_store import DatabaseOTPStore, MemoryOTPStore, OTPStore
+
+PHONE = '919000000000'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'database'])
+def store(request):
+    if request.param == 'memory':
+        return MemoryOTPStore(clock=FakeClock())
+    request.getfixturevalue('app')
+    return DatabaseOTPStore()
+
+
+def expire(store, phone):
+    if isinstance(store, MemoryOTPStore):
+        store.clock.now += 61  # past a 60 s code, short of a 600 s one
+    else:
+        OTPCode.query.filter_by(phone=phone).update({'expires_at': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+
+
+def run_concurrently(store, guesses, max_attempts):
+    """Each guess on its own thread (and, for the database store, its own session); returns the outcomes"""
+    app = current_app._get_current_object() if isinstance(store, DatabaseOTPStore) else None
+    barrier = threading.Barrier(len(guesses))
+    outcomes = []
+    lock = threading.Lock()
+
+    def guess(code):
+        barrier.wait()
+        if app is None:
+            outcome, _ = store.check(PHONE, code, max_attempts)
+        else:
+            with app.app_context():
+                outcome, _ = store.check(PHONE, code, max_attempts)
+                db.session.remove()
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=guess, args=(code,)) for code in guesses]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return Counter(outcomes)
+
+
+def test_base_store_is_abstract():
+    with pytest.raises(TypeError):
+        OTPStore()
+
+
+def test_code_is_used_once(store):
+    store.put(PHONE, '123456', 600)
+    assert store.check(PHONE, '123456', 5) == ('verified', 1)
+    assert store.check(PHONE, '123456', 5) == ('missing', 0)
+
+
+def test_wrong_codes_lock_after_max_attempts(store):
+    store.put(PHONE, '123456', 600)
+    assert store.check(PHONE, '000000', 2) == ('invalid', 1)
+    assert store.check(PHONE, '000000', 2) == ('invalid', 2)
+    assert store.check(PHONE, '123456', 2) == ('locked', 2)
+    assert store.check(PHONE, '123456', 2) == ('missing', 0)
+
+
+def test_new_code_replaces_pending_one(store):
+    store.put(PHONE, '111111', 600)
+    store.check(PHONE, '000000', 5)
+    store.put(PHONE, '222222', 600)
+    assert store.check(PHONE, '111111', 5) == ('invalid', 1)
+    assert store.check(PHONE, '222222', 5) == ('verified', 2)
+
+
+def test_expired_code_is_rejected_and_dropped(store):
+    store.put(PHONE, '123456', 60)
+    expire(store, PHONE)
+    assert store.check(PHONE, '123456', 5)[0] == 'expired'
+    assert store.check(PHONE, '123456', 5) == ('missing', 0)
+
+
+def test_sweep_removes_only_expired_codes(store):
+    store.put(PHONE, '123456', 60)
+    store.put('919111111111', '654321', 600)
+    expire(store, PHONE)
+    assert store.sweep() == 1
+    assert store.check('919111111111', '654321', 5)[0] == 'verified'
+
+
+def test_parallel_wrong_guesses_never_exceed_max_attempts(store):
+    store.put(PHONE, '123456', 600)
+    outcomes = run_concurrently(store, ['000000'] * 8, max_attempts=3)
+    assert outcomes['invalid'] == 3
+    assert sum(outcomes.values()) == 8
+    assert set(outcomes) <= {'invalid', 'locked', 'missing'}
+
+
+def test_parallel_right_guesses_verify_once(store):
+    store.put(PHONE, '123456', 600)
+    outcomes = run_concurrently(store, ['123456'] * 8, max_attempts=10)
+    assert outcomes['verified'] == 1
+    assert set(outcomes) <= {'verified', 'missing'}
@@ -0,0 +1,38 @@
+from app import db
+from app.models import Notification
+from app.outbox import queue_sms, retry_failed
+
+
+def failed_sms(count):
+    rows = [queue_sms('+919000000000', f'message {i}') for i in range(count)]
+    for row in rows:
+        row.status = 'failed'
+        row.attempts = 6
+    db.session.commit()
+    return [row.id for row in rows]
+
+
+def statuses():
+    return sorted(status for (status,) in db.session.query(Notification.status))
+
+
+def test_retry_failed_with_empty_ids_requeues_nothing(app):
+    ids = failed_sms(3)
+    assert retry_failed([]) == 0
+    assert retry_failed(ids[:1]) == 1
+    db.session.commit()
+    assert statuses() == ['failed', 'failed', 'pending']
+    assert retry_failed() == 2
+
+
+def test_outbox_routes_require_super_admin(client, super_admin_headers):
+    failed_sms(2)
+    assert client.get('/api/admin/outbox').status_code == 401
+    assert client.post('/api/admin/outbox/retry', json={}).status_code == 401
+    assert statuses() == ['failed', 'failed']
+
+    assert client.get('/api/admin/outbox', headers=super_admin_headers).get_json() == {'failed': 2}
+    response = client.post('/api/admin/outbox/retry', json={'ids': []}, headers=super_admin_headers)
+    assert response.get_json()['requeued'] == 0
+    assert client.post('/api/admin/outbox/retry', json={'ids': 5}, headers=super_admin_headers).status_code == 400
+    assert client.post('/api/admin/outbox/retry', json={}, headers=super_admin_headers).get_json()['requeued'] == 2
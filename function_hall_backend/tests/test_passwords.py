@@ -0,0 +1,61 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import db, passwords
+from app.models import Customer
+
+OLD_METHOD = 'pbkdf2:sha256:1000'
+CURRENT_METHOD = 'pbkdf2:sha256:2000'
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashes(monkeypatch):
+    monkeypatch.setattr(passwords, 'PASSWORD_HASH_METHOD', CURRENT_METHOD)
+
+
+def seed_customer(method):
+    customer = Customer(name='Hash Customer', email='hash@example.com', phone='9000000000',
+                        is_approved=True, approval_status='approved',
+                        password_hash=generate_password_hash('secret-123', method))
+    db.session.add(customer)
+    db.session.commit()
+    return customer.id
+
+
+def stored_hash(customer_id):
+    db.session.remove()
+    return db.session.get(Customer, customer_id).password_hash
+
+
+def login(client, password='secret-123'):
+    return client.post('/api/customer/login', json={'email': 'hash@example.com', 'password': password})
+
+
+def test_login_rehashes_an_old_cost_hash(client):
+    customer_id = seed_customer(OLD_METHOD)
+    assert login(client).status_code == 200
+    new_hash = stored_hash(customer_id)
+    assert new_hash.startswith(CURRENT_METHOD + '$')
+    # The upgraded hash still verifies
+    assert login(client).status_code == 200
+    assert stored_hash(customer_id) == new_hash
+
+
+def test_failed_login_keeps_the_old_hash(client):
+    customer_id = seed_customer(OLD_METHOD)
+    assert login(client, password='wrong').status_code == 401
+    assert stored_hash(customer_id).startswith(OLD_METHOD + '$')
+
+
+def test_busy_hash_executor_answers_503(client, monkeypatch):
+    seed_customer(CURRENT_METHOD)
+    executor = passwords.HashExecutor(workers=1, queue=0, wait=0.05)
+    monkeypatch.setattr(passwords, '_executor', executor)
+    executor.slots.acquire()  # the only slot is taken by another login
+    try:
+        response = login(client)
+    finally:
+        executor.slots.release()
+        executor.pool.shutdown(wait=True)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
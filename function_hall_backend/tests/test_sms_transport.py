@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+import sms_utils
+from sms_utils import MemoryBackend, RateLimiter, SMSBackend, SMSTransport, send_sms_batch, set_transport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def transport():
+    """Swap a transport into the process-wide slot for one test"""
+    swapped = []
+
+    def install(backend, rate=0, max_workers=4):
+        transport = SMSTransport(backend, max_workers=max_workers, rate=rate)
+        swapped.append((transport, set_transport(transport)))
+        return transport
+
+    yield install
+    for transport, previous in swapped:
+        set_transport(previous)
+        transport.close()
+
+
+def test_base_backend_is_abstract():
+    with pytest.raises(TypeError):
+        SMSBackend()
+
+
+def test_rate_limiter_spends_the_burst_then_waits(monkeypatch):
+    clock = FakeClock()
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(sms_utils.time, 'sleep', sleep)
+    limiter = RateLimiter(rate=2, burst=3, clock=clock)
+    for _ in range(5):
+        limiter.acquire()
+    assert waits == [pytest.approx(0.5), pytest.approx(0.5)]
+    assert clock.now == pytest.approx(1001.0)
+
+
+def test_batch_results_keep_message_order(transport):
+    backend = MemoryBackend()
+    transport(backend)
+    messages = [(f'+9190000000{i:02d}', f'message {i}') for i in range(20)]
+    results = send_sms_batch(messages)
+    assert [result['to'] for result in results] == [to for to, _ in messages]
+    assert sorted(backend.sent) == sorted(messages)
+
+
+def test_batch_is_held_to_the_rate_limit(transport):
+    transport(MemoryBackend(), rate=50)
+    started = time.monotonic()
+    results = send_sms_batch([(f'+9190000000{i:02d}', 'hello') for i in range(60)])
+    # 50 go out on the burst, the other 10 at 50 per second
+    assert time.monotonic() - started >= 0.18
+    assert all(result['success'] for result in results)
+
+
+def test_one_failed_message_does_not_fail_the_batch(transport):
+    backend = MemoryBackend(fail=lambda to_number, message: to_number == '+919000000001')
+    transport(backend)
+    results = send_sms_batch([('+919000000000', 'a'), ('+919000000001', 'b'), (None, 'c'), ('+919000000003', 'd')])
+    assert [result['success'] for result in results] == [True, False, False, True]
+    assert sorted(backend.sent) == [('+919000000000', 'a'), ('+919000000003', 'd')]
+
+
+def test_raising_backend_fails_only_its_own_message(transport):
+    class FlakyBackend(MemoryBackend):
+        def send(self, to_number, message):
+            if message == 'boom':
+                raise ConnectionError('provider went away')
+            return super().send(to_number, message)
+
+    transport(FlakyBackend())
+    results = send_sms_batch([('+919000000000', 'ok'), ('+919000000001', 'boom'), ('+919000000002', 'ok')])
+    assert [result['success'] for result in results] == [True, False, True]
+    assert 'provider went away' in results[1]['error']
@@ -51,6 +51,9 @@ export default function CustomerEnquiriesPage() {
       }
 
       const data = await response.json();
+      if (data.token) {
+        localStorage.setItem('customerToken', data.token);
+      }
       if (data.authenticated && data.customer) {
         setCustomer(data.customer);
         fetchCustomerEnquiries(data.customer.id, data.customer.email);